@@ -0,0 +1,166 @@
+"""
+Alert Editor for Base Fair Launch Sniper Bot
+Paced, coalescing edit_message_text queue for launch alerts that are sent early and enriched in place
+(security score, market metrics, on-chain analytics), within Telegram's flood limits
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+MessageKey = Tuple[int, int]  # (chat_id, message_id)
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else float(retry_after)
+
+
+class AlertEditor:
+    """
+    One worker edits queued messages at most `rate` edits/second overall, and at most one edit per
+    chat every dm_interval (private chats) / group_interval (groups: Telegram allows ~20/minute) seconds.
+    Only the newest text per message is kept, so an enrichment step that lands while an earlier one is
+    still queued replaces it instead of adding an edit. Queue order is first-submitted first, so
+    premium DMs (sent first) are also enriched first. A flood wait (RetryAfter) pauses the whole queue.
+    """
+
+    def __init__(self, rate: float = 20.0, dm_interval: float = 1.0, group_interval: float = 3.0, max_tracked: int = 5000):
+        self.rate = rate
+        self.dm_interval = dm_interval
+        self.group_interval = group_interval
+        self.max_tracked = max_tracked
+        self.bot = None
+        self.pending: 'OrderedDict[MessageKey, dict]' = OrderedDict()
+        self.last_text: 'OrderedDict[MessageKey, str]' = OrderedDict()  # Text each message shows now
+        self.closed: 'OrderedDict[MessageKey, None]' = OrderedDict()  # Retracted / deleted: never edited again
+        self.next_edit: Dict[int, float] = {}  # chat_id -> earliest monotonic time of its next edit
+        self.paused_until = 0.0
+        self.stats = {'submitted': 0, 'edited': 0, 'coalesced': 0, 'unchanged': 0, 'rate_limited': 0, 'failed': 0}
+        self._wakeup = asyncio.Event()
+        self._editing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, bot):
+        """Spawn the edit worker for bot (call from inside the running loop)"""
+        self.bot = bot
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _remember(self, table: OrderedDict, key: MessageKey, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_tracked:
+            table.popitem(last=False)
+
+    def track(self, chat_id: int, message_id: int, text: str):
+        """Register a freshly sent message's text (so an identical edit is skipped)"""
+        self._remember(self.last_text, (chat_id, message_id), text)
+
+    def submit(self, chat_id: int, message_id: int, text: str, **kwargs):
+        """Queue an edit of the message to text (kwargs go to edit_message_text, e.g. parse_mode, reply_markup)"""
+        key = (chat_id, message_id)
+        if key in self.closed:
+            return
+        if self.last_text.get(key) == text:
+            self.pending.pop(key, None)  # A queued older text would only undo what the message already shows
+            self.stats['unchanged'] += 1
+            return
+        self.stats['submitted'] += 1
+        if key in self.pending:
+            self.stats['coalesced'] += 1
+        self.pending[key] = dict(kwargs, text=text)  # Keeps its queue position when replaced
+        self._wakeup.set()
+
+    def close(self, chat_id: int, message_id: int):
+        """Drop queued edits for a message and ignore later ones (retracted or deleted alerts)"""
+        key = (chat_id, message_id)
+        self.pending.pop(key, None)
+        self._remember(self.closed, key, None)
+
+    async def flush(self, timeout: float = 30):
+        """Wait until every queued edit has been attempted"""
+        deadline = time.monotonic() + timeout
+        while (self.pending or self._editing) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+    def _interval(self, chat_id: int) -> float:
+        return self.group_interval if chat_id < 0 else self.dm_interval
+
+    def _next(self, now: float) -> Tuple[Optional[MessageKey], float]:
+        """First queued message whose chat may be edited now, else (None, seconds until one may)"""
+        wait = None
+        for key in self.pending:
+            ready_at = self.next_edit.get(key[0], 0)
+            if ready_at <= now:
+                return key, 0
+            wait = ready_at - now if wait is None else min(wait, ready_at - now)
+        return None, wait or 0
+
+    async def _run(self):
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = time.monotonic()
+            key, wait = self._next(now)
+            wait = max(wait, self.paused_until - now)
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)  # A new submit may be for a ready chat
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._edit(key, self.pending.pop(key))
+            await asyncio.sleep(1 / self.rate if self.rate > 0 else 0)
+
+    async def _edit(self, key: MessageKey, edit: dict):
+        chat_id, message_id = key
+        self.next_edit[chat_id] = time.monotonic() + self._interval(chat_id)
+        if len(self.next_edit) > self.max_tracked:
+            now = time.monotonic()
+            self.next_edit = {chat: at for chat, at in self.next_edit.items() if at > now}
+        self._editing = True
+        try:
+            await self.bot.edit_message_text(chat_id=chat_id, message_id=message_id, **edit)
+            self.track(chat_id, message_id, edit['text'])
+            self.stats['edited'] += 1
+        except RetryAfter as e:
+            self.stats['rate_limited'] += 1
+            delay = _retry_after_seconds(e)
+            self.paused_until = time.monotonic() + delay
+            logger.warning(f"✏️ Telegram flood wait: pausing alert edits for {delay:.0f}s")
+            if key not in self.pending:  # Retry this text unless a newer one arrived meanwhile
+                self.pending[key] = edit
+                self.pending.move_to_end(key, last=False)
+        except BadRequest as e:
+            if 'not modified' in str(e).lower():
+                self.track(chat_id, message_id, edit['text'])
+            else:  # Deleted, too old to edit, bot removed from the chat...
+                self.stats['failed'] += 1
+                self.close(chat_id, message_id)
+                logger.debug(f"Alert edit {chat_id}/{message_id} dropped: {e}")
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.debug(f"Alert edit {chat_id}/{message_id} failed: {e}")
+        finally:
+            self._editing = False
+
+    def format_stats(self) -> str:
+        """Edit throughput for the periodic scan log line"""
+        return (
+            f"✏️ alert edits: {self.stats['edited']} done, {len(self.pending)} queued | "
+            f"{self.stats['coalesced']} coalesced, {self.stats['unchanged']} unchanged, "
+            f"{self.stats['rate_limited']} flood wait(s), {self.stats['failed']} failed"
+        )
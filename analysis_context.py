@@ -0,0 +1,115 @@
+"""
+Token Analysis Context for Base Fair Launch Sniper Bot
+One object per discovered pair that every analyzer reads the chain through (analyze_token, the
+security scan, the alert metrics and the on-chain analytics), so a launch fetches each value once
+and reports how many RPC calls it cost
+"""
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+from multicall import _normalize
+from rpc_quota import count_rpc_calls
+
+
+class TokenAnalysisContext:
+    """
+    Lazily memoized chain reads for one launch. Values live as long as the launch's analysis, so
+    mutable reads (balances, owner) are memoized too; cross-launch caching of immutable reads is
+    read_cache.ImmutableReadCache's job. Requests routed while `counting()` is active are counted
+    per method (a token read coalesced with another launch's is counted once, by the launch that
+    sent the batch).
+    """
+
+    def __init__(self, chain: str, w3, pair_address: str, token0: str, token1: str, token_reads=None, read_cache=None):
+        self.chain = chain
+        self.w3 = w3
+        self.pair_address = pair_address
+        self.token0 = token0
+        self.token1 = token1
+        self.token_reads = token_reads  # multicall.TokenReadService (None = reads through w3 only)
+        self.read_cache = read_cache
+        self.values: Dict[tuple, object] = {}  # Normalized token read -> decoded value
+        self.memo: Dict[Hashable, object] = {}
+        self.rpc_calls: Counter = Counter()
+        self.memo_hits = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def counting(self):
+        """Charge every RPC request routed inside the block (and in tasks/threads started from it) to this launch"""
+        with count_rpc_calls(self.rpc_calls):
+            yield self
+
+    def _split(self, requests: Iterable[Sequence]):
+        keys = [_normalize(request) for request in requests]
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self.values))
+            self.memo_hits += len(keys) - len(missing)
+        return keys, missing
+
+    def _store(self, keys: List[tuple], missing: List[tuple], values: List[object]) -> List[object]:
+        with self._lock:
+            self.values.update(zip(missing, values))
+            return [self.values[key] for key in keys]
+
+    def read(self, requests: Iterable[Sequence]) -> List[Optional[object]]:
+        """token_reads requests ((token, field) / (token, field, holder)); only unseen ones go on-chain"""
+        keys, missing = self._split(requests)
+        return self._store(keys, missing, self.token_reads.read(self.chain, missing) if missing else [])
+
+    async def aread(self, requests: Iterable[Sequence]) -> List[Optional[object]]:
+        keys, missing = self._split(requests)
+        return self._store(keys, missing, await self.token_reads.aread(self.chain, missing) if missing else [])
+
+    def cached(self, key: Hashable, fetch: Callable[[], object]):
+        """Any other read (logs, balances, a whole sub-analysis), fetched on first use"""
+        with self._lock:
+            if key in self.memo:
+                self.memo_hits += 1
+                return self.memo[key]
+        value = fetch()
+        with self._lock:
+            return self.memo.setdefault(key, value)
+
+    def code(self, address: str) -> bytes:
+        """Deployed bytecode (through the immutable read cache when configured)"""
+        def fetch():
+            if self.read_cache is not None:
+                return self.read_cache.get_code(self.w3, self.chain, address)
+            return bytes(self.w3.eth.get_code(address))
+        return self.cached(('code', address.lower()), fetch)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.rpc_calls.values())
+
+    def format_stats(self) -> str:
+        methods = ', '.join(f"{method} {count}" for method, count in self.rpc_calls.most_common())
+        return (f"{self.total_calls} RPC call(s){f' ({methods})' if methods else ''}, {self.memo_hits} memo hit(s), "
+                f"{time.monotonic() - self.started_at:.1f}s")
+
+
+class LaunchCostTracker:
+    """RPC calls per analyzed launch over recent launches (for the periodic scan log)"""
+
+    def __init__(self, max_samples: int = 500):
+        self.samples: deque = deque(maxlen=max_samples)
+        self.methods: Counter = Counter()
+        self.launches = 0
+
+    def record(self, context: TokenAnalysisContext):
+        self.launches += 1
+        self.samples.append(context.total_calls)
+        self.methods.update(context.rpc_calls)
+
+    def format_stats(self) -> str:
+        if not self.samples:
+            return "🧾 launch cost: no launches yet"
+        ordered = sorted(self.samples)
+        top = ', '.join(f"{method} {count / self.launches:.1f}" for method, count in self.methods.most_common(3))
+        return (f"🧾 launch cost: {sum(ordered) / len(ordered):.1f} RPC call(s)/launch "
+                f"(p95 {ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]}, "
+                f"{self.launches} launch(es)) | {top}")
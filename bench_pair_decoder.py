@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: FactoryLogDecoder.decode_batch vs the previous string-slicing parse_pair_event
+Usage: python bench_pair_decoder.py [repeat]   (uses the logs in fixtures/replay_base.json, offline)
+"""
+import json
+import os
+import sys
+import time
+from pair_decoder import FactoryLogDecoder
+from ws_ingest import format_log
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'replay_base.json')
+USDC_ADDRESS = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+WETH_ADDRESS = "0x4200000000000000000000000000000000000006"
+FACTORIES = {
+    '0x33128a8fc17869897dce68ed026d694621f6fdfd': ('uniswap_v3', {'type': 'v3', 'name': 'Uniswap V3', 'emoji': '🦄'}),
+    '0x8909dc15e40173ff4699343b6eb8132c65e18ec6': ('uniswap_v2', {'type': 'v2', 'name': 'Uniswap V2', 'emoji': '🦄'}),
+    '0x420dd381b31aef6683db6b902084cb0ffece40da': ('aerodrome', {'type': 'velodrome', 'name': 'Aerodrome', 'emoji': '✈️'}),
+    '0xfda619b6d20975be80a10332cd39b9a4b0faa8bb': ('baseswap', {'type': 'v2', 'name': 'BaseSwap', 'emoji': '🔷'}),
+}
+
+
+def legacy_parse_pair_event(log, dex_type: str, dex_id: str, config: dict) -> dict:
+    """The per-log decoder this replaces (hex-string slicing; V2/Aerodrome read the pair from the trailing uint)"""
+    if dex_type == 'v2':
+        if len(log['topics']) >= 3:
+            token0 = '0x' + log['topics'][1].hex()[-40:]
+            token1 = '0x' + log['topics'][2].hex()[-40:]
+            pair_address = '0x' + log['data'].hex()[-40:]
+    elif dex_type == 'v3':
+        if len(log['topics']) >= 4:
+            token0 = '0x' + log['topics'][1].hex()[-40:]
+            token1 = '0x' + log['topics'][2].hex()[-40:]
+            pair_address = '0x' + log['data'].hex()[-40:]
+    elif dex_type == 'velodrome':
+        if len(log['topics']) >= 3:
+            token0 = '0x' + log['topics'][1].hex()[-40:]
+            token1 = '0x' + log['topics'][2].hex()[-40:]
+            pair_address = '0x' + log['data'].hex()[-40:]
+    else:
+        return None
+    if not (token0.lower() == USDC_ADDRESS or token1.lower() == USDC_ADDRESS or
+            token0.lower() == WETH_ADDRESS or token1.lower() == WETH_ADDRESS):
+        return None
+    pair_type = "USDC" if (token0.lower() == USDC_ADDRESS or token1.lower() == USDC_ADDRESS) else "WETH"
+    pair_clean = pair_address.lower().replace('0x', '')
+    leading_zeros = len(pair_clean) - len(pair_clean.lstrip('0'))
+    if leading_zeros > 20:
+        return None
+    KNOWN_TOKENS = {
+        WETH_ADDRESS, USDC_ADDRESS,
+        '0x50c5725949a6f0c72e6c4a641f24049a917db0cb'.lower(),
+        '0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca'.lower(),
+        '0x2Ae3F1Ec7F1F5012CFEab0185bfc7aa3cf0DEc22'.lower(),
+    }
+    if token0.lower() in KNOWN_TOKENS and token1.lower() in KNOWN_TOKENS:
+        return None
+    return {'address': pair_address, 'token0': token0, 'token1': token1, 'block': log['blockNumber'],
+            'pair_type': pair_type, 'dex_id': dex_id, 'dex_name': config['name'], 'dex_emoji': config['emoji']}
+
+
+def load_routed_logs() -> list:
+    with open(FIXTURE) as f:
+        raw_logs = json.load(f)['logs']
+    routed = []
+    for raw in raw_logs:
+        dex_id, config = FACTORIES[raw['address'].lower()]
+        routed.append((format_log(raw), dex_id, config))
+    return routed
+
+
+def _best_of(fn, rounds: int = 5) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(repeat: int = 2000):
+    fixture_logs = load_routed_logs()
+    decoder = FactoryLogDecoder({'WETH': WETH_ADDRESS, 'USDC': USDC_ADDRESS},
+                                ['0x50c5725949a6f0c72e6c4a641f24049a917db0cb', '0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca',
+                                 '0x2ae3f1ec7f1f5012cfeab0185bfc7aa3cf0dec22'])
+    # Compare like with like: logs both decoders accept, logs both reject, and the whole fixture mix
+    cases = {
+        'v3 pools (both decode)': [r for r in fixture_logs if r[2]['type'] == 'v3'],
+        'unquoted (both skip)': [r for r in fixture_logs if r[1] == 'baseswap'],
+        'fixture mix': fixture_logs,
+    }
+    print(f"best of 5, {repeat} x each case")
+    results = {}
+    for name, logs in cases.items():
+        routed = logs * repeat
+        legacy_time = _best_of(lambda: [legacy_parse_pair_event(log, c['type'], d, c) for log, d, c in routed])
+        batch_time = _best_of(lambda: decoder.decode_batch(routed))
+        pools_time = _best_of(lambda: [r.as_pool() for r in decoder.decode_batch(routed)])
+        n = len(routed)
+        results[name] = (legacy_time / n, batch_time / n)
+        print(f"  {name:<24} legacy {legacy_time / n * 1e6:5.2f}µs/log | decode_batch {batch_time / n * 1e6:5.2f}µs/log "
+              f"({legacy_time / batch_time:.1f}x) | with pool dicts {pools_time / n * 1e6:5.2f}µs/log")
+    legacy_pairs = sum(1 for log, d, c in fixture_logs if legacy_parse_pair_event(log, c['type'], d, c))
+    print(f"  pairs found in the fixture: legacy {legacy_pairs}, decode_batch {len(decoder.decode_batch(fixture_logs))} "
+          f"(legacy read V2/Aerodrome pair addresses from the trailing uint and dropped them)")
+    return results
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,148 @@
+"""
+Adaptive Block Range for Base Fair Launch Sniper Bot
+AIMD sizing of eth_getLogs ranges: grow additively on success, halve on range/rate-limit/timeout errors
+"""
+import logging
+import re
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Provider says the block span itself is too wide (a hard per-provider limit)
+RANGE_LIMIT_ERRORS = [
+    'block range',
+    'range too large',
+    'range is too large',
+    'range too wide',
+    'max range',
+    'exceed maximum block range',
+    'range limit',
+]
+
+# Span is fine but the result set was too big (depends on how busy those blocks were)
+RESULT_SIZE_ERRORS = [
+    'response size exceeded',
+    'query returned more than',
+    'too many results',
+    'response too large',
+]
+
+RATE_LIMIT_ERRORS = ['429', 'too many requests', 'rate limit', 'exceeded its compute units']
+TIMEOUT_ERRORS = ['timeout', 'timed out']
+
+# Providers that tell us their limit ("... up to a 10 block range")
+_ADVERTISED_LIMIT = re.compile(r'up to a (\d+)[ -]block range')
+
+# Largest range each provider is known to accept, shared by every controller
+PROVIDER_RANGE_LIMITS: Dict[str, int] = {}
+
+
+def classify_range_error(error: Exception) -> Optional[str]:
+    """'range', 'size', 'rate_limit' or 'timeout' for errors that a smaller/slower request can fix, else None"""
+    error_str = str(error).lower()
+    if isinstance(error, TimeoutError) or any(fragment in error_str for fragment in TIMEOUT_ERRORS):
+        return 'timeout'
+    if any(fragment in error_str for fragment in RATE_LIMIT_ERRORS):
+        return 'rate_limit'
+    if any(fragment in error_str for fragment in RESULT_SIZE_ERRORS):
+        return 'size'
+    if any(fragment in error_str for fragment in RANGE_LIMIT_ERRORS):
+        return 'range'
+    return None
+
+
+def provider_key(w3) -> str:
+    """Identify the provider behind a Web3 instance (one entry per RPC endpoint)"""
+    provider = getattr(w3, 'provider', None)
+    return getattr(provider, 'endpoint_uri', None) or repr(provider)
+
+
+def served_provider_key(w3) -> str:
+    """
+    The endpoint that answered this thread's last request through w3 - what a learned limit must be
+    keyed on. An RpcRouter may have failed over or hedged away from its preferred endpoint
+    (provider_key); plain providers always answer themselves.
+    """
+    served = getattr(getattr(w3, 'provider', None), 'served_uri', None)
+    return (served() if callable(served) else None) or provider_key(w3)
+
+
+class AdaptiveBlockRange:
+    """Per-provider eth_getLogs range size, adjusted with additive-increase / multiplicative-decrease"""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 10000, step: Optional[int] = None,
+                 name: str = 'getLogs', backoff: float = 1.0):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step or max(1, initial // 2)
+        self.name = name
+        self.backoff = backoff  # Base sleep before retrying after a 429/timeout
+        self.sizes: Dict[str, int] = {}
+        self.stats = {'calls': 0, 'grows': 0, 'shrinks': 0, 'blocks': 0}
+
+    def size(self, provider: str) -> int:
+        """Current range size for a provider, capped by its known limit"""
+        size = self.sizes.get(provider, self.initial)
+        return max(self.minimum, min(size, self.maximum, PROVIDER_RANGE_LIMITS.get(provider, self.maximum)))
+
+    def record_success(self, provider: str, span: int):
+        """Additive increase - only when the request actually used the full current size"""
+        self.stats['calls'] += 1
+        self.stats['blocks'] += span
+        size = self.size(provider)
+        if span >= size:
+            grown = min(size + self.step, self.maximum, PROVIDER_RANGE_LIMITS.get(provider, self.maximum))
+            if grown > size:
+                self.stats['grows'] += 1
+            self.sizes[provider] = grown
+
+    def record_failure(self, provider: str, span: int, error: Exception, kind: str):
+        """Multiplicative decrease; a 'range' error also pins the provider's limit below the failed span"""
+        self.stats['calls'] += 1
+        self.stats['shrinks'] += 1
+        if kind == 'range':
+            match = _ADVERTISED_LIMIT.search(str(error).lower())
+            limit = int(match.group(1)) if match else span - 1
+            limit = max(self.minimum, limit)
+            if limit < PROVIDER_RANGE_LIMITS.get(provider, self.maximum + 1):
+                PROVIDER_RANGE_LIMITS[provider] = limit
+                logger.info(f"📏 {self.name}: provider limit learned - {limit} block(s)")
+        self.sizes[provider] = max(self.minimum, min(span, self.size(provider)) // 2)
+        logger.debug(f"{self.name}: {kind} error over {span} block(s), range now {self.sizes[provider]}: {error}")
+
+    def fetch(self, w3, from_block: int, to_block: int, fetch_range: Callable[[int, int], list]) -> list:
+        """
+        Cover [from_block, to_block] with fetch_range(start, end) calls sized by the controller.
+        A failed chunk is retried smaller from the same start block, so no block is ever skipped;
+        errors that shrinking can't fix (or a failure at the minimum size) are raised to the caller.
+        """
+        results = []
+        block = from_block
+        while block <= to_block:
+            # Sized to fit both the endpoint the request will most likely reach and the one that answered
+            # last (after a failover they differ); failures are learned on the endpoint that answered
+            size = min(self.size(provider_key(w3)), self.size(served_provider_key(w3)))
+            end = min(block + size - 1, to_block)
+            try:
+                results.extend(fetch_range(block, end))
+            except Exception as e:
+                kind = classify_range_error(e)
+                if kind is None or (end - block + 1) <= self.minimum:
+                    raise
+                self.record_failure(served_provider_key(w3), end - block + 1, e, kind)
+                if kind in ('rate_limit', 'timeout'):
+                    time.sleep(self.backoff)
+                continue
+            self.record_success(served_provider_key(w3), end - block + 1)
+            block = end + 1
+        return results
+
+    def format_stats(self) -> str:
+        """Short summary of range sizing for the periodic scan log line"""
+        sizes = ', '.join(str(self.size(p)) for p in self.sizes) or str(self.initial)
+        return (
+            f"range {sizes} block(s) | {self.stats['calls']} call(s), "
+            f"{self.stats['grows']} grow(s), {self.stats['shrinks']} shrink(s)"
+        )
@@ -16,6 +16,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackContext
 import requests
 from eth_abi import encode
+from multicall import TokenReadService
 
 # Load .env file FIRST before any config
 try:
@@ -48,6 +49,8 @@ MAX_TAX_PERCENT = 5
 # Setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 w3 = Web3(Web3.HTTPProvider(BASE_RPC))
+# Batched Multicall3 token reads over w3, shared by the command-line checkers built on this module
+token_reads = TokenReadService(lambda chain: w3)
 
 # Minimal ABIs (only what we need)
 ERC20_ABI = [
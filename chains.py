@@ -0,0 +1,226 @@
+"""
+Chain Registry for Base Fair Launch Sniper Bot
+Each scanned chain is declared once (RPC pool, factories, quote tokens, windows, explorer URLs)
+and carries its own scanner, head tracker, reorg detector and throughput metrics
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from web3 import Web3
+from block_range import AdaptiveBlockRange
+from head_tracker import HeadTracker
+from log_scanner import FactoryLogScanner
+from pair_decoder import FactoryLogDecoder
+from reorg import ReorgDetector
+from rpc_quota import QuotaLedger
+from rpc_router import HedgePolicy, RpcRouter
+
+logger = logging.getLogger(__name__)
+
+
+class ChainMetrics:
+    """Per-chain throughput counters for the periodic scan log"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.windows = 0
+        self.blocks = 0
+        self.pairs = 0
+        self.alerts = 0
+
+    def record_window(self, blocks: int, pairs: int):
+        self.windows += 1
+        self.blocks += max(0, blocks)
+        self.pairs += pairs
+
+    def record_alert(self):
+        self.alerts += 1
+
+    def format(self) -> str:
+        minutes = max((time.monotonic() - self.started_at) / 60, 1e-9)
+        return (
+            f"{self.blocks / minutes:,.0f} blocks/min over {self.windows} window(s) | "
+            f"{self.pairs} pair(s) ({self.pairs / minutes * 60:.1f}/h), {self.alerts} alert(s)"
+        )
+
+
+class ChainConfig:
+    """Declaration of one chain plus the runtime components built from it"""
+
+    def __init__(self, chain: str, name: str, emoji: str, rpc_urls: List[str], factories: Dict[str, dict],
+                 quote_tokens: Dict[str, str], explorer_url: str, dexscreener_slug: Optional[str] = None,
+                 swap_url: Optional[str] = None, ws_url: str = '', flashblocks_ws_url: str = '',
+                 scan_window: int = 10, max_scan_window: int = 2000, scan_interval: float = 10,
+                 head_interval: float = 5, confirmations: int = 0, max_backfill_blocks: int = 1800,
+                 dedupe_retention_blocks: int = 302400, rpc_timeout: float = 10, required: bool = False,
+                 combined_logs: bool = True, reorg_ring_size: int = 64, known_tokens: Optional[List[str]] = None,
+                 hedge_budget: float = 0.0, rate_limits: Optional[Dict[str, object]] = None,
+                 ledger: Optional[QuotaLedger] = None, probe_deadline: float = 10):
+        self.chain = chain
+        self.name = name
+        self.emoji = emoji
+        self.rpc_urls = list(dict.fromkeys(url for url in rpc_urls if url))  # Ordered, deduplicated pool
+        self.factories = factories
+        self.quote_tokens = {symbol: address.lower() for symbol, address in quote_tokens.items()}
+        self.known_tokens = [address.lower() for address in known_tokens or []]  # Never "new" (with the quote tokens)
+        self.explorer_url = explorer_url.rstrip('/')
+        self.dexscreener_slug = dexscreener_slug or chain
+        # Swap link template, {token} is replaced by the token address
+        self.swap_url = swap_url or f"https://app.uniswap.org/#/tokens/{chain}/{{token}}"
+        self.ws_url = ws_url
+        self.flashblocks_ws_url = flashblocks_ws_url
+        self.scan_window = scan_window
+        self.max_scan_window = max_scan_window
+        self.scan_interval = scan_interval
+        self.head_interval = head_interval
+        self.confirmations = confirmations
+        self.max_backfill_blocks = max_backfill_blocks
+        self.dedupe_retention_blocks = dedupe_retention_blocks
+        self.rpc_timeout = rpc_timeout
+        self.required = required  # Keep a (possibly offline) primary instead of disabling the chain
+        self.hedge_budget = hedge_budget  # Fraction of eth_call/eth_getCode/eth_getLogs that may be hedged (0 = off)
+        self.rate_limits = rate_limits or {}  # {host: rps} client-side limits (see rpc_quota.limiter_for)
+        self.ledger = ledger  # Shared per-feature compute-unit ledger
+        self.probe_deadline = probe_deadline  # Longest startup waits for a healthy RPC (probes run concurrently)
+
+        # Runtime state
+        self.w3: Optional[Web3] = None
+        self.router: Optional[RpcRouter] = None  # Shared by every component through self.w3
+        self.log_scanner = FactoryLogScanner(
+            factories, chain=chain, combined=combined_logs,
+            block_range=AdaptiveBlockRange(scan_window, maximum=max_scan_window, step=scan_window, name=f"{chain} factory getLogs")
+        )
+        self.pair_decoder = FactoryLogDecoder(self.quote_tokens, self.known_tokens)
+        self.head_tracker = HeadTracker(lambda: self.w3, chain, interval=head_interval)
+        self.reorg_detector = ReorgDetector(self.head_tracker, chain, size=reorg_ring_size)
+        self.metrics = ChainMetrics()
+
+    @property
+    def label(self) -> str:
+        return f"{self.emoji} {self.name}"
+
+    @classmethod
+    def from_dict(cls, data: dict, **defaults) -> 'ChainConfig':
+        """Build a chain from a JSON/dict declaration (used for extra chains from the environment)"""
+        return cls(**{**defaults, **data})
+
+    def connect(self) -> Optional[Web3]:
+        """
+        Build the chain's single Web3 (routed over the whole RPC pool) without touching the network.
+        The pool is probed by probe() at startup, or on the first request if nothing probed it yet.
+        """
+        if self.router is not None:
+            return self.w3
+        hedge = HedgePolicy(self.hedge_budget) if self.hedge_budget > 0 else None
+        self.router = RpcRouter(self.rpc_urls, timeout=self.rpc_timeout, name=self.name, hedge=hedge,
+                                limits=self.rate_limits, ledger=self.ledger, probe_deadline=self.probe_deadline)
+        if self.rpc_urls:
+            self.w3 = Web3(self.router)
+        return self.w3
+
+    def probe(self, deadline: Optional[float] = None) -> int:
+        """
+        Probe every RPC endpoint concurrently and return once one is healthy (or at the deadline).
+        A chain with no healthy endpoint is disabled unless it is required.
+        """
+        self.connect()
+        deadline = self.probe_deadline if deadline is None else deadline
+        logger.info(f"{self.emoji} Probing {len(self.router.endpoints)} {self.name} RPC endpoint(s)...")
+        healthy = self.router.probe_all(deadline=deadline, quorum=1)
+        if healthy:
+            logger.info(f"✅ Connected to {self.name}, preferred {self.router.pick().label} "
+                        f"({len(self.router.endpoints)} endpoint(s), the rest keep probing in the background)")
+        elif self.required and self.rpc_urls:
+            logger.error(f"❌ Failed to connect to any {self.name} RPC within {deadline:g}s!")
+            # Keep routing anyway - background probing closes breakers on recovery
+        else:
+            logger.warning(f"⚠️ Failed to connect to any {self.name} RPC - {self.name} scanning disabled")
+            self.w3 = None
+        return healthy
+
+    def switch_rpc(self) -> Optional[Web3]:
+        """Steer traffic off the preferred endpoint (after 503/429 errors reach the caller)"""
+        if self.router is None:
+            return self.w3
+        current = self.router.pick()
+        self.router.trip(current)
+        replacement = self.router.pick()
+        if current and replacement:
+            logger.warning(f"🔄 {self.name} RPC error detected, routing {current.label} -> {replacement.label}")
+        return self.w3
+
+    def is_quote_token(self, address: str) -> bool:
+        return address.lower() in self.quote_tokens.values()
+
+    def quote_address(self, symbol: str, default: str = 'WETH') -> str:
+        """Quote token address by symbol (falls back to the chain's wrapped native token)"""
+        return self.quote_tokens.get(symbol) or self.quote_tokens.get(default) or next(iter(self.quote_tokens.values()), '')
+
+    def token_url(self, address: str) -> str:
+        return f"{self.explorer_url}/token/{address}"
+
+    def address_url(self, address: str) -> str:
+        return f"{self.explorer_url}/address/{address}"
+
+    def tx_url(self, tx_hash: str) -> str:
+        return f"{self.explorer_url}/tx/{tx_hash}"
+
+    def dexscreener_url(self, address: str) -> str:
+        return f"https://dexscreener.com/{self.dexscreener_slug}/{address}"
+
+    def swap_link(self, token: str) -> str:
+        return self.swap_url.format(token=token)
+
+
+class ChainRegistry:
+    """Ordered set of declared chains; only connected chains are scanned"""
+
+    def __init__(self):
+        self.chains: Dict[str, ChainConfig] = {}
+
+    def register(self, config: ChainConfig) -> ChainConfig:
+        self.chains[config.chain] = config
+        return config
+
+    def __getitem__(self, chain: str) -> ChainConfig:
+        return self.chains[chain]
+
+    def __contains__(self, chain: str) -> bool:
+        return chain in self.chains
+
+    def __iter__(self):
+        return iter(self.chains.values())
+
+    def get(self, chain: str) -> Optional[ChainConfig]:
+        return self.chains.get(chain)
+
+    def w3(self, chain: str) -> Optional[Web3]:
+        """Current Web3 instance for a chain (None if undeclared or offline)"""
+        config = self.chains.get(chain)
+        return config.w3 if config else None
+
+    def connected(self) -> List[ChainConfig]:
+        return [config for config in self.chains.values() if config.w3 is not None]
+
+    def connect_all(self):
+        """Build every chain's Web3 (no network: see probe_all)"""
+        for config in self.chains.values():
+            config.connect()
+
+    def probe_all(self, deadline: Optional[float] = None) -> Dict[str, int]:
+        """Probe every chain's RPC pool at once; startup takes as long as the slowest chain's fastest endpoint"""
+        configs = list(self.chains.values())
+        if not configs:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(configs), thread_name_prefix='chain-probe') as pool:
+            healthy = list(pool.map(lambda config: config.probe(deadline), configs))
+        return {config.chain: count for config, count in zip(configs, healthy)}
+
+
+def chains_from_json(text: str, **defaults) -> List[ChainConfig]:
+    """Parse extra chain declarations: a JSON list of ChainConfig keyword dicts"""
+    if not text or not text.strip():
+        return []
+    return [ChainConfig.from_dict(entry, **defaults) for entry in json.loads(text)]
@@ -4,6 +4,8 @@ Tracks users, referrals, and tier status
 """
 import sqlite3
 import os
+import threading
+import time
 import logging
 from datetime import datetime
 from typing import Optional, Dict, List
@@ -25,7 +27,7 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 class UserDatabase:
-    def __init__(self, db_path='users.db'):
+    def __init__(self, db_path='users.db', lazy=False):
         # Load wallet encryption master key
         self.master_key = os.getenv('WALLET_MASTER_KEY')
         if not self.master_key:
@@ -57,19 +59,35 @@ class UserDatabase:
         
         logger.info(f"📁 Database path: {self.db_path}")
         
-        # Ensure directory exists (for Railway volume)
-        db_dir = os.path.dirname(self.db_path)
-        if db_dir and not os.path.exists(db_dir):
-            try:
-                os.makedirs(db_dir, exist_ok=True)
-                logger.info(f"📂 Created database directory: {db_dir}")
-            except Exception as e:
-                logger.warning(f"⚠️  Could not create directory {db_dir}: {e}")
-        
-        self.init_database()
+        # Lazy databases touch the disk on their first connection (importing the bot has no side effects)
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        if not lazy:
+            self.ensure_ready()
+    
+    def ensure_ready(self):
+        """Create the database directory and tables once"""
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            # Ensure directory exists (for Railway volume)
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir and not os.path.exists(db_dir):
+                try:
+                    os.makedirs(db_dir, exist_ok=True)
+                    logger.info(f"📂 Created database directory: {db_dir}")
+                except Exception as e:
+                    logger.warning(f"⚠️  Could not create directory {db_dir}: {e}")
+            
+            self.init_database()
+            self._ready = True
     
     def get_connection(self):
         """Get a new database connection"""
+        if not self._ready:
+            self.ensure_ready()
         return sqlite3.connect(self.db_path)
     
     def init_database(self):
@@ -191,6 +209,62 @@ class UserDatabase:
                 )
             ''')
 
+            # Scanner cursor per chain (next block to scan) - survives restarts
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS scan_cursors (
+                    chain TEXT PRIMARY KEY,
+                    last_block INTEGER NOT NULL,
+                    updated_at TEXT
+                )
+            ''')
+
+            # Pairs already processed by the scanner (dedupe across restarts, pruned by block height)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS seen_pairs (
+                    chain TEXT NOT NULL,
+                    pair_address TEXT NOT NULL,
+                    block INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (chain, pair_address)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_seen_pairs_block ON seen_pairs (chain, block)')
+
+            # Telegram messages sent per launch alert (so they can be retracted/edited later)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alert_messages (
+                    chain TEXT NOT NULL,
+                    pair_address TEXT NOT NULL,
+                    chat_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    recipient_type TEXT NOT NULL DEFAULT 'user',
+                    sent_at TEXT,
+                    block INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (chat_id, message_id)
+                )
+            ''')
+            # Pair creation block, so rows past the reorg horizon can be pruned
+            try:
+                cursor.execute('ALTER TABLE alert_messages ADD COLUMN block INTEGER NOT NULL DEFAULT 0')
+                logger.info("✅ Added block column to alert_messages table")
+            except sqlite3.OperationalError:
+                # Column already exists
+                pass
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_alert_messages_pair ON alert_messages (chain, pair_address)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_alert_messages_block ON alert_messages (chain, block)')
+
+            # Immutable on-chain reads (token name/symbol/decimals, pool tokens, bytecode); ok = 0 marks a revert
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS immutable_reads (
+                    chain TEXT NOT NULL,
+                    address TEXT NOT NULL,
+                    selector TEXT NOT NULL,
+                    ok INTEGER NOT NULL,
+                    value BLOB,
+                    cached_at INTEGER NOT NULL,
+                    PRIMARY KEY (chain, address, selector)
+                ) WITHOUT ROWID
+            ''')
+
             conn.commit()
             conn.close()
             
@@ -210,7 +284,7 @@ class UserDatabase:
     def add_user(self, user_id: int, username: str = None, first_name: str = None, 
                  referrer_code: str = None) -> Dict:
         """Add a new user to the database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         # Check if user already exists
@@ -250,7 +324,7 @@ class UserDatabase:
     
     def get_user(self, user_id: int) -> Optional[Dict]:
         """Get user information"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
@@ -278,7 +352,7 @@ class UserDatabase:
         if not user:
             return None
 
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         # Get active referral details (users who have traded)
@@ -317,7 +391,7 @@ class UserDatabase:
     
     def get_total_users(self) -> int:
         """Get total number of users"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM users')
         count = cursor.fetchone()[0]
@@ -326,7 +400,7 @@ class UserDatabase:
     
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
         """Get top referrers (only counting active referrals who have traded)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -351,7 +425,7 @@ class UserDatabase:
     
     def update_tier(self, user_id: int, tier: str):
         """Update user tier (free/premium)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('UPDATE users SET tier = ? WHERE user_id = ?', (tier, user_id))
         conn.commit()
@@ -363,7 +437,7 @@ class UserDatabase:
 
     def create_wallet(self, user_id: int, wallet_address: str, private_key: str) -> Dict:
         """Create a new wallet for a user with encrypted private key"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
@@ -396,7 +470,7 @@ class UserDatabase:
 
     def get_user_wallets(self, user_id: int) -> List[Dict]:
         """Get all wallets for a user"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -419,7 +493,7 @@ class UserDatabase:
 
     def get_wallet_private_key(self, user_id: int, wallet_address: str) -> Optional[str]:
         """Get private key for a specific wallet (use with caution!)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -435,7 +509,7 @@ class UserDatabase:
 
     def get_user_by_wallet(self, wallet_address: str) -> Optional[int]:
         """Find user ID by wallet address"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -452,7 +526,7 @@ class UserDatabase:
 
     def delete_wallet(self, user_id: int, wallet_address: str) -> bool:
         """Soft delete a wallet"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -473,7 +547,7 @@ class UserDatabase:
         If they were referred, increment referrer's count and check for premium upgrade.
         Returns referrer_id if they should be upgraded to premium, None otherwise.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         # Check if this user was referred and hasn't traded yet
@@ -536,7 +610,7 @@ class UserDatabase:
     
     def toggle_alerts(self, user_id: int) -> bool:
         """Toggle alerts on/off for user"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT alerts_enabled FROM users WHERE user_id = ?', (user_id,))
         current = cursor.fetchone()[0]
@@ -550,7 +624,7 @@ class UserDatabase:
     
     def start_referral_commission(self, user_id: int):
         """Start 30-day commission period for referrer"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(
             'UPDATE users SET commission_start_date = ? WHERE user_id = ?',
@@ -562,7 +636,7 @@ class UserDatabase:
     
     def is_commission_active(self, user_id: int) -> bool:
         """Check if referrer's 30-day commission period is active"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT commission_start_date FROM users WHERE user_id = ?', (user_id,))
         result = cursor.fetchone()
@@ -580,7 +654,7 @@ class UserDatabase:
                       trade_tx_hash: str, commission_amount: float, 
                       commission_tx_hash: str = None):
         """Log commission payment"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO referral_commissions 
@@ -593,7 +667,7 @@ class UserDatabase:
     
     def get_referrer_commissions(self, user_id: int) -> List[Dict]:
         """Get all commissions earned by referrer"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute('''
@@ -611,7 +685,7 @@ class UserDatabase:
         total_earned = sum(c['commission_amount_eth'] for c in commissions)
         
         # Calculate days remaining
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT commission_start_date FROM users WHERE user_id = ?', (user_id,))
         result = cursor.fetchone()
@@ -632,7 +706,7 @@ class UserDatabase:
     
     def get_referrer(self, user_id: int) -> Optional[int]:
         """Get the referrer ID for a user"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT referrer_id FROM users WHERE user_id = ?', (user_id,))
         result = cursor.fetchone()
@@ -641,7 +715,7 @@ class UserDatabase:
 
     def get_users_with_alerts(self) -> List[Dict]:
         """Get all users with alerts enabled"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT user_id, username, first_name FROM users WHERE alerts_enabled = 1')
 
@@ -659,7 +733,7 @@ class UserDatabase:
     def add_group(self, group_id: int, group_name: str = None, group_title: str = None) -> bool:
         """Add a group to auto-post list"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO bot_groups (group_id, group_name, group_title, added_date, posting_enabled)
@@ -676,7 +750,7 @@ class UserDatabase:
     def remove_group(self, group_id: int) -> bool:
         """Remove a group from auto-post list"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute('DELETE FROM bot_groups WHERE group_id = ?', (group_id,))
             conn.commit()
@@ -690,7 +764,7 @@ class UserDatabase:
     def get_all_groups(self) -> List[Dict]:
         """Get all groups bot should post to"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute('SELECT group_id, group_name, group_title, posting_enabled FROM bot_groups WHERE posting_enabled = 1')
             groups = []
@@ -710,7 +784,7 @@ class UserDatabase:
     def update_group_post_count(self, group_id: int):
         """Update last post time and count for a group"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE bot_groups 
@@ -725,7 +799,7 @@ class UserDatabase:
 
     def add_scheduled_deletion(self, chat_id: int, message_id: int, delete_at: int):
         """Add a message to be auto-deleted"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO message_deletions (chat_id, message_id, delete_at)
@@ -736,7 +810,7 @@ class UserDatabase:
 
     def remove_scheduled_deletion(self, chat_id: int, message_id: int):
         """Remove a scheduled deletion (after successful delete)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM message_deletions WHERE chat_id = ? AND message_id = ?', (chat_id, message_id))
         conn.commit()
@@ -744,10 +818,222 @@ class UserDatabase:
 
     def get_pending_deletions(self) -> List[Dict]:
         """Get all pending message deletions"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM message_deletions')
         rows = cursor.fetchall()
         conn.close()
         return [dict(row) for row in rows]
+
+    def get_scan_cursor(self, chain: str) -> Optional[int]:
+        """Get the saved scan cursor (next block to scan) for a chain"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT last_block FROM scan_cursors WHERE chain = ?', (chain,))
+            row = cursor.fetchone()
+            conn.close()
+            return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to read scan cursor for {chain}: {e}")
+            return None
+
+    def save_scan_cursor(self, chain: str, last_block: int):
+        """Persist the scan cursor for a chain after a processed window"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO scan_cursors (chain, last_block, updated_at)
+                VALUES (?, ?, ?)
+            ''', (chain, last_block, datetime.now().isoformat()))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to save scan cursor for {chain}: {e}")
+
+    def add_seen_pair(self, chain: str, pair_address: str, block: int = 0):
+        """Record a pair as processed by the scanner"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO seen_pairs (chain, pair_address, block)
+                VALUES (?, ?, ?)
+            ''', (chain, pair_address.lower(), block or 0))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to record seen pair {chain}:{pair_address}: {e}")
+
+    def is_pair_seen(self, chain: str, pair_address: str) -> bool:
+        """Check if a pair was already processed (primary-key lookup)"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM seen_pairs WHERE chain = ? AND pair_address = ?', (chain, pair_address.lower()))
+            row = cursor.fetchone()
+            conn.close()
+            return row is not None
+        except Exception as e:
+            logger.error(f"Failed to check seen pair {chain}:{pair_address}: {e}")
+            return False
+
+    def remove_seen_pair(self, chain: str, pair_address: str):
+        """Forget a pair so the scanner processes it again"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM seen_pairs WHERE chain = ? AND pair_address = ?', (chain, pair_address.lower()))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to remove seen pair {chain}:{pair_address}: {e}")
+
+    def get_recent_seen_pairs(self, limit: int) -> List[tuple]:
+        """Most recent (chain, pair_address, block) rows, newest first - used to warm the in-memory index"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT chain, pair_address, block FROM seen_pairs ORDER BY block DESC LIMIT ?', (limit,))
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+        except Exception as e:
+            logger.error(f"Failed to load seen pairs: {e}")
+            return []
+
+    def get_seen_pair_keys(self) -> Optional[List[tuple]]:
+        """Every (chain, pair_address) in the dedupe table, None if it can't be read (rebuilds the membership filter)"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT chain, pair_address FROM seen_pairs')
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+        except Exception as e:
+            logger.error(f"Failed to load seen pair keys: {e}")
+            return None
+
+    def count_seen_pairs(self) -> int:
+        """Number of pairs in the on-disk dedupe table"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM seen_pairs')
+            count = cursor.fetchone()[0]
+            conn.close()
+            return count
+        except Exception as e:
+            logger.error(f"Failed to count seen pairs: {e}")
+            return 0
+
+    def prune_seen_pairs(self, chain: str, below_block: int) -> int:
+        """Delete a chain's seen pairs created before below_block; returns rows removed"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM seen_pairs WHERE chain = ? AND block < ?', (chain, below_block))
+            removed = cursor.rowcount
+            conn.commit()
+            conn.close()
+            return removed
+        except Exception as e:
+            logger.error(f"Failed to prune seen pairs for {chain}: {e}")
+            return 0
+
+    def get_immutable_reads(self, chain: str, keys: List[tuple]) -> Dict[tuple, tuple]:
+        """Cached (ok, value, cached_at) per (address, selector) for one chain; missing keys are absent"""
+        if not keys:
+            return {}
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            found = {}
+            for start in range(0, len(keys), 400):  # Stay under SQLite's bound-parameter limit
+                chunk = keys[start:start + 400]
+                cursor.execute(
+                    'SELECT address, selector, ok, value, cached_at FROM immutable_reads WHERE chain = ? AND ('
+                    + ' OR '.join('(address = ? AND selector = ?)' for _ in chunk) + ')',
+                    [chain] + [part for address, selector in chunk for part in (address.lower(), selector)]
+                )
+                for address, selector, ok, value, cached_at in cursor.fetchall():
+                    found[(address, selector)] = (bool(ok), bytes(value or b''), cached_at)
+            conn.close()
+            return found
+        except Exception as e:
+            logger.error(f"Failed to load cached reads for {chain}: {e}")
+            return {}
+
+    def save_immutable_reads(self, chain: str, rows: List[tuple]):
+        """Store (address, selector, ok, value) reads for one chain"""
+        if not rows:
+            return
+        try:
+            now = int(time.time())
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO immutable_reads (chain, address, selector, ok, value, cached_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(chain, address.lower(), selector, int(ok), value, now) for address, selector, ok, value in rows])
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to store cached reads for {chain}: {e}")
+
+    def add_alert_message(self, chain: str, pair_address: str, chat_id: int, message_id: int, recipient_type: str = 'user',
+                          block: int = 0):
+        """Record a Telegram message sent for a pair's launch alert (block: the pair's creation block)"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO alert_messages (chain, pair_address, chat_id, message_id, recipient_type, sent_at, block)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (chain, pair_address.lower(), chat_id, message_id, recipient_type, datetime.now().isoformat(), block or 0))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to record alert message {chat_id}/{message_id}: {e}")
+
+    def get_alert_messages(self, chain: str, pair_address: str) -> List[Dict]:
+        """All recorded Telegram messages for a pair's launch alert"""
+        try:
+            conn = self.get_connection()
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM alert_messages WHERE chain = ? AND pair_address = ?', (chain, pair_address.lower()))
+            rows = cursor.fetchall()
+            conn.close()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to load alert messages for {chain}:{pair_address}: {e}")
+            return []
+
+    def prune_alert_messages(self, chain: str, below_block: int) -> int:
+        """Delete a chain's alert messages for pairs created before below_block; returns rows removed"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM alert_messages WHERE chain = ? AND block < ?', (chain, below_block))
+            removed = cursor.rowcount
+            conn.commit()
+            conn.close()
+            return removed
+        except Exception as e:
+            logger.error(f"Failed to prune alert messages for {chain}: {e}")
+            return 0
+
+    def remove_alert_messages(self, chain: str, pair_address: str):
+        """Forget a pair's recorded alert messages"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM alert_messages WHERE chain = ? AND pair_address = ?', (chain, pair_address.lower()))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to remove alert messages for {chain}:{pair_address}: {e}")
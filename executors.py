@@ -0,0 +1,267 @@
+"""
+Executors for Base Fair Launch Sniper Bot
+Executor-backed adapters that keep blocking Web3 calls off the asyncio event loop
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ChainExecutor:
+    """Runs one chain's blocking RPC calls on its own small thread pool (a slow chain can't starve another)"""
+
+    def __init__(self, chain: str, max_workers: int = 2):
+        self.chain = chain
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{chain}-rpc")
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) executed on this chain's pool (in the caller's context, e.g. its rpc_context)"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, fn, *args, **kwargs))
+
+    def shutdown(self):
+        """Stop accepting work; running calls finish in the background"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TierFull(Exception):
+    """AnalysisTier already holds max_pending tasks"""
+
+
+class TaskCancelled(Exception):
+    """The AnalysisTier task running in this thread passed its deadline or its caller went away"""
+
+
+_CANCEL_EVENT: ContextVar[Optional[threading.Event]] = ContextVar('analysis_tier_cancel', default=None)
+
+
+def raise_if_cancelled():
+    """Checkpoint for long blocking work (e.g. between getLogs chunks); no-op outside an AnalysisTier task"""
+    event = _CANCEL_EVENT.get()
+    if event is not None and event.is_set():
+        raise TaskCancelled()
+
+
+class AnalysisTier:
+    """
+    Thread pool for heavy blocking analysis (security scans, on-chain log sweeps) kept apart from the
+    analyze_token pool. At most max_pending tasks are queued or running; beyond that run() raises
+    TierFull at once, so a launch burst sheds enrichment instead of growing a backlog. Each task has
+    a deadline: the caller gets asyncio.TimeoutError, a task that hasn't started is dropped, and a
+    running one stops at its next raise_if_cancelled() checkpoint (threads can't be killed).
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, max_pending: int = 16, deadline: float = 30):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-tier")
+        self.pending = 0  # Queued + running (a cancelled task still counts until its thread lets go)
+        self.run_times = deque(maxlen=500)
+        self.stats = {'completed': 0, 'failed': 0, 'expired': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+    def _call(self, cancel: threading.Event, fn, args, kwargs):
+        if cancel.is_set():  # Expired while queued
+            raise TaskCancelled()
+        started = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.run_times.append(time.monotonic() - started)
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or isinstance(future.exception(), TaskCancelled):
+                return  # Counted as expired by run()
+            self.stats['failed' if future.exception() is not None else 'completed'] += 1
+
+    async def run(self, fn, *args, deadline: Optional[float] = None, **kwargs):
+        """Await fn(*args, **kwargs) on the tier within deadline seconds (default: the tier's), in the caller's context"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise TierFull(f"{self.name} tier full ({self.pending} pending)")
+            self.pending += 1
+        cancel = threading.Event()
+        context = contextvars.copy_context()
+        context.run(_CANCEL_EVENT.set, cancel)
+        future = self.executor.submit(context.run, self._call, cancel, fn, args, kwargs)
+        future.add_done_callback(self._done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline or self.deadline)
+        except asyncio.TimeoutError:
+            self.stats['expired'] += 1
+            raise
+        finally:
+            cancel.set()  # Deadline, caller cancelled or done: any further checkpoint stops the task
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def format_stats(self) -> str:
+        runs = sorted(self.run_times)
+        p95 = runs[min(len(runs) - 1, int(len(runs) * 0.95))] if runs else 0
+        return (
+            f"{self.name} tier: pending {self.pending}/{self.max_pending} ({self.max_workers} worker(s)) | "
+            f"run p95 {p95:.1f}s | done {self.stats['completed']}, failed {self.stats['failed']}, "
+            f"expired {self.stats['expired']}, rejected {self.stats['rejected']}"
+        )
+
+
+class LoopLagMonitor:
+    """
+    Event-loop responsiveness: a task sleeps `interval` seconds and records how late it wakes up.
+    Lag is how long a Telegram update (or any callback) would have waited behind blocking work.
+    """
+
+    def __init__(self, interval: float = 0.5, max_samples: int = 1200):
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Spawn the sampling task (call from inside the running loop)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def percentile(self, fraction: float) -> float:
+        values = sorted(self.samples)
+        return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+    def format_stats(self) -> str:
+        return (f"🐢 event loop lag: p50 {self.percentile(0.5) * 1000:.0f}ms, p95 {self.percentile(0.95) * 1000:.0f}ms, "
+                f"max {self.max_lag * 1000:.0f}ms")
+
+
+class RpcBudget:
+    """Async token bucket over the RPC request budget (requests/second with a burst allowance)"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.waited = 0.0  # Total seconds callers spent waiting for budget
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, cost: float = 1):
+        """Wait until `cost` requests fit in the budget, then spend them"""
+        if self.rate <= 0:
+            return
+        cost = min(cost, self.burst)
+        async with self._lock:  # FIFO: one waiter refills at a time
+            self._refill()
+            if self.tokens < cost:
+                delay = (cost - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= cost
+
+
+class AnalysisPool:
+    """
+    N async workers draining a FIFO of pair jobs.
+    Jobs with the same key run one after another in submission order (per-pair alert ordering);
+    different pairs run concurrently.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 0):
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.wait_times = deque(maxlen=500)  # Seconds from submit to start
+        self.run_times = deque(maxlen=500)  # Seconds from start to finish
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'max_depth': 0}
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+        self._key_pending: Dict[str, int] = {}  # Jobs queued or running per key (lock is dropped at 0)
+        self._tasks = []
+        self.active = 0
+
+    def start(self):
+        """Spawn the worker tasks (call from inside the running loop)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def submit(self, key: str, job):
+        """Queue job() (an async callable) for key; blocks only if a bounded queue is full"""
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+        self._key_pending[key] = self._key_pending.get(key, 0) + 1
+        await self.queue.put((time.monotonic(), key, lock, job))
+        self.stats['submitted'] += 1
+        self.stats['max_depth'] = max(self.stats['max_depth'], self.queue.qsize())
+
+    async def join(self):
+        """Wait until every queued job has finished"""
+        await self.queue.join()
+
+    async def _worker(self, index: int):
+        while True:
+            submitted_at, key, lock, job = await self.queue.get()
+            try:
+                # Lock waiters are FIFO, and jobs are dequeued FIFO, so same-key jobs keep their order
+                async with lock:
+                    started = time.monotonic()
+                    self.wait_times.append(started - submitted_at)
+                    self.active += 1
+                    try:
+                        await job()
+                        self.stats['completed'] += 1
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.stats['failed'] += 1
+                        logger.error(f"Analysis job for {key} failed: {e}")
+                    finally:
+                        self.active -= 1
+                        self.run_times.append(time.monotonic() - started)
+                self._key_pending[key] -= 1
+                if not self._key_pending[key]:
+                    del self._key_pending[key]
+                    self._key_locks.pop(key, None)
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def _p95(samples) -> float:
+        values = sorted(samples)
+        return values[min(len(values) - 1, int(len(values) * 0.95))] if values else 0
+
+    def format_stats(self) -> str:
+        """Queue depth and wait/run times for the periodic scan log line"""
+        return (
+            f"analysis queue: depth {self.queue.qsize()} (max {self.stats['max_depth']}), active {self.active}/{self.workers} | "
+            f"wait p95 {self._p95(self.wait_times):.1f}s, run p95 {self._p95(self.run_times):.1f}s | "
+            f"done {self.stats['completed']}, failed {self.stats['failed']}"
+        )
@@ -0,0 +1,162 @@
+"""
+Base Flashblocks Consumer for Base Fair Launch Sniper Bot
+Decodes factory creation events from 200ms preconfirmed Flashblocks and reconciles them with sealed blocks
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+from hexbytes import HexBytes
+import websockets
+from log_scanner import FactoryLogScanner
+
+logger = logging.getLogger(__name__)
+
+# Flashblocks messages are brotli-compressed on the public endpoint (optional dependency)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+def decode_message(raw) -> Optional[dict]:
+    """Decode one Flashblocks websocket frame (plain JSON text/bytes or brotli-compressed JSON)"""
+    if isinstance(raw, str):
+        return json.loads(raw)
+    try:
+        return json.loads(raw.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        pass
+    if BROTLI_AVAILABLE:
+        return json.loads(brotli.decompress(raw).decode('utf-8'))
+    return None
+
+
+def extract_logs(flashblock: dict) -> List[dict]:
+    """Pull receipt logs out of a flashblock, in get_logs shape (HexBytes topics/data, int blockNumber)"""
+    metadata = flashblock.get('metadata') or {}
+    block_number = metadata.get('block_number')
+    if block_number is None:
+        base = flashblock.get('base') or {}
+        block_number = int(base['block_number'], 16) if base.get('block_number') else None
+    elif isinstance(block_number, str):
+        block_number = int(block_number, 16)
+
+    logs = []
+    for tx_hash, receipt in (metadata.get('receipts') or {}).items():
+        # Receipts are keyed by tx type ({"Eip1559": {...}}) on op-reth, plain on some builders
+        if 'logs' not in receipt and len(receipt) == 1:
+            receipt = next(iter(receipt.values()))
+        for index, raw in enumerate(receipt.get('logs') or []):
+            logs.append({
+                'address': raw.get('address'),
+                'topics': [HexBytes(t) for t in raw.get('topics', [])],
+                'data': HexBytes(raw.get('data', '0x')),
+                'blockNumber': block_number,
+                'transactionHash': HexBytes(tx_hash),
+                'logIndex': index,
+            })
+    return logs
+
+
+class FlashblocksConsumer:
+    """Streams Flashblocks and queues factory creation logs seen in preconfirmed transactions"""
+
+    def __init__(self, ws_url: str, scanner: FactoryLogScanner, reconnect_delay: float = 5,
+                 notify: Optional[asyncio.Event] = None):
+        self.ws_url = ws_url
+        self.scanner = scanner
+        self.reconnect_delay = reconnect_delay
+        self.notify = notify
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.connected = False
+        self.flashblocks_seen = 0
+        self._addresses = set()
+        self._seen_block = None
+        self._seen_logs = set()  # (tx_hash, index) already queued for the current block
+        self._warned_compressed = False
+
+    def drain(self) -> list:
+        """Take every queued (arrived_at, log, dex_id, config) without waiting"""
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def run(self):
+        """Consume the stream forever, reconnecting after drops"""
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20, ping_timeout=20, max_size=None) as ws:
+                    self.connected = True
+                    logger.info(f"⚡ Flashblocks stream connected: {self.ws_url}")
+                    async for raw in ws:
+                        self.handle_message(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Flashblocks stream error: {e}")
+            self.connected = False
+            await asyncio.sleep(self.reconnect_delay)
+
+    def handle_message(self, raw):
+        """Decode one frame and queue any factory creation logs it contains"""
+        try:
+            flashblock = decode_message(raw)
+        except Exception as e:
+            logger.debug(f"Undecodable flashblock frame: {e}")
+            return
+        if flashblock is None:
+            if not self._warned_compressed:
+                logger.warning("⚠️ Flashblocks frames are compressed - install 'brotli' to decode them")
+                self._warned_compressed = True
+            return
+
+        self.flashblocks_seen += 1
+        arrived_at = time.monotonic()
+        self._addresses = {a.lower() for a in self.scanner.log_filter()['address']}
+        for log in extract_logs(flashblock):
+            if str(log['address']).lower() not in self._addresses:
+                continue
+            if log['blockNumber'] != self._seen_block:
+                self._seen_block = log['blockNumber']
+                self._seen_logs = set()
+            key = (log['transactionHash'], log['logIndex'])
+            if key in self._seen_logs:
+                continue
+            routed = self.scanner.route(log)
+            if routed:
+                self._seen_logs.add(key)
+                self.queue.put_nowait((arrived_at, log, routed[0], routed[1]))
+                if self.notify:
+                    self.notify.set()
+
+
+class PreconfirmationLedger:
+    """Tracks pairs alerted from Flashblocks until a sealed-block scan confirms or drops them"""
+
+    def __init__(self):
+        self.pending: Dict[str, int] = {}  # "chain:pair" -> preconfirmed block number
+        self.confirmed = 0
+        self.dropped = 0
+
+    def add(self, pair_key: str, block: int):
+        """Remember a preconfirmed pair"""
+        self.pending[pair_key] = block
+
+    def reconcile(self, sealed_pair_keys: set, sealed_through: Optional[int]) -> dict:
+        """Match sealed pairs against pending ones; anything at/below sealed_through not seen was dropped"""
+        confirmed, dropped = [], []
+        for pair_key, block in list(self.pending.items()):
+            if pair_key in sealed_pair_keys:
+                confirmed.append(pair_key)
+                del self.pending[pair_key]
+            elif sealed_through is not None and block is not None and block <= sealed_through:
+                dropped.append(pair_key)
+                del self.pending[pair_key]
+        self.confirmed += len(confirmed)
+        self.dropped += len(dropped)
+        return {'confirmed': confirmed, 'dropped': dropped}
@@ -0,0 +1,132 @@
+"""
+Chain Head Tracker for Base Fair Launch Sniper Bot
+One cached block number per chain (refreshed on an interval or from newHeads) plus a small header LRU
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _as_int(value) -> Optional[int]:
+    """Header fields arrive as ints (web3) or hex strings (raw JSON-RPC)"""
+    if value is None:
+        return None
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _as_hex(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        value = value.hex()
+    value = str(value)
+    return value if value.startswith('0x') else '0x' + value
+
+
+class HeadTracker:
+    """
+    Serves the chain head and recent block timestamps to every component of one chain.
+    Reads within max_age of the last refresh are answered from cache; a stale read refreshes
+    once (concurrent callers share the same eth_blockNumber call).
+    """
+
+    def __init__(self, get_w3: Callable, chain: str = 'base', interval: float = 5,
+                 max_age: Optional[float] = None, header_cache_size: int = 256):
+        self.get_w3 = get_w3  # Callable so RPC failover (a new Web3 instance) is picked up
+        self.chain = chain
+        self.interval = interval
+        self.max_age = max_age if max_age is not None else interval * 2
+        self.head: Optional[int] = None
+        self.updated_at = 0.0
+        self.pushed_at = 0.0  # Last newHeads update (polling is skipped while these keep coming)
+        self.headers: OrderedDict = OrderedDict()  # number -> {'number', 'hash', 'parent_hash', 'timestamp'}
+        self.header_cache_size = header_cache_size
+        self.stats = {'served': 0, 'head_calls': 0, 'header_calls': 0, 'header_hits': 0, 'pushed': 0}
+        self._lock = threading.Lock()
+
+    def _set_head(self, number: int):
+        if self.head is None or number > self.head:
+            self.head = number
+        self.updated_at = time.monotonic()
+
+    def refresh(self) -> int:
+        """Fetch the head from the RPC now (blocking)"""
+        self.stats['head_calls'] += 1
+        number = self.get_w3().eth.block_number
+        self._set_head(number)
+        return self.head
+
+    def block_number(self) -> int:
+        """Cached head, refreshed if older than max_age (blocking only on a stale read)"""
+        self.stats['served'] += 1
+        if self.head is not None and time.monotonic() - self.updated_at <= self.max_age:
+            return self.head
+        with self._lock:
+            if self.head is not None and time.monotonic() - self.updated_at <= self.max_age:
+                return self.head
+            return self.refresh()
+
+    def observe_header(self, header: dict):
+        """Feed a newHeads notification (or any block header) into the cache"""
+        number = _as_int(header.get('number'))
+        if number is None:
+            return
+        self.stats['pushed'] += 1
+        self.pushed_at = time.monotonic()
+        self._set_head(number)
+        if header.get('timestamp') is not None:
+            self._remember(number, header)
+
+    def _remember(self, number: int, header: dict):
+        self.headers[number] = {
+            'number': number,
+            'hash': _as_hex(header.get('hash')),
+            'parent_hash': _as_hex(header.get('parentHash')),
+            'timestamp': _as_int(header.get('timestamp')),
+        }
+        self.headers.move_to_end(number)
+        while len(self.headers) > self.header_cache_size:
+            self.headers.popitem(last=False)
+
+    def get_header(self, number: int) -> dict:
+        """Header summary for a block, from the LRU or one eth_getBlockByNumber (blocking)"""
+        cached = self.headers.get(number)
+        if cached is not None:
+            self.stats['header_hits'] += 1
+            return cached
+        return self.fetch_header(number)
+
+    def fetch_header(self, number: int) -> dict:
+        """Fetch the canonical header from the RPC (bypassing the cache) and cache it"""
+        self.stats['header_calls'] += 1
+        block = self.get_w3().eth.get_block(number)
+        self._remember(number, block)
+        return self.headers[number]
+
+    def block_timestamp(self, number: int) -> int:
+        """Unix timestamp of a block"""
+        return self.get_header(number)['timestamp']
+
+    async def run(self, executor):
+        """Refresh the head once per interval (skipped while newHeads pushes keep it fresh)"""
+        while True:
+            try:
+                if time.monotonic() - self.pushed_at > self.interval:
+                    await executor.run(self.refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ {self.chain} head refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def format_stats(self) -> str:
+        """Short summary for the periodic scan log line"""
+        return (
+            f"head {self.head:,} | served {self.stats['served']} from {self.stats['head_calls']} eth_blockNumber, "
+            f"{self.stats['pushed']} pushed | headers: {self.stats['header_hits']} hit(s), {self.stats['header_calls']} fetched"
+        ) if self.head is not None else 'head unknown'
@@ -0,0 +1,147 @@
+"""
+Factory Log Scanner for Base Fair Launch Sniper Bot
+Fetches pair/pool creation logs for every DEX factory with a single eth_getLogs call
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+from web3 import Web3
+from block_range import AdaptiveBlockRange, provider_key, served_provider_key
+
+logger = logging.getLogger(__name__)
+
+# Error fragments returned by providers that don't accept an address list in eth_getLogs
+MULTI_ADDRESS_REJECTIONS = [
+    'cannot unmarshal array',
+    'multiple addresses',
+    'too many addresses',
+    'address list',
+    'addresses not supported',
+    'invalid address',
+]
+
+
+def is_multi_address_rejection(error: Exception) -> bool:
+    """Check if an eth_getLogs error means the provider rejected a multi-address filter"""
+    error_str = str(error).lower()
+    return any(fragment in error_str for fragment in MULTI_ADDRESS_REJECTIONS)
+
+
+class FactoryLogScanner:
+    """Scan a set of DEX factories for creation events, one filter per block window"""
+
+    def __init__(self, factories: Dict[str, dict], chain: str = 'base', combined: bool = True,
+                 block_range: Optional[AdaptiveBlockRange] = None):
+        self.factories = factories
+        self.chain = chain
+        self.combined = combined
+        self.block_range = block_range  # Splits wide windows into provider-sized chunks (None = one call)
+        self.unsupported_providers = set()  # Providers that rejected multi-address filters
+        self.clear_last_window()
+        self.totals = {'windows': 0, 'calls': 0, 'logs': 0, 'saved_calls': 0}
+
+    def clear_last_window(self):
+        """Forget the previous window (nothing was scanned this round)"""
+        self.last_window = {'mode': None, 'calls': 0, 'logs': 0, 'saved_calls': 0}
+
+    def _enabled_factories(self) -> Dict[str, dict]:
+        """Factories currently enabled in the config"""
+        return {dex_id: config for dex_id, config in self.factories.items() if config.get('enabled', True)}
+
+    def route(self, log) -> Optional[Tuple[str, dict]]:
+        """Find the factory (dex_id, config) that emitted a log"""
+        emitter = str(log['address']).lower()
+        topic0 = log['topics'][0].hex() if log['topics'] else ''
+        if not topic0.startswith('0x'):
+            topic0 = '0x' + topic0
+        for dex_id, config in self._enabled_factories().items():
+            if config['address'].lower() == emitter and config['event_topic'].lower() == topic0.lower():
+                return dex_id, config
+        return None
+
+    def fetch_logs(self, w3: Web3, from_block: int, to_block: int) -> List[Tuple[object, str, dict]]:
+        """Fetch creation logs in [from_block, to_block] as (log, dex_id, config) tuples"""
+        factories = self._enabled_factories()
+        self.last_window = {'mode': None, 'calls': 0, 'logs': 0, 'saved_calls': 0,
+                            'from_block': from_block, 'to_block': to_block}
+        if not factories:
+            return []
+
+        results = []
+        provider = provider_key(w3)
+        if self.combined and len(factories) > 1 and provider not in self.unsupported_providers:
+            try:
+                results = self._fetch_chunked(w3, from_block, to_block, self._fetch_combined, factories)
+                self.last_window['mode'] = 'combined'
+            except Exception as e:
+                if not is_multi_address_rejection(e):
+                    raise
+                logger.warning(f"⚠️ {self.chain} RPC rejected multi-address getLogs, falling back to per-factory calls: {e}")
+                self.unsupported_providers.add(served_provider_key(w3))  # The endpoint that rejected it
+
+        if self.last_window['mode'] is None:
+            results = self._fetch_chunked(w3, from_block, to_block, self._fetch_per_factory, factories)
+            self.last_window['mode'] = 'per_factory'
+
+        self.last_window['logs'] = len(results)
+        self.last_window['saved_calls'] = max(0, len(factories) - self.last_window['calls'])
+        self.totals['windows'] += 1
+        self.totals['calls'] += self.last_window['calls']
+        self.totals['logs'] += len(results)
+        self.totals['saved_calls'] += self.last_window['saved_calls']
+        logger.debug(
+            f"📡 {self.chain} window {from_block}-{to_block}: {self.last_window['calls']} getLogs call(s) "
+            f"({self.last_window['mode']}, saved {self.last_window['saved_calls']}), {len(results)} log(s)"
+        )
+        return results
+
+    def log_filter(self) -> dict:
+        """Address/topic filter covering every enabled factory (for getLogs or eth_subscribe)"""
+        factories = self._enabled_factories()
+        return {
+            'address': [Web3.to_checksum_address(config['address']) for config in factories.values()],
+            'topics': [list(dict.fromkeys(config['event_topic'].lower() for config in factories.values()))]
+        }
+
+    def _fetch_chunked(self, w3: Web3, from_block: int, to_block: int, fetch, factories: Dict[str, dict]) -> list:
+        """Run one fetch strategy over the window, chunked by the adaptive range controller if set"""
+        if self.block_range is None:
+            return fetch(w3, factories, from_block, to_block)
+        return self.block_range.fetch(w3, from_block, to_block, lambda a, b: fetch(w3, factories, a, b))
+
+    def _fetch_combined(self, w3: Web3, factories: Dict[str, dict], from_block: int, to_block: int) -> list:
+        """One eth_getLogs over every factory address and every distinct creation topic"""
+        self.last_window['calls'] += 1
+        logs = w3.eth.get_logs({
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block),
+            **self.log_filter()
+        })
+
+        results = []
+        for log in logs:
+            routed = self.route(log)
+            if routed:
+                results.append((log, routed[0], routed[1]))
+        return results
+
+    def _fetch_per_factory(self, w3: Web3, factories: Dict[str, dict], from_block: int, to_block: int) -> list:
+        """Legacy path: one eth_getLogs per factory"""
+        results = []
+        for dex_id, config in factories.items():
+            # Errors propagate: dropping one factory's logs would silently skip its pairs for this window
+            self.last_window['calls'] += 1
+            logs = w3.eth.get_logs({
+                'fromBlock': hex(from_block),
+                'toBlock': hex(to_block),
+                'address': Web3.to_checksum_address(config['address']),
+                'topics': [config['event_topic']]
+            })
+            results.extend((log, dex_id, config) for log in logs)
+        return results
+
+    def format_stats(self) -> str:
+        """Short summary of getLogs usage for the periodic scan log line"""
+        return (
+            f"getLogs: {self.totals['calls']} call(s) over {self.totals['windows']} window(s), "
+            f"saved {self.totals['saved_calls']}"
+        ) + (f" | {self.block_range.format_stats()}" if self.block_range else '')
@@ -0,0 +1,343 @@
+"""
+Multicall3 Batching for Base Fair Launch Sniper Bot
+Many eth_calls in one round trip via Multicall3.aggregate3 (allowFailure), with tolerant ERC20 decoding
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from eth_abi import decode as abi_decode, encode as abi_encode
+from eth_abi.exceptions import DecodingError
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+from block_range import provider_key, served_provider_key
+
+logger = logging.getLogger(__name__)
+
+# Same address on Base, Monad and most EVM chains
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+AGGREGATE3_SELECTOR = bytes.fromhex('82ad56cb')  # aggregate3((address,bool,bytes)[])
+
+ERC20_SELECTORS = {
+    'name': bytes.fromhex('06fdde03'),
+    'symbol': bytes.fromhex('95d89b41'),
+    'decimals': bytes.fromhex('313ce567'),
+    'totalSupply': bytes.fromhex('18160ddd'),
+    'owner': bytes.fromhex('8da5cb5b'),
+    'balanceOf': bytes.fromhex('70a08231'),
+    # Common anti-whale limit getters (not ERC20, but read alongside it)
+    '_maxTxAmount': bytes.fromhex('7d1db4a5'),
+    'maxTransactionAmount': bytes.fromhex('c8c8ebe4'),
+    '_maxWalletSize': bytes.fromhex('8f9a55c0'),
+    # Multicall3.getEthBalance(address) - native balance in the same batch (target is MULTICALL3_ADDRESS)
+    'getEthBalance': bytes.fromhex('4d2301cc'),
+}
+
+# Providers where Multicall3 isn't deployed (aggregate3 returned no data) - individual calls are used
+UNSUPPORTED_PROVIDERS = set()
+
+
+class CallResult(NamedTuple):
+    success: bool
+    data: bytes
+    definitive: bool = True  # False when the call failed for a transport reason (never cache it)
+
+
+def decode_string(data: bytes) -> Optional[str]:
+    """ABI string, or bytes32 for older tokens (MKR-style); None if nothing was returned"""
+    if not data:
+        return None
+    if len(data) == 32:
+        return data.rstrip(b'\0').decode('utf-8', 'replace')
+    try:
+        raw = abi_decode(['bytes'], data, strict=False)[0]
+    except (DecodingError, OverflowError, ValueError):
+        raw = data[:32].rstrip(b'\0')
+    return raw.decode('utf-8', 'replace').replace('\0', '')
+
+
+def decode_uint(data: bytes) -> Optional[int]:
+    return int.from_bytes(data[:32], 'big') if len(data) >= 32 else None
+
+
+def decode_address(data: bytes) -> Optional[str]:
+    return Web3.to_checksum_address(data[12:32]) if len(data) >= 32 else None
+
+
+FIELD_DECODERS = {
+    'name': decode_string,
+    'symbol': decode_string,
+    'decimals': decode_uint,
+    'totalSupply': decode_uint,
+    'owner': decode_address,
+    'balanceOf': decode_uint,
+    '_maxTxAmount': decode_uint,
+    'maxTransactionAmount': decode_uint,
+    '_maxWalletSize': decode_uint,
+    'getEthBalance': decode_uint,
+}
+
+# Fields that take one address argument (holder)
+ADDRESS_ARG_FIELDS = ('balanceOf', 'getEthBalance')
+
+
+def erc20_calldata(field: str, *args) -> bytes:
+    """Calldata for one ERC20 read (balanceOf/getEthBalance take the holder address)"""
+    selector = ERC20_SELECTORS[field]
+    if field in ADDRESS_ARG_FIELDS:
+        return selector + abi_encode(['address'], [Web3.to_checksum_address(args[0])])
+    return selector
+
+
+def _individual_calls(w3: Web3, calls: Sequence[Tuple[str, bytes]], block) -> List[CallResult]:
+    results = []
+    for target, data in calls:
+        try:
+            results.append(CallResult(True, bytes(w3.eth.call({'to': Web3.to_checksum_address(target), 'data': data}, block))))
+        except ContractLogicError:
+            results.append(CallResult(False, b''))
+        except Exception:
+            results.append(CallResult(False, b'', definitive=False))
+    return results
+
+
+def aggregate3(w3: Web3, calls: Sequence[Tuple[str, bytes]], block='latest') -> List[CallResult]:
+    """
+    Run (target, calldata) calls in one eth_call through Multicall3, each allowed to fail.
+    Falls back to one eth_call per target where Multicall3 isn't deployed; transport errors raise.
+    """
+    if not calls:
+        return []
+    if provider_key(w3) in UNSUPPORTED_PROVIDERS:
+        return _individual_calls(w3, calls, block)
+    payload = AGGREGATE3_SELECTOR + abi_encode(
+        ['(address,bool,bytes)[]'], [[(Web3.to_checksum_address(target), True, data) for target, data in calls]]
+    )
+    raw = w3.eth.call({'to': MULTICALL3_ADDRESS, 'data': payload}, block)
+    try:
+        decoded = abi_decode(['(bool,bytes)[]'], bytes(raw))[0]
+    except (DecodingError, OverflowError, ValueError):
+        # No code at the Multicall3 address on this chain/endpoint
+        provider = served_provider_key(w3)  # The endpoint that answered, not necessarily the preferred one
+        logger.warning(f"⚠️ Multicall3 not available on {provider} - using individual eth_calls")
+        UNSUPPORTED_PROVIDERS.add(provider)
+        return _individual_calls(w3, calls, block)
+    return [CallResult(success, bytes(data)) for success, data in decoded]
+
+
+def read_erc20(w3: Web3, requests: Sequence[tuple], block='latest') -> List[Optional[object]]:
+    """
+    Decode many ERC20 reads in one round trip. Each request is (token, field) or
+    (token, 'balanceOf', holder); failed or empty calls come back as None.
+    """
+    calls = [(request[0], erc20_calldata(request[1], *request[2:])) for request in requests]
+    values = []
+    for request, result in zip(requests, aggregate3(w3, calls, block)):
+        values.append(FIELD_DECODERS[request[1]](result.data) if result.success else None)
+    return values
+
+
+class TokenMetadata(NamedTuple):
+    address: str
+    name: Optional[str]
+    symbol: Optional[str]
+    decimals: Optional[int]
+    total_supply: Optional[int]
+    owner: Optional[str]
+
+    @property
+    def is_erc20(self) -> bool:
+        return None not in (self.name, self.symbol, self.decimals, self.total_supply)
+
+
+class TokenBalance(NamedTuple):
+    token: str  # MULTICALL3_ADDRESS for the native coin
+    holder: str
+    balance: Optional[int]
+    decimals: Optional[int]
+
+    @property
+    def formatted(self) -> Optional[float]:
+        if self.balance is None or self.decimals is None:
+            return None
+        return self.balance / (10 ** self.decimals)
+
+
+class _PendingBatch:
+    def __init__(self):
+        self.requests: Dict[tuple, int] = {}
+        self.callers = 0
+        self.done = threading.Event()
+        self.values: Dict[tuple, object] = {}
+        self.error: Optional[Exception] = None
+
+
+def _normalize(request: Sequence) -> tuple:
+    token, field, *args = request
+    if field not in ERC20_SELECTORS:
+        raise ValueError(f"Unknown token field: {field}")
+    return (Web3.to_checksum_address(token), field, *(Web3.to_checksum_address(a) for a in args))
+
+
+def _selector_key(request: tuple) -> str:
+    """Cache selector for a request ('0x' + 4-byte selector; requests with arguments never match the cache)"""
+    return '0x' + ERC20_SELECTORS[request[1]].hex() if len(request) == 2 else ''
+
+
+class TokenReadService:
+    """
+    Bulk ERC20 metadata/balance reads for every chain, served through Multicall3.
+    Callers arriving within `window` seconds of each other (threads, or coroutines via the a* methods)
+    share one aggregate3 per chain; duplicate requests are read once. Batches larger than
+    `max_calls` are split into several aggregate3 calls. A shared batch is charged (rpc_context)
+    to the caller that opened it. With an ImmutableReadCache, name/symbol/decimals come from the
+    cache (reverts included) and only the remaining reads go on-chain.
+    """
+
+    def __init__(self, w3_for: Callable[[str], Optional[Web3]], window: float = 0.005, max_calls: int = 200,
+                 timeout: float = 30.0, cache=None):
+        self.w3_for = w3_for
+        self.cache = cache  # read_cache.ImmutableReadCache (None = every read goes on-chain)
+        self.window = window
+        self.max_calls = max_calls
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _PendingBatch] = {}
+        self.stats: Counter = Counter()
+
+    def read(self, chain: str, requests: Iterable[Sequence]) -> List[Optional[object]]:
+        """Decoded values for (token, field) / (token, field, holder) requests, None where a call failed"""
+        requests = [_normalize(request) for request in requests]
+        if not requests:
+            return []
+        with self._lock:
+            batch = self._pending.get(chain)
+            leader = batch is None
+            if leader:
+                batch = self._pending[chain] = _PendingBatch()
+            batch.callers += 1
+            for request in requests:
+                batch.requests.setdefault(request, len(batch.requests))
+            self.stats['requests'] += len(requests)
+
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                if self._pending.get(chain) is batch:
+                    del self._pending[chain]
+            self._execute(chain, batch)
+        elif not batch.done.wait(self.timeout):
+            raise TimeoutError(f"Token read batch on {chain} did not finish in {self.timeout}s")
+
+        if batch.error is not None:
+            raise batch.error
+        return [batch.values.get(request) for request in requests]
+
+    def _execute(self, chain: str, batch: _PendingBatch):
+        try:
+            w3 = self.w3_for(chain)
+            if w3 is None:
+                raise ConnectionError(f"No Web3 connection for {chain}")
+            keys = list(batch.requests)
+            self.stats['unique'] += len(keys)
+            if self.cache is not None:
+                cached = self.cache.get_many(chain, [(key[0], _selector_key(key)) for key in keys])
+                for key in keys:
+                    entry = cached.get((key[0], _selector_key(key)))
+                    if entry is not None:
+                        batch.values[key] = FIELD_DECODERS[key[1]](entry.data) if entry.ok else None
+                self.stats['cached'] += len(batch.values)
+                keys = [key for key in keys if key not in batch.values]
+            for start in range(0, len(keys), self.max_calls):
+                chunk = keys[start:start + self.max_calls]
+                results = aggregate3(w3, [(key[0], erc20_calldata(key[1], *key[2:])) for key in chunk])
+                for key, result in zip(chunk, results):
+                    batch.values[key] = FIELD_DECODERS[key[1]](result.data) if result.success else None
+                if self.cache is not None:
+                    self.cache.put_many(chain, [(key[0], _selector_key(key), result.success, result.data)
+                                                for key, result in zip(chunk, results) if result.definitive])
+                self.stats['rpc_calls'] += 1
+            self.stats['batches'] += 1
+            self.stats['callers'] += batch.callers
+        except Exception as e:
+            batch.error = e
+            self.stats['errors'] += 1
+        finally:
+            batch.done.set()
+
+    def metadata(self, chain: str, tokens: Iterable[str],
+                 fields: Sequence[str] = ('name', 'symbol', 'decimals', 'totalSupply', 'owner')) -> Dict[str, TokenMetadata]:
+        """TokenMetadata per checksummed token (fields not requested stay None)"""
+        tokens = [Web3.to_checksum_address(token) for token in tokens]
+        values = dict(zip(((t, f) for t in tokens for f in fields),
+                          self.read(chain, [(t, f) for t in tokens for f in fields])))
+        return {
+            token: TokenMetadata(token, values.get((token, 'name')), values.get((token, 'symbol')),
+                                 values.get((token, 'decimals')), values.get((token, 'totalSupply')),
+                                 values.get((token, 'owner')))
+            for token in tokens
+        }
+
+    def balances(self, chain: str, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], TokenBalance]:
+        """
+        TokenBalance per (token, holder), decimals read in the same batch.
+        Pass MULTICALL3_ADDRESS as the token for the native balance (18 decimals).
+        """
+        pairs = [(Web3.to_checksum_address(t), Web3.to_checksum_address(h)) for t, h in pairs]
+        requests = []
+        for token, holder in pairs:
+            if token == MULTICALL3_ADDRESS:
+                requests.append((token, 'getEthBalance', holder))
+            else:
+                requests += [(token, 'balanceOf', holder), (token, 'decimals')]
+        values = dict(zip(requests, self.read(chain, requests)))
+        result = {}
+        for token, holder in pairs:
+            if token == MULTICALL3_ADDRESS:
+                result[(token, holder)] = TokenBalance(token, holder, values[(token, 'getEthBalance', holder)], 18)
+            else:
+                result[(token, holder)] = TokenBalance(token, holder, values[(token, 'balanceOf', holder)],
+                                                       values[(token, 'decimals')])
+        return result
+
+    def portfolio(self, chain: str, wallets: Iterable[str], tokens: Iterable[str]) -> Dict[str, List[TokenBalance]]:
+        """Native + token balances for every wallet in one sweep (one aggregate3 per max_calls reads)"""
+        wallets = [Web3.to_checksum_address(w) for w in wallets]
+        tokens = [MULTICALL3_ADDRESS] + [Web3.to_checksum_address(t) for t in tokens if t]
+        balances = self.balances(chain, [(token, wallet) for wallet in wallets for token in dict.fromkeys(tokens)])
+        portfolio = {wallet: [] for wallet in wallets}
+        for (token, wallet), balance in balances.items():
+            if token == MULTICALL3_ADDRESS and balance.balance is None:
+                # getEthBalance needs Multicall3 itself; chains without it get a plain eth_getBalance
+                try:
+                    balance = balance._replace(balance=self.w3_for(chain).eth.get_balance(wallet))
+                except Exception as e:
+                    logger.debug(f"Native balance for {wallet} on {chain} failed: {e}")
+            portfolio[wallet].append(balance)
+        return portfolio
+
+    @staticmethod
+    async def _in_thread(fn, *args, **kwargs):
+        context = contextvars.copy_context()  # Keep the caller's rpc_context for quota accounting
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: context.run(fn, *args, **kwargs))
+
+    async def aread(self, chain: str, requests: Iterable[Sequence]) -> List[Optional[object]]:
+        return await self._in_thread(self.read, chain, list(requests))
+
+    async def ametadata(self, chain: str, tokens: Iterable[str], **kwargs) -> Dict[str, TokenMetadata]:
+        return await self._in_thread(self.metadata, chain, list(tokens), **kwargs)
+
+    async def aportfolio(self, chain: str, wallets: Iterable[str], tokens: Iterable[str]) -> Dict[str, List[TokenBalance]]:
+        return await self._in_thread(self.portfolio, chain, list(wallets), list(tokens))
+
+    def format_stats(self) -> str:
+        batches = self.stats['batches']
+        if not batches:
+            return "🧮 token reads: idle"
+        return (f"🧮 token reads: {self.stats['requests']} request(s) -> {self.stats['unique']} unique "
+                f"({self.stats['cached']} cached) in {self.stats['rpc_calls']} aggregate3 call(s), "
+                f"{self.stats['callers'] / batches:.1f} caller(s)/batch"
+                + (f", {self.stats['errors']} failed batch(es)" if self.stats['errors'] else ''))
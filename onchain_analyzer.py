@@ -8,6 +8,8 @@ import time
 from collections import defaultdict
 from typing import Dict, List, Optional, Tuple
 from web3 import Web3
+from block_range import AdaptiveBlockRange
+from executors import TaskCancelled, raise_if_cancelled
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +24,23 @@ DEAD_ADDRESSES = [
 
 
 class OnChainAnalyzer:
-    def __init__(self, w3: Web3):
+    def __init__(self, w3: Web3, block_range: Optional[AdaptiveBlockRange] = None, head_tracker=None):
         self.w3 = w3
+        self.head_tracker = head_tracker  # Shared cached chain head (falls back to eth_blockNumber)
+        # Transfer-log chunk size adapts per provider: pass the chain scanner's controller so both share what
+        # they learn; standalone use gets its own (starts Alchemy-safe at 2000 blocks)
+        self.block_range = block_range or AdaptiveBlockRange(initial=2000, minimum=10, maximum=10000, step=500, name='transfer getLogs')
+    
+    def _current_block(self) -> int:
+        """Chain head from the shared tracker when available"""
+        if self.head_tracker is not None:
+            return self.head_tracker.block_number()
+        return self.w3.eth.block_number
     
     def _get_transfer_logs(self, token_address: str, from_block: int = 0, to_block: str = 'latest', max_blocks: int = 50000) -> list:
         """Fetch Transfer event logs for a token (respecting Alchemy block range limits)"""
         token = Web3.to_checksum_address(token_address)
-        current_block = self.w3.eth.block_number
+        current_block = self._current_block()
         
         if to_block == 'latest':
             to_block = current_block
@@ -37,27 +49,17 @@ class OnChainAnalyzer:
         if from_block == 0:
             from_block = max(0, to_block - max_blocks)
         
-        all_logs = []
-        chunk_size = 2000  # Alchemy-safe chunk size
-        
-        block = from_block
-        while block < to_block:
-            end = min(block + chunk_size, to_block)
-            try:
-                logs = self.w3.eth.get_logs({
-                    'fromBlock': hex(block),
-                    'toBlock': hex(end),
-                    'address': token,
-                    'topics': [TRANSFER_TOPIC]
-                })
-                all_logs.extend(logs)
-            except Exception as e:
-                logger.warning(f"Error fetching logs {block}-{end}: {e}")
-                # Try smaller chunk
-                chunk_size = max(500, chunk_size // 2)
-            block = end + 1
-        
-        return all_logs
+        def fetch_chunk(start: int, end: int) -> list:
+            raise_if_cancelled()  # Stop sweeping once an AnalysisTier deadline has passed
+            return self.w3.eth.get_logs({
+                'fromBlock': hex(start),
+                'toBlock': hex(end),
+                'address': token,
+                'topics': [TRANSFER_TOPIC]
+            })
+
+        # Every block is covered: failed chunks are retried smaller, unrecoverable errors propagate
+        return self.block_range.fetch(self.w3, from_block, to_block, fetch_chunk)
     
     def _parse_transfer(self, log) -> dict:
         """Parse a Transfer event log"""
@@ -73,11 +75,15 @@ class OnChainAnalyzer:
             'log_index': log['logIndex']
         }
     
-    def _get_deployer(self, token_address: str) -> Optional[str]:
+    def _get_deployer(self, token_address: str, transfers: list = None) -> Optional[str]:
         """Find the contract deployer address"""
+        # The deployer is the recipient of the first mint - usually already in the fetched transfers
+        mints = [tx for tx in transfers or [] if tx['from'] == ZERO_ADDRESS]
+        if mints:
+            return min(mints, key=lambda tx: (tx['block'], tx['log_index']))['to']
         try:
             token = Web3.to_checksum_address(token_address)
-            current_block = self.w3.eth.block_number
+            current_block = self._current_block()
             # Only search recent blocks (last ~50k) to avoid 503 from huge range queries
             from_block = max(0, current_block - 50000)
             # The deployer is the 'from' of the first Transfer (mint) from 0x0
@@ -268,7 +274,7 @@ class OnChainAnalyzer:
     
     def get_dev_info(self, token_address: str, transfers: list, total_supply: int = 0) -> dict:
         """Analyze the contract deployer/dev wallet"""
-        deployer = self._get_deployer(token_address)
+        deployer = self._get_deployer(token_address, transfers)
         
         if not deployer:
             return {
@@ -380,11 +386,17 @@ class OnChainAnalyzer:
         logs = self._get_transfer_logs(token_address)
         return [self._parse_transfer(log) for log in logs]
     
-    def analyze_token_onchain(self, token_address: str, pair_address: str = None, total_supply: int = 0, decimals: int = 18) -> dict:
+    def analyze_token_onchain(self, token_address: str, pair_address: str = None, total_supply: int = 0, decimals: int = 18,
+                              context=None) -> dict:
         """
         Master analysis function - runs all on-chain analytics.
         Returns a complete Soul Scanner-style analysis dict.
+        With the launch's analysis_context.TokenAnalysisContext, the analysis runs once per launch
+        (the DM alerts and the group post share it).
         """
+        if context is not None:
+            key = ('onchain', token_address.lower(), (pair_address or '').lower(), total_supply, decimals)
+            return context.cached(key, lambda: self.analyze_token_onchain(token_address, pair_address, total_supply, decimals))
         logger.info(f"🔍 Starting on-chain analysis for {token_address[:10]}...")
         start_time = time.time()
         
@@ -441,6 +453,8 @@ class OnChainAnalyzer:
                 'analysis_time': round(elapsed, 1)
             }
         
+        except TaskCancelled:
+            raise  # Abandoned by its caller: not an empty result worth memoizing
         except Exception as e:
             logger.error(f"On-chain analysis error: {e}")
             import traceback
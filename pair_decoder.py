@@ -0,0 +1,170 @@
+"""
+Factory Log Decoder for Base Fair Launch Sniper Bot
+Decodes pair/pool creation logs straight from topic/data bytes into compact records,
+filtering on precomputed byte-form quote/known token sets before any hex conversion
+"""
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from hexbytes import HexBytes
+
+logger = logging.getLogger(__name__)
+
+_ZERO_PREFIX = bytes(10)
+_ADDRESS_WORD = slice(12, 32)  # Address in a 32-byte topic / first data word
+_SECOND_ADDRESS_WORD = slice(44, 64)  # Address in the second data word
+_FIRST_WORD = slice(0, 32)
+_UINT24 = slice(29, 32)
+
+# Slice without HexBytes' Python-level __getitem__, and build records without NamedTuple.__new__'s
+# keyword handling - both dominate the per-log cost otherwise
+_slice = bytes.__getitem__
+_new_record = tuple.__new__
+
+
+def _address_bytes(address: str) -> bytes:
+    return bytes.fromhex(address[2:] if address.startswith('0x') else address)
+
+
+def _as_bytes(value) -> bytes:
+    """Topics/data are HexBytes (a bytes subclass) from web3; raw JSON-RPC hex strings are converted"""
+    return value if isinstance(value, bytes) else bytes(HexBytes(value))
+
+
+class PairCreated(NamedTuple):
+    """One decoded creation event (addresses are lowercase 0x-hex)"""
+    address: str
+    token0: str
+    token1: str
+    block: int
+    pair_type: str
+    dex_id: str
+    factory: dict
+    fee: Optional[int] = None  # V3 fee tier in hundredths of a bip (3000 = 0.3%)
+    tick_spacing: Optional[int] = None  # V3 only
+    stable: Optional[bool] = None  # Aerodrome/Velodrome only
+
+    def as_pool(self) -> dict:
+        """Pool dict in the shape the scan loop and analyzers use"""
+        pool = {
+            'address': self.address,
+            'token0': self.token0,
+            'token1': self.token1,
+            'block': self.block,
+            'pair_type': self.pair_type,
+            'dex_id': self.dex_id,
+            'dex_name': self.factory['name'],
+            'dex_emoji': self.factory['emoji'],
+        }
+        if self.fee is not None:
+            pool['fee'] = self.fee
+            pool['tick_spacing'] = self.tick_spacing
+        if self.stable is not None:
+            pool['stable'] = self.stable
+        return pool
+
+
+class FactoryLogDecoder:
+    """
+    Batch decoder for one chain's factory logs.
+
+    Layouts:
+      v2         PairCreated(address indexed token0, address indexed token1, address pair, uint)
+      v3         PoolCreated(address indexed token0, address indexed token1, uint24 indexed fee, int24 tickSpacing, address pool)
+      velodrome  PoolCreated(address indexed token0, address indexed token1, bool indexed stable, address pool, uint)
+                 (Velodrome V1 PairCreated carries stable unindexed: data = stable, pair, uint)
+    """
+
+    def __init__(self, quote_tokens: Dict[str, str], known_tokens: Iterable[str] = ()):
+        # First symbol wins for addresses declared twice (e.g. WMON/WETH on Monad); USDC is preferred as pair type
+        self.quote_tokens: Dict[bytes, str] = {}
+        for symbol, address in quote_tokens.items():
+            self.quote_tokens.setdefault(_address_bytes(address), symbol)
+        self.known_tokens = frozenset(self.quote_tokens) | frozenset(_address_bytes(a) for a in known_tokens)
+        self.stats = {'logs': 0, 'pairs': 0, 'not_quoted': 0, 'known': 0, 'invalid': 0, 'errors': 0}
+
+    def decode(self, log, dex_type: str, dex_id: str, factory: dict) -> Optional[PairCreated]:
+        """Decode one log; None if it isn't a trackable new-token pair"""
+        if factory.get('type') != dex_type:
+            factory = {**factory, 'type': dex_type}
+        records = self.decode_batch([(log, dex_id, factory)])
+        return records[0] if records else None
+
+    def decode_batch(self, routed_logs: Iterable[Tuple[object, str, dict]]) -> List[PairCreated]:
+        """
+        Decode routed (log, dex_id, factory_config) tuples into records, skipping logs that aren't
+        trackable launches. Malformed logs are counted and skipped, never raised.
+        """
+        quote_tokens = self.quote_tokens
+        known_tokens = self.known_tokens
+        records = []
+        logs = not_quoted = known = invalid = errors = 0
+        for log, dex_id, factory in routed_logs:
+            logs += 1
+            dex_type = factory['type']
+            try:
+                topics = log['topics']
+                if len(topics) < (4 if dex_type == 'v3' else 3):
+                    continue
+                token0 = _slice(_as_bytes(topics[1]), _ADDRESS_WORD)
+                token1 = _slice(_as_bytes(topics[2]), _ADDRESS_WORD)
+
+                # Only track pairs against a declared quote token (checked before the data is touched)
+                quote0 = quote_tokens.get(token0)
+                quote1 = quote_tokens.get(token1)
+                if quote0 is None and quote1 is None:
+                    not_quoted += 1
+                    continue
+                # Both sides already known (e.g. WETH/USDC, DAI/WETH) - not a launch
+                if token0 in known_tokens and token1 in known_tokens:
+                    known += 1
+                    continue
+
+                data = _as_bytes(log['data'])
+                fee = tick_spacing = stable = None
+                if dex_type == 'v2':
+                    pair = _slice(data, _ADDRESS_WORD)
+                elif dex_type == 'v3':
+                    fee = int.from_bytes(_slice(_as_bytes(topics[3]), _UINT24), 'big')
+                    tick_spacing = int.from_bytes(_slice(data, _FIRST_WORD), 'big', signed=True)
+                    pair = _slice(data, _SECOND_ADDRESS_WORD)
+                elif dex_type == 'velodrome':
+                    if len(topics) >= 4:
+                        stable = _as_bytes(topics[3])[-1] != 0
+                        pair = _slice(data, _ADDRESS_WORD)
+                    else:
+                        stable = data[31] != 0
+                        pair = _slice(data, _SECOND_ADDRESS_WORD)
+                else:
+                    continue
+                if len(pair) != 20:
+                    raise ValueError(f"{dex_type} log data too short ({len(data)} bytes)")
+
+                # Real addresses don't have 20+ leading zero nibbles
+                if pair[:10] == _ZERO_PREFIX and pair[10] < 0x10:
+                    invalid += 1
+                    logger.debug(f"Skipping invalid pair address (too many leading zeros): 0x{pair.hex()}")
+                    continue
+
+                pair_type = 'USDC' if 'USDC' in (quote0, quote1) else (quote0 or quote1)
+                records.append(_new_record(PairCreated, (
+                    '0x' + pair.hex(), '0x' + token0.hex(), '0x' + token1.hex(), log['blockNumber'],
+                    pair_type, dex_id, factory, fee, tick_spacing, stable
+                )))
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Failed to decode {factory.get('name', dex_id)} log: {e}")
+
+        stats = self.stats
+        stats['logs'] += logs
+        stats['pairs'] += len(records)
+        stats['not_quoted'] += not_quoted
+        stats['known'] += known
+        stats['invalid'] += invalid
+        stats['errors'] += errors
+        return records
+
+    def format_stats(self) -> str:
+        """Short summary for the periodic scan log line"""
+        s = self.stats
+        return (f"decoded {s['logs']} log(s) -> {s['pairs']} pair(s) | skipped: {s['not_quoted']} unquoted, "
+                f"{s['known']} known, {s['invalid']} invalid, {s['errors']} malformed")
@@ -0,0 +1,145 @@
+"""
+Seen-Pair Index for Base Fair Launch Sniper Bot
+Bounded in-memory LRU backed by the SQLite seen_pairs table, so dedupe survives restarts in fixed memory
+"""
+import hashlib
+import logging
+import math
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size set-membership filter: no false negatives, about `error_rate` false positives at capacity"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenPairIndex:
+    """
+    Set-like dedupe of "chain:pair" keys.
+    Membership is an O(1) LRU lookup; a miss is checked against an in-memory Bloom filter of every key on
+    disk, and SQLite is only consulted when the filter says the key may be there (a seen pair or ~1% of new
+    ones), so new pairs are normally rejected without touching the disk.
+    """
+
+    def __init__(self, db, max_size: int = 20000):
+        self.db = db
+        self.max_size = max_size
+        self._lru: OrderedDict = OrderedDict()  # key -> block
+        self._filter: Optional[BloomFilter] = None  # None = couldn't be built: every miss goes to disk
+        self.stats = {'hits': 0, 'misses': 0, 'disk_lookups': 0, 'disk_hits': 0, 'evictions': 0}
+        self._warm()
+
+    @staticmethod
+    def _normalize(key: str) -> str:
+        chain, _, address = key.partition(':')
+        return f"{chain}:{address.lower()}"
+
+    def _warm(self):
+        """Load the most recent pairs from disk (oldest first, so LRU order matches block order)"""
+        rows = self.db.get_recent_seen_pairs(self.max_size)
+        for chain, address, block in reversed(rows):
+            self._lru[f"{chain}:{address}"] = block
+        self._rebuild_filter()
+        if rows:
+            logger.info(f"🗂️ Seen-pair index warmed with {len(rows)} pair(s) from disk")
+
+    def __contains__(self, key: str) -> bool:
+        key = self._normalize(key)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.stats['hits'] += 1
+            return True
+        self.stats['misses'] += 1
+        if self._filter is not None and key not in self._filter:
+            return False  # Definitely never added
+        self.stats['disk_lookups'] += 1
+        chain, _, address = key.partition(':')
+        if self.db.is_pair_seen(chain, address):
+            self.stats['disk_hits'] += 1
+            self._remember(key, 0)
+            return True
+        return False
+
+    def _rebuild_filter(self, capacity: int = 0):
+        """Size the filter for every key on disk with room to grow (startup, after pruning, when full)"""
+        keys = self.db.get_seen_pair_keys()
+        if keys is None:
+            self._filter = None
+            return
+        self._filter = BloomFilter(max(capacity, 2 * len(keys), 4 * self.max_size))
+        for chain, address in keys:
+            self._filter.add(f"{chain}:{address}")
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _remember(self, key: str, block: int):
+        self._lru[key] = block
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def add(self, key: str, block: Optional[int] = None):
+        """Mark a pair as processed (memory + disk)"""
+        key = self._normalize(key)
+        self._remember(key, block or 0)
+        chain, _, address = key.partition(':')
+        self.db.add_seen_pair(chain, address, block or 0)
+        if self._filter is not None:
+            self._filter.add(key)
+            if self._filter.count > self._filter.capacity:
+                self._rebuild_filter(2 * self._filter.capacity)
+
+    def discard(self, key: str):
+        """Forget a pair so it is processed again"""
+        key = self._normalize(key)
+        self._lru.pop(key, None)
+        chain, _, address = key.partition(':')
+        self.db.remove_seen_pair(chain, address)
+
+    def keys_in_range(self, chain: str, from_block: int, to_block: int) -> list:
+        """In-memory keys for a chain's pairs created in [from_block, to_block] (used after a reorg)"""
+        prefix = f"{chain}:"
+        return [k for k, block in self._lru.items() if k.startswith(prefix) and from_block <= block <= to_block]
+
+    def prune(self, chain: str, below_block: int) -> int:
+        """Drop a chain's pairs created before below_block from memory and disk"""
+        prefix = f"{chain}:"
+        for key in [k for k, block in self._lru.items() if k.startswith(prefix) and 0 < block < below_block]:
+            del self._lru[key]
+        removed = self.db.prune_seen_pairs(chain, below_block)
+        if removed:
+            self._rebuild_filter()  # Pruned keys would otherwise keep costing disk lookups
+            logger.info(f"🧹 Pruned {removed} seen {chain} pair(s) below block {below_block:,}")
+        return removed
+
+    def format_stats(self) -> str:
+        """Short summary for the periodic scan log line"""
+        return (
+            f"dedupe: {len(self._lru)}/{self.max_size} in memory | hits {self.stats['hits']}, "
+            f"misses {self.stats['misses']} ({self.stats['disk_lookups']} looked up on disk), "
+            f"disk hits {self.stats['disk_hits']}, evictions {self.stats['evictions']}"
+        )
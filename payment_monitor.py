@@ -37,8 +37,9 @@ ERC20_ABI = [
 
 
 class PaymentMonitor:
-    def __init__(self, w3: Web3, db, payment_wallet: str, bot_app):
+    def __init__(self, w3: Web3, db, payment_wallet: str, bot_app, head_tracker=None):
         self.w3 = w3
+        self.head_tracker = head_tracker  # Shared cached Base head (falls back to eth_blockNumber)
         self.db = db
         self.payment_wallet = Web3.to_checksum_address(payment_wallet)
         self.bot_app = bot_app
@@ -49,16 +50,22 @@ class PaymentMonitor:
         self.processed_txs = set()  # Track processed transactions
         self.on_payment_received = None  # Callback for sponsorship processor
         
+    def _current_block(self) -> int:
+        """Base head from the shared tracker when available"""
+        if self.head_tracker is not None:
+            return self.head_tracker.block_number()
+        return self.w3.eth.block_number
+    
     async def start_monitoring(self):
         """Start monitoring for USDC payments"""
         logger.info(f"💰 Starting payment monitor for wallet: {self.payment_wallet}")
         
         # Get current block
-        last_block = self.w3.eth.block_number
+        last_block = self._current_block()
         
         while True:
             try:
-                current_block = self.w3.eth.block_number
+                current_block = self._current_block()
                 
                 if current_block > last_block:
                     # Check for new USDC transfers to payment wallet
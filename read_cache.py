@@ -0,0 +1,134 @@
+"""
+Immutable Read Cache for Base Fair Launch Sniper Bot
+Two-tier cache (in-process LRU backed by the SQLite immutable_reads table) for on-chain reads that
+never change: token name/symbol/decimals, pool token0/token1/factory and contract bytecode
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The only reads allowed in the cache (balances, totalSupply, owner, reserves... are mutable)
+IMMUTABLE_SELECTORS = frozenset({
+    '0x06fdde03',  # name()
+    '0x95d89b41',  # symbol()
+    '0x313ce567',  # decimals()
+    '0x0dfe1681',  # token0()
+    '0xd21220a7',  # token1()
+    '0xc45a0155',  # factory()
+    'eth_getCode',  # Deployed bytecode (empty code is never cached: the contract may not exist yet)
+})
+
+
+class CachedRead(NamedTuple):
+    ok: bool  # False = the call reverted (negative entry)
+    data: bytes
+    cached_at: float
+
+
+class ImmutableReadCache:
+    """
+    (chain, address, selector) -> raw call result.
+    Lookups hit the LRU first, then SQLite (one query per batch). Reverts are cached as negative
+    entries that expire after `negative_ttl` seconds; positive entries never expire.
+    """
+
+    def __init__(self, db, max_size: int = 50000, negative_ttl: float = 3600):
+        self.db = db
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self._lru: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'negative_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def cacheable(selector: str) -> bool:
+        return selector in IMMUTABLE_SELECTORS
+
+    def _fresh(self, entry: CachedRead, now: float) -> bool:
+        return entry.ok or now - entry.cached_at < self.negative_ttl
+
+    def _remember(self, key: tuple, entry: CachedRead):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get_many(self, chain: str, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], CachedRead]:
+        """Cached entries for (address, selector) keys; keys that aren't cached (or expired) are absent"""
+        now = time.time()
+        found, disk_keys = {}, []
+        with self._lock:
+            for address, selector in keys:
+                if not self.cacheable(selector):
+                    continue
+                key = (chain, address.lower(), selector)
+                entry = self._lru.get(key)
+                if entry is not None and self._fresh(entry, now):
+                    self._lru.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    self.stats['negative_hits'] += not entry.ok
+                    found[(address, selector)] = entry
+                else:
+                    disk_keys.append((address, selector))
+        if not disk_keys:
+            return found
+        rows = self.db.get_immutable_reads(chain, [(address.lower(), selector) for address, selector in disk_keys])
+        with self._lock:
+            for address, selector in disk_keys:
+                row = rows.get((address.lower(), selector))
+                entry = CachedRead(*row) if row is not None else None
+                if entry is None or not self._fresh(entry, now):
+                    self.stats['misses'] += 1
+                    continue
+                self.stats['disk_hits'] += 1
+                self.stats['negative_hits'] += not entry.ok
+                self._remember((chain, address.lower(), selector), entry)
+                found[(address, selector)] = entry
+        return found
+
+    def get(self, chain: str, address: str, selector: str) -> Optional[CachedRead]:
+        return self.get_many(chain, [(address, selector)]).get((address, selector))
+
+    def put_many(self, chain: str, results: Iterable[Tuple[str, str, bool, bytes]]):
+        """Store (address, selector, ok, data) results; mutable selectors and empty successes are skipped"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for address, selector, ok, data in results:
+                if not self.cacheable(selector) or (ok and not data):
+                    continue
+                self._remember((chain, address.lower(), selector), CachedRead(ok, bytes(data), now))
+                rows.append((address, selector, ok, bytes(data)))
+            self.stats['stores'] += len(rows)
+        self.db.save_immutable_reads(chain, rows)
+
+    def put(self, chain: str, address: str, selector: str, ok: bool, data: bytes):
+        self.put_many(chain, [(address, selector, ok, data)])
+
+    def get_code(self, w3, chain: str, address: str) -> bytes:
+        """eth_getCode through the cache (a deployed contract's code never changes)"""
+        cached = self.get(chain, address, 'eth_getCode')
+        if cached is not None:
+            return cached.data
+        code = bytes(w3.eth.get_code(address))
+        self.put(chain, address, 'eth_getCode', True, code)
+        return code
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def format_stats(self) -> str:
+        """Short summary for the periodic scan log line"""
+        return (
+            f"immutable reads: {len(self._lru)}/{self.max_size} in memory | hit rate {self.hit_rate:.0%} "
+            f"(memory {self.stats['memory_hits']}, disk {self.stats['disk_hits']}, negative {self.stats['negative_hits']}, "
+            f"misses {self.stats['misses']}), stored {self.stats['stores']}, evictions {self.stats['evictions']}"
+        )
@@ -0,0 +1,102 @@
+"""
+Reorg Detection for Base Fair Launch Sniper Bot
+Ring buffer of recently scanned block hashes; a changed hash at the tip means scanned blocks were reorged
+"""
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BlockHashRing:
+    """Fixed-size, block-ordered map of number -> hash for recently scanned blocks"""
+
+    def __init__(self, size: int = 64):
+        self.size = size
+        self.hashes: OrderedDict = OrderedDict()
+
+    def record(self, number: int, block_hash: str):
+        """Remember a block hash (keeps entries sorted by number, evicts the oldest)"""
+        out_of_order = bool(self.hashes) and number < next(reversed(self.hashes))
+        self.hashes[number] = block_hash
+        if out_of_order:
+            self.hashes = OrderedDict(sorted(self.hashes.items()))
+        while len(self.hashes) > self.size:
+            self.hashes.popitem(last=False)
+
+    def newest(self) -> Optional[Tuple[int, str]]:
+        if not self.hashes:
+            return None
+        number = next(reversed(self.hashes))
+        return number, self.hashes[number]
+
+    def oldest(self) -> Optional[int]:
+        return next(iter(self.hashes)) if self.hashes else None
+
+    def entries_desc(self):
+        """(number, hash) pairs newest first"""
+        return [(number, self.hashes[number]) for number in reversed(self.hashes)]
+
+    def truncate_above(self, number: int):
+        """Forget every block after number (they belong to the abandoned fork)"""
+        for n in [n for n in self.hashes if n > number]:
+            del self.hashes[n]
+
+
+class ReorgDetector:
+    """
+    Tracks the hash of each scanned window's tip. Any reorg that touches scanned blocks changes
+    the newest recorded hash, so checking that single block per cycle is enough; on a mismatch
+    the ring is walked back to the fork point to bound the range that needs re-scanning.
+    """
+
+    def __init__(self, head_tracker, chain: str = 'base', size: int = 64):
+        self.head_tracker = head_tracker
+        self.chain = chain
+        self.ring = BlockHashRing(size)
+        self.stats = {'checks': 0, 'reorgs': 0, 'max_depth': 0}
+
+    def _canonical_hash(self, number: int) -> Optional[str]:
+        """Hash the node currently considers canonical (always fetched, never cached)"""
+        return self.head_tracker.fetch_header(number)['hash']
+
+    def record(self, number: int):
+        """Remember the hash of a block that was just scanned (header cache first, e.g. from newHeads)"""
+        newest = self.ring.newest()
+        if newest and newest[0] >= number:
+            return
+        self.ring.record(number, self.head_tracker.get_header(number)['hash'])
+
+    def check(self) -> Optional[Tuple[int, int]]:
+        """Return the (from_block, to_block) range that was reorged, or None if the tip still matches"""
+        newest = self.ring.newest()
+        if newest is None:
+            return None
+        self.stats['checks'] += 1
+        tip, recorded = newest
+        canonical = self._canonical_hash(tip)
+        if canonical == recorded:
+            return None
+
+        # Walk back to the most recent block we scanned that is still canonical
+        fork_point = None
+        for number, block_hash in self.ring.entries_desc()[1:]:
+            if self._canonical_hash(number) == block_hash:
+                fork_point = number
+                break
+        if fork_point is None:
+            fork_point = self.ring.oldest() - 1  # Deeper than the ring - re-scan everything it covered
+            logger.warning(f"⚠️ {self.chain} reorg deeper than the {self.ring.size}-entry hash ring")
+
+        self.ring.truncate_above(fork_point)
+        self.ring.record(tip, canonical)
+        depth = tip - fork_point
+        self.stats['reorgs'] += 1
+        self.stats['max_depth'] = max(self.stats['max_depth'], depth)
+        logger.warning(f"🔀 {self.chain} reorg detected: blocks {fork_point + 1:,}-{tip:,} replaced (depth {depth})")
+        return fork_point + 1, tip
+
+    def format_stats(self) -> str:
+        """Short summary for the periodic scan log line"""
+        return f"reorgs: {self.stats['reorgs']} (max depth {self.stats['max_depth']}) over {self.stats['checks']} check(s)"
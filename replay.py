@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Replay Harness for Base Fair Launch Sniper Bot
+Runs a past block range (or a recorded log file) through the factory log decoder and analyze_token with
+alerts disabled, and reports pairs/sec, RPC calls per pair and per-stage latency.
+
+Usage:
+    python replay.py --fixture fixtures/replay_base.json                 # fully offline
+    python replay.py --fixture fixtures/replay_base.json --logs logs.jsonl
+    python replay.py --chain base --from-block N --to-block M --record out.json   # live, records a fixture
+"""
+import argparse
+import json
+import logging
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+from web3.providers.rpc import HTTPProvider
+from eth_abi import decode as abi_decode, encode as abi_encode
+from multicall import AGGREGATE3_SELECTOR, MULTICALL3_ADDRESS
+from ws_ingest import format_log, LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+def _call_key(method: str, params) -> str:
+    """Stable lookup key for a recorded request (addresses are matched case-insensitively)"""
+    return json.dumps([method, params], sort_keys=True, default=str).lower()
+
+
+def _log_id(raw: dict) -> tuple:
+    return raw.get('transactionHash'), raw.get('logIndex'), raw.get('blockHash')
+
+
+def _matches_filter(raw: dict, log_filter: dict) -> bool:
+    """eth_getLogs filter semantics for address (str or list), topics and block bounds"""
+    block = int(raw['blockNumber'], 16)
+    from_block, to_block = log_filter.get('fromBlock'), log_filter.get('toBlock')
+    if isinstance(from_block, str) and from_block.startswith('0x') and block < int(from_block, 16):
+        return False
+    if isinstance(to_block, str) and to_block.startswith('0x') and block > int(to_block, 16):
+        return False
+    addresses = log_filter.get('address')
+    if addresses:
+        addresses = [addresses] if isinstance(addresses, str) else addresses
+        if raw['address'].lower() not in {a.lower() for a in addresses}:
+            return False
+    for position, wanted in enumerate(log_filter.get('topics') or []):
+        if wanted is None:
+            continue
+        wanted = [wanted] if isinstance(wanted, str) else wanted
+        topics = raw.get('topics', [])
+        if position >= len(topics) or topics[position].lower() not in {t.lower() for t in wanted}:
+            return False
+    return True
+
+
+class RecordingProvider(HTTPProvider):
+    """HTTPProvider that counts every request and keeps raw responses for a replay fixture"""
+
+    def __init__(self, endpoint_uri: str, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.counts: Counter = Counter()
+        self.logs: Dict[tuple, dict] = {}
+        self.calls: Dict[str, dict] = {}
+
+    def make_request(self, method, params):
+        self.counts[method] += 1
+        response = super().make_request(method, params)
+        if method == 'eth_getLogs' and 'result' in response:
+            for raw in response['result']:
+                self.logs[_log_id(raw)] = raw
+        elif method != 'eth_blockNumber':
+            entry = {'method': method, 'params': params}
+            entry.update({k: response[k] for k in ('result', 'error') if k in response})
+            self.calls[_call_key(method, params)] = entry
+        return response
+
+    def to_fixture(self, chain: str, from_block: int, to_block: int) -> dict:
+        return {
+            'chain': chain,
+            'from_block': from_block,
+            'to_block': to_block,
+            'logs': sorted(self.logs.values(), key=lambda r: (int(r['blockNumber'], 16), int(r.get('logIndex', '0x0'), 16))),
+            'calls': list(self.calls.values()),
+        }
+
+
+class FixtureProvider(JSONBaseProvider):
+    """
+    Offline provider answering from a recorded fixture.
+    eth_getLogs is served by filtering the recorded logs, so changes to window sizing or
+    combined/per-factory mode still replay; Multicall3 aggregate3 is answered from the recorded
+    per-target calls (so batched and unbatched code replay the same fixture); other requests
+    must match a recorded call.
+    """
+
+    def __init__(self, fixture: dict):
+        super().__init__()
+        self.fixture = fixture
+        self.endpoint_uri = f"fixture://{fixture.get('chain', 'base')}"
+        self.logs = fixture.get('logs', [])
+        self.calls = {_call_key(c['method'], c['params']): c for c in fixture.get('calls', [])}
+        self.counts: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    def make_request(self, method, params):
+        self.counts[method] += 1
+        response = {'jsonrpc': '2.0', 'id': self.counts.total()}
+        if method == 'eth_getLogs':
+            response['result'] = [raw for raw in self.logs if _matches_filter(raw, params[0])]
+        elif method == 'eth_blockNumber':
+            response['result'] = hex(self.fixture['to_block'])
+        elif method == 'eth_chainId':
+            response['result'] = hex(self.fixture.get('chain_id', 8453))
+        elif (method == 'eth_call' and (params[0].get('to') or '').lower() == MULTICALL3_ADDRESS.lower()
+              and _call_key(method, params) not in self.calls):
+            response['result'] = self._aggregate3(params[0].get('data') or params[0].get('input'), params[1])
+        else:
+            recorded = self.calls.get(_call_key(method, params))
+            if recorded is None:
+                self.misses[method] += 1
+                response['error'] = {'code': -32000, 'message': f"execution reverted: {method} not in fixture"}
+            else:
+                response.update({k: recorded[k] for k in ('result', 'error') if k in recorded})
+        return response
+
+
+    def _aggregate3(self, data: str, block) -> str:
+        """Answer each aggregate3 sub-call from the recorded eth_calls (misses fail that sub-call only)"""
+        calls = abi_decode(['(address,bool,bytes)[]'], bytes.fromhex(data[2:])[len(AGGREGATE3_SELECTOR):])[0]
+        results = []
+        for target, _, calldata in calls:
+            recorded = self.calls.get(_call_key('eth_call', [{'to': target, 'data': '0x' + calldata.hex()}, block]))
+            if recorded is not None and 'result' in recorded:
+                results.append((True, bytes.fromhex(recorded['result'][2:])))
+            else:
+                if recorded is None:
+                    self.misses['aggregate3'] += 1
+                results.append((False, b''))
+        return '0x' + abi_encode(['(bool,bytes)[]'], [results]).hex()
+
+
+def load_log_file(path: str) -> List[dict]:
+    """Raw JSON-RPC logs from a JSON list or a JSON-lines file (e.g. captured from eth_subscribe)"""
+    with open(path) as f:
+        text = f.read().strip()
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def run_replay(bot, chain: str, from_block: Optional[int] = None, to_block: Optional[int] = None,
+               raw_logs: Optional[List[dict]] = None, analyze: bool = True) -> dict:
+    """
+    Detect and analyze pairs with the bot's own functions (no alerts are sent).
+    Either fetches factory logs for [from_block, to_block] through the chain's current Web3,
+    or decodes raw_logs directly. Returns counters and stage latency samples.
+    """
+    config = bot.chain_registry[chain]
+    provider = config.w3.provider
+    stages = LatencyTracker(max_samples=100000)
+    started = time.perf_counter()
+
+    t = time.perf_counter()
+    if raw_logs is None:
+        routed_logs = config.log_scanner.fetch_logs(config.w3, from_block, to_block)
+    else:
+        routed_logs = []
+        for raw in raw_logs:
+            log = format_log(raw)
+            routed = config.log_scanner.route(log)
+            if routed:
+                routed_logs.append((log, routed[0], routed[1]))
+    stages.record('fetch', time.perf_counter() - t)
+    fetch_calls = provider.counts.total()
+
+    t = time.perf_counter()
+    pairs = bot.decode_factory_logs(routed_logs, chain)
+    decode_time = time.perf_counter() - t
+    stages.record('decode', decode_time)
+
+    analyzed = 0
+    if analyze:
+        for pair in pairs:
+            t = time.perf_counter()
+            result = bot.analyze_token(
+                pair['address'], pair['token0'], pair['token1'],
+                dex_name=pair.get('dex_name', 'Unknown'), dex_emoji=pair.get('dex_emoji', '🔷'),
+                dex_id=pair.get('dex_id', 'unknown'), chain=chain
+            )
+            stages.record('analyze', time.perf_counter() - t)
+            analyzed += result is not None
+
+    elapsed = time.perf_counter() - started
+    analyze_calls = provider.counts.total() - fetch_calls
+    return {
+        'chain': chain,
+        'from_block': from_block,
+        'to_block': to_block,
+        'logs': len(routed_logs),
+        'pairs': len(pairs),
+        'analyzed': analyzed,
+        'elapsed': elapsed,
+        'pairs_per_sec': len(pairs) / elapsed if elapsed else 0.0,
+        'decode_per_log_us': decode_time / len(routed_logs) * 1e6 if routed_logs else 0.0,
+        'rpc_calls': dict(provider.counts),
+        'fetch_calls': fetch_calls,
+        'rpc_calls_per_pair': analyze_calls / len(pairs) if pairs else 0.0,
+        'fixture_misses': dict(getattr(provider, 'misses', {})),
+        'stages': {stage: stages.summary(stage) for stage in ('fetch', 'decode', 'analyze')},
+    }
+
+
+def format_report(stats: dict) -> str:
+    """Human-readable summary of a replay run"""
+    source = (f"blocks {stats['from_block']:,}-{stats['to_block']:,}" if stats['from_block'] is not None
+              else 'recorded log file')
+    lines = [
+        f"🔁 Replay {stats['chain']} {source}: {stats['logs']} log(s) -> {stats['pairs']} pair(s) -> {stats['analyzed']} analyzed",
+        f"   throughput: {stats['pairs_per_sec']:.1f} pairs/sec ({stats['elapsed'] * 1000:.1f}ms total), "
+        f"decode {stats['decode_per_log_us']:.1f}µs/log",
+        f"   RPC: {sum(stats['rpc_calls'].values())} call(s), {stats['fetch_calls']} for logs, "
+        f"{stats['rpc_calls_per_pair']:.1f} per pair | "
+        + ', '.join(f"{method} {count}" for method, count in sorted(stats['rpc_calls'].items())),
+    ]
+    for stage, s in stats['stages'].items():
+        if s['count']:
+            lines.append(f"   {stage:<8} n={s['count']} avg={s['avg'] * 1000:.2f}ms p50={s['p50'] * 1000:.2f}ms "
+                         f"p95={s['p95'] * 1000:.2f}ms max={s['max'] * 1000:.2f}ms")
+    if stats['fixture_misses']:
+        lines.append(f"   ⚠️ requests missing from fixture: {stats['fixture_misses']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay launch detection + analysis over past blocks (alerts disabled)')
+    parser.add_argument('--fixture', help='Recorded fixture JSON to replay offline')
+    parser.add_argument('--logs', help='Raw log file (JSON list or JSON lines) to decode instead of fetching a range')
+    parser.add_argument('--chain', default=None, help='Chain to replay (default: the fixture chain, else base)')
+    parser.add_argument('--from-block', type=int)
+    parser.add_argument('--to-block', type=int)
+    parser.add_argument('--record', help='Live mode: write the requests made during the run to this fixture file')
+    parser.add_argument('--no-analyze', action='store_true', help='Only fetch and decode')
+    parser.add_argument('--json', action='store_true', help='Print the raw stats as JSON')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    import sniper_bot as bot
+
+    fixture = None
+    if args.fixture:
+        with open(args.fixture) as f:
+            fixture = json.load(f)
+    chain = args.chain or (fixture or {}).get('chain', 'base')
+    config = bot.chain_registry[chain]
+
+    if fixture is not None:
+        config.w3 = Web3(FixtureProvider(fixture))
+    else:
+        url = config.router.endpoint_uri if config.router else config.rpc_urls[0]
+        config.w3 = Web3(RecordingProvider(url, request_kwargs={'timeout': config.rpc_timeout}))
+
+    # Every run measures cold reads, and fixture answers never reach the persistent cache in users.db
+    bot.token_reads.cache = None
+    bot.security_scanner.read_cache = None
+
+    raw_logs = load_log_file(args.logs) if args.logs else None
+    from_block = args.from_block if args.from_block is not None else (fixture or {}).get('from_block')
+    to_block = args.to_block if args.to_block is not None else (fixture or {}).get('to_block')
+    if raw_logs is None and (from_block is None or to_block is None):
+        parser.error('a block range (--from-block/--to-block or a fixture) or --logs is required')
+    if raw_logs is not None:
+        from_block = to_block = None
+
+    stats = run_replay(bot, chain, from_block, to_block, raw_logs=raw_logs, analyze=not args.no_analyze)
+    print(json.dumps(stats, indent=2) if args.json else format_report(stats))
+
+    if args.record and isinstance(config.w3.provider, RecordingProvider):
+        with open(args.record, 'w') as f:
+            json.dump(config.w3.provider.to_fixture(chain, from_block, to_block), f, indent=1)
+        print(f"💾 Fixture written to {args.record}")
+    return stats
+
+
+if __name__ == '__main__':
+    main()
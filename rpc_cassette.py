@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+RPC Cassettes for Base Fair Launch Sniper Bot
+Local JSON-RPC server that records real traffic into a cassette (same format as replay.py fixtures)
+or serves a cassette back offline, with configurable latency and injected 429/503/range-too-large
+errors. Anything that takes an RPC URL (Web3.HTTPProvider, BASE_RPC_URL, the RPC router) can point
+at it unchanged.
+
+Usage:
+    python rpc_cassette.py replay fixtures/replay_base.json --port 8545 --latency 0.05 --rate-limit 0.1
+    python rpc_cassette.py record --upstream https://mainnet.base.org --out cassette.json --port 8545
+    BASE_RPC_URL=http://127.0.0.1:8545 python verify_integration.py
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from replay import FixtureProvider, RecordingProvider
+
+logger = logging.getLogger(__name__)
+
+
+def _block_number(value, latest: int) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith('0x'):
+        return int(value, 16)
+    if value in (None, 'latest', 'safe', 'finalized', 'pending'):
+        return latest
+    return None
+
+
+class FaultPlan:
+    """
+    Latency and errors injected per request: a fixed delay plus jitter, a probability of an HTTP 429
+    or 503, and a getLogs block limit answered the way Alchemy does (so AdaptiveBlockRange learns it).
+    A seed makes the sequence of faults reproducible.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0,
+                 unavailable: float = 0.0, max_log_range: Optional[int] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit  # Probability of HTTP 429
+        self.unavailable = unavailable  # Probability of HTTP 503
+        self.max_log_range = max_log_range  # eth_getLogs spans above this get a range error (None = any span)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def http_error(self) -> Optional[int]:
+        """429, 503 or None for the next request"""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit:
+            return 429
+        if roll < self.rate_limit + self.unavailable:
+            return 503
+        return None
+
+    def range_error(self, method: str, params, latest: int) -> Optional[dict]:
+        if method != 'eth_getLogs' or self.max_log_range is None or not params:
+            return None
+        log_filter = params[0] or {}
+        if 'blockHash' in log_filter:
+            return None
+        start = _block_number(log_filter.get('fromBlock'), latest)
+        end = _block_number(log_filter.get('toBlock'), latest)
+        if start is None or end is None or end - start + 1 <= self.max_log_range:
+            return None
+        return {'code': -32600, 'message': (
+            f"Under the Free tier plan, you can make eth_getLogs requests with up to a {self.max_log_range} "
+            f"block range. Based on your parameters, this block range should work: [{hex(start)}, "
+            f"{hex(start + self.max_log_range - 1)}]"
+        )}
+
+
+class CassetteServer:
+    """
+    Threaded HTTP JSON-RPC endpoint in front of a provider: a FixtureProvider (replay) or a
+    RecordingProvider forwarding to a real RPC (record). Single and batch requests are supported.
+    """
+
+    def __init__(self, provider, faults: Optional[FaultPlan] = None, host: str = '127.0.0.1', port: int = 0):
+        self.provider = provider
+        self.faults = faults or FaultPlan()
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _latest(self) -> int:
+        fixture = getattr(self.provider, 'fixture', None)
+        return fixture['to_block'] if fixture else getattr(self.provider, 'latest_block', 0)
+
+    def answer(self, request: dict) -> dict:
+        """One JSON-RPC request through the provider (with the injected range errors)"""
+        method, params = request.get('method'), request.get('params') or []
+        self._count(method)
+        error = self.faults.range_error(method, params, self._latest())
+        if error is not None:
+            self._count('range_errors')
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': error}
+        try:
+            response = dict(self.provider.make_request(method, params))
+        except Exception as e:
+            response = {'error': {'code': -32603, 'message': f"upstream error: {e}"}}
+        response.update({'jsonrpc': '2.0', 'id': request.get('id')})
+        return response
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                delay = server.faults.delay()
+                if delay:
+                    time.sleep(delay)
+                status = server.faults.http_error()
+                if status is not None:
+                    server._count('rate_limited' if status == 429 else 'unavailable')
+                    message = 'Too Many Requests' if status == 429 else 'Service Unavailable'
+                    return self._reply(status, {'jsonrpc': '2.0', 'id': None,
+                                                'error': {'code': -32005 if status == 429 else -32603, 'message': message}},
+                                       {'Retry-After': '1'} if status == 429 else None)
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    return self._reply(400, {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}})
+                if isinstance(payload, list):
+                    return self._reply(200, [server.answer(request) for request in payload])
+                self._reply(200, server.answer(payload))
+
+            def _reply(self, status: int, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(f"cassette {self.address_string()} {format % args}")
+
+        return Handler
+
+    def start(self) -> 'CassetteServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='rpc-cassette', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'CassetteServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class CassetteRecorder(RecordingProvider):
+    """RecordingProvider that also remembers the chain head and chain id it saw (for the cassette header)"""
+
+    def __init__(self, endpoint_uri: str, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.latest_block = 0
+        self.chain_id: Optional[int] = None
+
+    def make_request(self, method, params):
+        response = super().make_request(method, params)
+        result = response.get('result') if isinstance(response, dict) else None
+        if method == 'eth_blockNumber' and result:
+            self.latest_block = max(self.latest_block, int(result, 16))
+        elif method == 'eth_chainId' and result:
+            self.chain_id = int(result, 16)
+        return response
+
+    def cassette(self, chain: str) -> dict:
+        """Everything recorded so far as a replay.py fixture"""
+        blocks = [int(raw['blockNumber'], 16) for raw in self.logs.values()]
+        to_block = max([self.latest_block] + blocks)
+        fixture = self.to_fixture(chain, min(blocks) if blocks else to_block, to_block)
+        if self.chain_id is not None:
+            fixture['chain_id'] = self.chain_id
+        return fixture
+
+    def save(self, path: str, chain: str = 'base'):
+        with open(path, 'w') as f:
+            json.dump(self.cassette(chain), f, indent=1)
+
+
+def load_cassette(path: str) -> FixtureProvider:
+    with open(path) as f:
+        return FixtureProvider(json.load(f))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local JSON-RPC endpoint that records or replays RPC cassettes')
+    sub = parser.add_subparsers(dest='mode', required=True)
+    replay_parser = sub.add_parser('replay', help='Serve a recorded cassette offline')
+    replay_parser.add_argument('cassette')
+    replay_parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    replay_parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    replay_parser.add_argument('--rate-limit', type=float, default=0.0, help='Probability of an HTTP 429')
+    replay_parser.add_argument('--unavailable', type=float, default=0.0, help='Probability of an HTTP 503')
+    replay_parser.add_argument('--max-log-range', type=int, help='eth_getLogs block limit (range errors above it)')
+    replay_parser.add_argument('--seed', type=int, help='Seed for reproducible faults')
+    record_parser = sub.add_parser('record', help='Proxy to a real RPC and record its answers')
+    record_parser.add_argument('--upstream', required=True)
+    record_parser.add_argument('--out', required=True)
+    record_parser.add_argument('--chain', default='base')
+    for sub_parser in (replay_parser, record_parser):
+        sub_parser.add_argument('--host', default='127.0.0.1')
+        sub_parser.add_argument('--port', type=int, default=8545)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.mode == 'replay':
+        provider = load_cassette(args.cassette)
+        faults = FaultPlan(args.latency, args.jitter, args.rate_limit, args.unavailable, args.max_log_range, args.seed)
+    else:
+        provider = CassetteRecorder(args.upstream, request_kwargs={'timeout': 30})
+        faults = None
+    server = CassetteServer(provider, faults, host=args.host, port=args.port).start()
+    logger.info(f"📼 {args.mode.title()}ing on {server.url} - e.g. BASE_RPC_URL={server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logger.info(f"📼 Served: {dict(server.stats)}")
+        if args.mode == 'record':
+            provider.save(args.out, args.chain)
+            logger.info(f"💾 Cassette written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
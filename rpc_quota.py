@@ -0,0 +1,221 @@
+"""
+RPC Quota for Base Fair Launch Sniper Bot
+Client-side rate limits per RPC endpoint (weighted token buckets with priority reserves) and a
+running compute-unit ledger per feature, so documented provider limits are respected instead of
+discovered through 429s
+"""
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Priority classes: alert-path reads first, background analytics last
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+# Bucket share each class must leave untouched (LOW can't drain the last 30% of an endpoint's burst)
+PRIORITY_RESERVE = {HIGH: 0.0, NORMAL: 0.1, LOW: 0.3}
+
+# Limiter weight per method, in eth_call-sized requests (unlisted methods weigh 1)
+METHOD_WEIGHTS = {
+    'eth_getLogs': 3,
+    'eth_sendRawTransaction': 2,
+    'eth_estimateGas': 2,
+    'debug_traceTransaction': 5,
+    'alchemy_getAssetTransfers': 5,
+}
+
+# Compute units per method for the ledger (Alchemy's published costs; unlisted methods cost 20)
+METHOD_COMPUTE_UNITS = {
+    'eth_chainId': 0,
+    'eth_blockNumber': 10,
+    'eth_gasPrice': 10,
+    'eth_getBalance': 19,
+    'eth_getTransactionCount': 26,
+    'eth_getBlockByNumber': 16,
+    'eth_getTransactionReceipt': 15,
+    'eth_call': 26,
+    'eth_getCode': 26,
+    'eth_estimateGas': 87,
+    'eth_getLogs': 75,
+    'eth_sendRawTransaction': 250,
+    'alchemy_getAssetTransfers': 150,
+}
+DEFAULT_COMPUTE_UNITS = 20
+
+_CONTEXT: ContextVar[Tuple[str, int]] = ContextVar('rpc_context', default=('other', NORMAL))
+_COUNTERS: ContextVar[Tuple[Counter, ...]] = ContextVar('rpc_counters', default=())
+
+
+@contextmanager
+def rpc_context(feature: str, priority: int = NORMAL):
+    """
+    Attribute RPC requests made inside the block (and in tasks created inside it) to a feature
+    and priority class. Thread pools only see it when the context is copied (ChainExecutor does).
+    """
+    token = _CONTEXT.set((feature, priority))
+    try:
+        yield
+    finally:
+        _CONTEXT.reset(token)
+
+
+def current_rpc_context() -> Tuple[str, int]:
+    return _CONTEXT.get()
+
+
+@contextmanager
+def count_rpc_calls(counter: Counter):
+    """
+    Count requests routed inside the block per method into `counter` (e.g. one launch's analysis).
+    Propagates like rpc_context; nested blocks count into every enclosing counter.
+    """
+    token = _COUNTERS.set(_COUNTERS.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _COUNTERS.reset(token)
+
+
+def note_rpc_call(method: str):
+    for counter in _COUNTERS.get():
+        counter[method] += 1
+
+
+def method_weight(method: str) -> float:
+    return METHOD_WEIGHTS.get(method, 1)
+
+
+def compute_units(method: str) -> int:
+    return METHOD_COMPUTE_UNITS.get(method, DEFAULT_COMPUTE_UNITS)
+
+
+class EndpointLimiter:
+    """
+    Thread-safe token bucket for one endpoint (requests/second with a burst allowance).
+    Lower priority classes must leave a reserve in the bucket for higher ones.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.throttled = 0  # Requests that found no room (routed elsewhere or waited)
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _floor(self, priority: int, cost: float) -> float:
+        # Never so high that the request could not fit in a full bucket
+        return min(PRIORITY_RESERVE.get(priority, 0.0) * self.burst, self.burst - cost)
+
+    def try_acquire(self, cost: float, priority: int = NORMAL) -> bool:
+        """Spend `cost` if it fits above the priority's reserve"""
+        cost = min(cost, self.burst)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens - cost < self._floor(priority, cost) - 1e-9:
+                self.throttled += 1
+                return False
+            self.tokens -= cost
+            return True
+
+    def wait_time(self, cost: float, priority: int = NORMAL) -> float:
+        """Seconds until `cost` would fit for this priority"""
+        cost = min(cost, self.burst)
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = cost + self._floor(priority, cost) - self.tokens
+            return max(0.0, missing / self.rate) if self.rate > 0 else 0.0
+
+    def force(self, cost: float):
+        """Spend without checking (a request that had to go out anyway); the bucket may go negative"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= min(cost, self.burst)
+
+
+def parse_rate_limits(text: str) -> Dict[str, object]:
+    """{host: rps} or {host: {"rps": r, "burst": b}} from JSON (empty text = no limits)"""
+    if not text or not text.strip():
+        return {}
+    limits = json.loads(text)
+    if not isinstance(limits, dict):
+        raise ValueError('RPC rate limits must be a JSON object of host -> rps')
+    for host, spec in limits.items():
+        rps = spec.get('rps') if isinstance(spec, dict) else spec
+        if not isinstance(rps, (int, float)) or rps <= 0:
+            raise ValueError(f"Invalid rate limit for {host}: {spec!r}")
+    return limits
+
+
+def limiter_for(url: str, limits: Optional[Dict[str, object]]) -> Optional[EndpointLimiter]:
+    """
+    Limiter for an endpoint from a {host: rps} or {host: {"rps": r, "burst": b}} map.
+    A key matches the endpoint host exactly or as a parent domain ("alchemy.com").
+    """
+    if not limits:
+        return None
+    host = (urlparse(url).hostname or url).lower()
+    for key, spec in limits.items():
+        key = key.lower()
+        if host == key or host.endswith('.' + key):
+            if isinstance(spec, dict):
+                return EndpointLimiter(float(spec['rps']), spec.get('burst'))
+            return EndpointLimiter(float(spec))
+    return None
+
+
+class QuotaLedger:
+    """Running request and compute-unit totals per feature and endpoint (shared by every chain's router)"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.requests: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.units: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, feature: str, host: str, method: str):
+        with self._lock:
+            self.requests[(feature, host)] += 1
+            self.units[(feature, host)] += compute_units(method)
+
+    def by_feature(self) -> Dict[str, int]:
+        totals: Dict[str, int] = defaultdict(int)
+        with self._lock:
+            for (feature, _), units in self.units.items():
+                totals[feature] += units
+        return dict(totals)
+
+    def by_host(self, host: str) -> Dict[str, int]:
+        """Compute units per feature on one endpoint (e.g. who burns the Alchemy budget)"""
+        with self._lock:
+            return {feature: units for (feature, h), units in self.units.items() if h == host}
+
+    def format_stats(self, top: int = 5) -> str:
+        features = sorted(self.by_feature().items(), key=lambda item: -item[1])
+        if not features:
+            return "📒 RPC quota: idle"
+        elapsed = max(1e-9, time.monotonic() - self.started_at)
+        total = sum(units for _, units in features) or 1
+        with self._lock:
+            requests = sum(self.requests.values())
+            hosts: Dict[str, int] = defaultdict(int)
+            for (_, host), units in self.units.items():
+                hosts[host] += units
+        busiest = max(hosts, key=hosts.get)
+        return (
+            f"📒 RPC quota: {requests} req, {sum(units for _, units in features):,} CU ({total / elapsed:.1f} CU/s) | "
+            + ', '.join(f"{feature} {units / total:.0%}" for feature, units in features[:top])
+            + f" | busiest {busiest}: "
+            + ', '.join(f"{feature} {units:,}" for feature, units in
+                        sorted(self.by_host(busiest).items(), key=lambda item: -item[1])[:3])
+        )
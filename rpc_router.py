@@ -0,0 +1,496 @@
+"""
+RPC Router for Base Fair Launch Sniper Bot
+One web3 provider per chain that spreads requests over every configured endpoint by health
+(latency EWMA, error rate, rate-limit state) with circuit breakers, background probing and
+client-side rate limits per endpoint
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from web3.providers.base import JSONBaseProvider
+from web3.providers.rpc import HTTPProvider
+from block_range import RATE_LIMIT_ERRORS
+from rpc_quota import NORMAL, QuotaLedger, current_rpc_context, limiter_for, method_weight, note_rpc_call
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Idempotent reads that may be sent twice (never writes or filters with server-side state)
+HEDGE_METHODS = ('eth_call', 'eth_getCode', 'eth_getLogs')
+
+# Answers that never change for a chain: the first successful one is reused
+# (web3's validation middleware asks for eth_chainId before every eth_call/transaction)
+STATIC_METHODS = ('eth_chainId', 'net_version')
+
+
+def _host(url: str) -> str:
+    """Endpoint label for logs (never includes API keys in the path)"""
+    return urlparse(url).netloc or url
+
+
+def _http_status(error: Exception) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    value = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_rate_limited(error_or_message) -> bool:
+    """429 responses and the rate-limit messages providers put in JSON-RPC errors"""
+    if isinstance(error_or_message, Exception) and _http_status(error_or_message) == 429:
+        return True
+    text = str(error_or_message).lower()
+    return any(fragment in text for fragment in RATE_LIMIT_ERRORS)
+
+
+class Endpoint:
+    """Health of one RPC endpoint"""
+
+    def __init__(self, url: str, index: int, timeout: float, ewma_alpha: float = 0.2, limiter=None):
+        self.url = url
+        self.index = index  # Configured priority (lower = preferred when health is equal)
+        self.provider = HTTPProvider(url, request_kwargs={'timeout': timeout}, exception_retry_configuration=None)
+        self.limiter = limiter  # rpc_quota.EndpointLimiter for documented provider limits (None = unlimited)
+        self.alpha = ewma_alpha
+        self.latency: Optional[float] = None  # EWMA seconds
+        self.error_rate = 0.0  # EWMA of failures (0..1)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.rate_limited_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.rate_limits = 0
+
+    @property
+    def label(self) -> str:
+        return _host(self.url)
+
+    def available(self, now: float) -> bool:
+        """Closed, or open with the cooldown elapsed (half-open: trial traffic until it succeeds or fails)"""
+        if self.rate_limited_until > now:
+            return False
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+        return self.state != OPEN
+
+    def score(self, default_latency: float) -> float:
+        """Lower is better: latency inflated by recent errors, nudged by configured priority"""
+        latency = self.latency if self.latency is not None else default_latency
+        return latency * (1 + 4 * self.error_rate) * (1 + 0.1 * self.index)
+
+    def record_success(self, seconds: float):
+        self.requests += 1
+        self.latency = seconds if self.latency is None else self.alpha * seconds + (1 - self.alpha) * self.latency
+        self.error_rate *= (1 - self.alpha)
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info(f"✅ RPC {self.label} recovered - circuit closed")
+        self.state = CLOSED
+        self.cooldown = 0.0
+
+    def record_failure(self, threshold: int, base_cooldown: float, max_cooldown: float):
+        self.requests += 1
+        self.failures += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        self.consecutive_failures += 1
+        # A failed half-open trial re-opens immediately, with a longer cooldown each time
+        if self.state == HALF_OPEN or self.consecutive_failures >= threshold:
+            self.cooldown = min(max_cooldown, self.cooldown * 2 if self.cooldown else base_cooldown)
+            self.state = OPEN
+            self.open_until = time.monotonic() + self.cooldown
+            logger.warning(f"⛔ RPC {self.label} circuit open for {self.cooldown:.0f}s after {self.consecutive_failures} failure(s)")
+
+    def record_rate_limit(self, retry_after: Optional[float], default_backoff: float):
+        self.requests += 1
+        self.rate_limits += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        self.rate_limited_until = time.monotonic() + (retry_after if retry_after is not None else default_backoff)
+
+    def format(self) -> str:
+        latency = f"{self.latency * 1000:.0f}ms" if self.latency is not None else '?'
+        state = '' if self.state == CLOSED else f" {self.state}"
+        limited = ' limited' if self.rate_limited_until > time.monotonic() else ''
+        throttled = f" throttled {self.limiter.throttled}" if self.limiter is not None and self.limiter.throttled else ''
+        return f"{self.label} {latency} err {self.error_rate:.0%}{state}{limited}{throttled}"
+
+
+class HedgePolicy:
+    """
+    When to send a duplicate read: after the method's p90 latency, and only while the method's
+    budget has tokens. Each request adds `budget` tokens (capped at `burst`), each hedge spends
+    one, so duplicates stay around `budget` x traffic per method.
+    """
+
+    def __init__(self, budget: float = 0.1, burst: float = 5, methods=HEDGE_METHODS, min_delay: float = 0.05,
+                 default_delay: float = 0.5, samples: int = 200, min_samples: int = 20):
+        self.budget = budget
+        self.burst = burst
+        self.methods = frozenset(methods)
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.latencies: Dict[str, deque] = {m: deque(maxlen=samples) for m in self.methods}
+        self.tokens: Dict[str, float] = {m: burst for m in self.methods}
+        self.stats: Dict[str, Dict[str, int]] = {m: {'requests': 0, 'hedged': 0, 'won': 0, 'denied': 0} for m in self.methods}
+        self._lock = threading.Lock()
+
+    def applies(self, method) -> bool:
+        return method in self.methods
+
+    def record_latency(self, method, seconds: float):
+        if method in self.latencies:
+            self.latencies[method].append(seconds)
+
+    def delay(self, method) -> float:
+        """p90 of recent successful latencies for the method (default until enough samples)"""
+        samples = self.latencies[method]
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        ordered = sorted(samples)
+        return max(self.min_delay, ordered[int(len(ordered) * 0.9) - 1])
+
+    def note_request(self, method):
+        with self._lock:
+            self.stats[method]['requests'] += 1
+            self.tokens[method] = min(self.burst, self.tokens[method] + self.budget)
+
+    def spend(self, method) -> bool:
+        with self._lock:
+            if self.tokens[method] < 1:
+                self.stats[method]['denied'] += 1
+                return False
+            self.tokens[method] -= 1
+            self.stats[method]['hedged'] += 1
+            return True
+
+    def format_stats(self) -> str:
+        parts = [
+            f"{m} {s['hedged']}/{s['requests']} hedged ({s['won']} won, {s['denied']} over budget, "
+            f"delay {self.delay(m) * 1000:.0f}ms)"
+            for m, s in sorted(self.stats.items()) if s['requests']
+        ]
+        return 'hedge: ' + (' | '.join(parts) if parts else 'idle')
+
+
+def _on_event_loop() -> bool:
+    """True when called from the thread running an asyncio loop (sleeping there stalls every task)"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class RpcRouter(JSONBaseProvider):
+    """
+    Web3 provider that routes each request to the healthiest endpoint and fails over to the
+    next on transport errors, 5xx or rate limits. JSON-RPC errors (reverts, range limits) are
+    endpoint answers and are returned unchanged. Every component of a chain shares one
+    Web3(RpcRouter), so a failover applies everywhere at once.
+    Endpoints with a documented limit get a weighted token bucket: a request only goes to an
+    endpoint with room for it at its priority (rpc_quota.rpc_context), otherwise the next one,
+    otherwise it waits for the first bucket to refill. Every request is charged to its feature
+    in the shared QuotaLedger.
+    """
+
+    def __init__(self, urls: List[str], timeout: float = 10, name: str = 'rpc', max_attempts: int = 3,
+                 failure_threshold: int = 3, base_cooldown: float = 10, max_cooldown: float = 300,
+                 rate_limit_backoff: float = 10, default_latency: float = 0.5, hedge: Optional[HedgePolicy] = None,
+                 limits: Optional[Dict[str, object]] = None, ledger: Optional[QuotaLedger] = None,
+                 max_throttle_wait: float = 5.0, probe_deadline: Optional[float] = None):
+        super().__init__()
+        self.name = name
+        self.endpoints = [Endpoint(url, i, timeout, limiter=limiter_for(url, limits))
+                          for i, url in enumerate(dict.fromkeys(u for u in urls if u))]
+        self.max_attempts = max_attempts
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.rate_limit_backoff = rate_limit_backoff
+        self.default_latency = default_latency
+        self.stats = {'requests': 0, 'failovers': 0, 'exhausted': 0, 'throttled': 0, 'over_limit': 0, 'static_hits': 0}
+        self._static: Dict[str, dict] = {}  # STATIC_METHODS responses
+        self.ledger = ledger
+        self.max_throttle_wait = max_throttle_wait  # Longest a request waits for rate-limit room before going anyway
+        self.throttle_wait = 0.0  # Total seconds requests spent waiting for rate-limit room
+        self.hedge = hedge  # None = never send duplicate reads
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # When set, the first request probes the pool (concurrently, within this many seconds) unless probe_all ran
+        self.probe_deadline = probe_deadline
+        self.probed = probe_deadline is None
+        self._probe_lock = threading.Lock()
+        self._served = threading.local()  # Endpoint that answered this thread's last request
+
+    @property
+    def endpoint_uri(self) -> str:
+        """URI of the currently preferred endpoint (the one the next request will most likely go to)"""
+        best = self.pick()
+        return best.url if best else (self.endpoints[0].url if self.endpoints else '')
+
+    def served_uri(self) -> Optional[str]:
+        """
+        URI of the endpoint that answered (or failed) the last request made from the calling thread.
+        After a failover or a hedged read this differs from endpoint_uri; per-provider limits learned
+        from an answer (getLogs range, multi-address filters, Multicall3) belong to this one.
+        """
+        return getattr(self._served, 'url', None)
+
+    def _serve(self, endpoint: Optional[Endpoint]):
+        if endpoint is not None:
+            self._served.url = endpoint.url
+
+    def pick(self, exclude=()) -> Optional[Endpoint]:
+        """Healthiest available endpoint; if none is available, the one that becomes available first"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            available = [e for e in candidates if e.available(now)]
+            if available:
+                return min(available, key=lambda e: e.score(self.default_latency))
+            if candidates:
+                return min(candidates, key=lambda e: max(e.open_until if e.state == OPEN else 0, e.rate_limited_until))
+        return None
+
+    def _acquire(self, method, priority: int = NORMAL, exclude=(), wait: bool = True) -> Optional[Endpoint]:
+        """
+        Healthiest available endpoint with rate-limit room for this request (the room is spent).
+        If every candidate is at its limit: None when not waiting, else sleep until the first
+        bucket refills - past max_throttle_wait (at once on the event loop thread) the best endpoint
+        gets the request over its limit.
+        """
+        cost = method_weight(method)
+        # A sync call made on the event loop thread (a command handler) must never sleep there: no waiting
+        deadline = time.monotonic() + (0 if _on_event_loop() else self.max_throttle_wait)
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                available = sorted((e for e in self.endpoints if e not in exclude and e.available(now)),
+                                   key=lambda e: e.score(self.default_latency))
+            if not available:
+                return self.pick(exclude)
+            for endpoint in available:
+                if endpoint.limiter is None or endpoint.limiter.try_acquire(cost, priority):
+                    return endpoint
+            if not wait:
+                return None
+            delay = min(e.limiter.wait_time(cost, priority) for e in available)
+            if now + delay > deadline:
+                self.stats['over_limit'] += 1
+                available[0].limiter.force(cost)
+                return available[0]
+            self.stats['throttled'] += 1
+            self.throttle_wait += delay
+            time.sleep(delay)
+
+    def _send(self, endpoint: Endpoint, method, params, feature: str = 'other'):
+        """
+        One attempt on one endpoint, recording its health (and the request in the quota ledger).
+        Returns (response, error, retry): retry is True when another endpoint should be tried.
+        """
+        if self.ledger is not None:
+            self.ledger.record(feature, endpoint.label, method)
+        start = time.monotonic()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception as e:
+            with self._lock:
+                if is_rate_limited(e):
+                    endpoint.record_rate_limit(_retry_after(e), self.rate_limit_backoff)
+                else:
+                    endpoint.record_failure(self.failure_threshold, self.base_cooldown, self.max_cooldown)
+            return None, e, True
+        error = response.get('error') if isinstance(response, dict) else None
+        if error and is_rate_limited(error.get('message', '') if isinstance(error, dict) else error):
+            with self._lock:
+                endpoint.record_rate_limit(None, self.rate_limit_backoff)
+            return response, None, True
+        elapsed = time.monotonic() - start
+        with self._lock:
+            endpoint.record_success(elapsed)
+        if self.hedge is not None:
+            self.hedge.record_latency(method, elapsed)
+        return response, None, False
+
+    def _hedged(self, method, params, tried: list, feature: str, priority: int):
+        """
+        Send to the best endpoint; if it hasn't answered within the hedge delay (and the budget
+        allows), send the same read to the next-best endpoint and take whichever answers first.
+        The slower request is left to finish in the background (it still updates health).
+        Returns (response, last_response, last_error); response is None if both attempts failed.
+        """
+        self.hedge.note_request(method)
+        primary = self._acquire(method, priority)
+        if primary is None:
+            return None, None, None
+        tried.append(primary)
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix=f"{self.name}-hedge")
+        first = self._hedge_pool.submit(self._send, primary, method, params, feature)
+        try:
+            response, error, retry = first.result(timeout=self.hedge.delay(method))
+            self._serve(primary)
+            return (None if retry else response), response, error
+        except FutureTimeout:
+            pass
+
+        # A hedge never waits for rate-limit room: it only goes where there is some
+        backup = self._acquire(method, priority, exclude=tried, wait=False)
+        if backup is None or not self.hedge.spend(method):
+            response, error, retry = first.result()
+            self._serve(primary)
+            return (None if retry else response), response, error
+        tried.append(backup)
+        logger.debug(f"{self.name} {method}: {primary.label} slow, hedging to {backup.label}")
+        second = self._hedge_pool.submit(self._send, backup, method, params, feature)
+
+        pending = {first, second}
+        last_response, last_error = None, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                response, error, retry = future.result()
+                self._serve(backup if future is second else primary)
+                if not retry:
+                    if future is second:
+                        self.hedge.stats[method]['won'] += 1
+                    return response, response, None
+                last_response, last_error = response, error
+        return None, last_response, last_error
+
+    def make_request(self, method, params):
+        if method in STATIC_METHODS:
+            cached = self._static.get(method)
+            if cached is not None:
+                self.stats['static_hits'] += 1
+                return dict(cached)
+            response = self._route(method, params)
+            if isinstance(response, dict) and 'result' in response:
+                self._static[method] = response
+            return response
+        return self._route(method, params)
+
+    def _ensure_probed(self):
+        with self._probe_lock:
+            if not self.probed:
+                self.probe_all(deadline=self.probe_deadline, quorum=1)
+
+    def _route(self, method, params):
+        if not self.probed:
+            self._ensure_probed()
+        self.stats['requests'] += 1
+        note_rpc_call(method)
+        feature, priority = current_rpc_context()
+        tried = []
+        last_response, last_error = None, None
+        if self.hedge is not None and self.hedge.applies(method) and len(self.endpoints) > 1:
+            response, last_response, last_error = self._hedged(method, params, tried, feature, priority)
+            if response is not None:
+                return response
+        for _ in range(min(self.max_attempts, len(self.endpoints)) - len(tried)):
+            endpoint = self._acquire(method, priority, exclude=tried)
+            if endpoint is None:
+                break
+            if tried:
+                self.stats['failovers'] += 1
+                logger.debug(f"{self.name} {method}: failing over to {endpoint.label} ({last_error or 'rate limited'})")
+            tried.append(endpoint)
+            response, error, retry = self._send(endpoint, method, params, feature)
+            self._serve(endpoint)
+            if not retry:
+                return response
+            last_response, last_error = response, error
+        self.stats['exhausted'] += 1
+        if last_response is not None:
+            return last_response
+        raise last_error or ConnectionError(f"No {self.name} RPC endpoint configured")
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            response = self.make_request('eth_blockNumber', [])
+            return 'result' in response
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+
+    def trip(self, endpoint: Optional[Endpoint] = None):
+        """Open the breaker on an endpoint (default: the preferred one) so traffic moves elsewhere"""
+        endpoint = endpoint or self.pick()
+        if endpoint is None:
+            return
+        with self._lock:
+            endpoint.consecutive_failures = self.failure_threshold - 1
+            endpoint.record_failure(self.failure_threshold, self.base_cooldown, self.max_cooldown)
+
+    def probe(self, endpoint: Endpoint) -> bool:
+        """eth_blockNumber on one endpoint (closes its breaker on success)"""
+        response, error, retry = self._send(endpoint, 'eth_blockNumber', [], 'probe')
+        return not retry and 'result' in response
+
+    def probe_all(self, deadline: Optional[float] = None, quorum: Optional[int] = None) -> int:
+        """
+        Probe every endpoint concurrently; returns how many answered healthy. Returns early once
+        `quorum` endpoints are healthy or after `deadline` seconds - the remaining probes finish in
+        the background and still record their endpoint's health, so startup waits for the fastest
+        healthy endpoint rather than the slowest timeout.
+        """
+        self.probed = True
+        if not self.endpoints:
+            return 0
+        pool = ThreadPoolExecutor(max_workers=len(self.endpoints), thread_name_prefix=f"{self.name}-probe")
+        pending = {pool.submit(self.probe, endpoint) for endpoint in self.endpoints}
+        pool.shutdown(wait=False)
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+        healthy = 0
+        while pending and (quorum is None or healthy < quorum):
+            timeout = max(0.0, stop_at - time.monotonic()) if stop_at is not None else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            healthy += sum(1 for future in done if future.exception() is None and future.result())
+        return healthy
+
+    async def run(self, executor, interval: float = 15):
+        """Background probing: give open-circuit endpoints their half-open trial off the request path"""
+        while True:
+            try:
+                now = time.monotonic()
+                for endpoint in self.endpoints:
+                    if endpoint.state != CLOSED and now >= endpoint.open_until:
+                        await executor.run(self.probe, endpoint)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"{self.name} RPC probe failed: {e}")
+            await asyncio.sleep(interval)
+
+    def format_stats(self) -> str:
+        """Short summary for the periodic scan log line"""
+        ranked = sorted(self.endpoints, key=lambda e: e.score(self.default_latency))
+        summary = (
+            f"rpc: {self.stats['requests']} req ({self.stats['static_hits']} chainId cached), {self.stats['failovers']} failover(s), "
+            f"{self.stats['exhausted']} exhausted"
+            + (f", {self.stats['throttled']} throttled ({self.throttle_wait:.1f}s), {self.stats['over_limit']} over limit"
+               if any(e.limiter is not None for e in self.endpoints) else '')
+            + ' | ' + ', '.join(e.format() for e in ranked[:4])
+        )
+        return f"{summary} | {self.hedge.format_stats()}" if self.hedge is not None else summary
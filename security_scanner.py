@@ -29,13 +29,19 @@ DANGEROUS_FUNCTIONS = {
 
 
 class SecurityScanner:
-    def __init__(self, w3: Web3):
+    def __init__(self, w3: Web3, read_cache=None, chain: str = 'base'):
         self.w3 = w3
+        self.read_cache = read_cache  # read_cache.ImmutableReadCache: bytecode is fetched once per token
+        self.chain = chain
     
-    def scan_token(self, token_address: str) -> Dict:
+    def scan_token(self, token_address: str, context=None) -> Dict:
         """
         Comprehensive security scan of a token
         
+        Args:
+            context: the launch's analysis_context.TokenAnalysisContext (bytecode and owner() are
+                     read through it, so reads analyze_token already made aren't repeated)
+        
         Returns:
             dict with security analysis results
         """
@@ -51,7 +57,7 @@ class SecurityScanner:
         
         try:
             # Run all security checks
-            rug_check = self.check_rug_indicators(token_address)
+            rug_check = self.check_rug_indicators(token_address, context=context)
             lp_check = self.check_lp_lock(token_address)
             honeypot_check = self.check_honeypot(token_address)
             
@@ -127,13 +133,18 @@ class SecurityScanner:
                 'score': 0
             }
     
-    def check_rug_indicators(self, token_address: str) -> Dict:
+    def check_rug_indicators(self, token_address: str, context=None) -> Dict:
         """Check for common rug pull indicators"""
         try:
             token_checksum = Web3.to_checksum_address(token_address)
             
-            # Get contract bytecode
-            bytecode = self.w3.eth.get_code(token_checksum).hex()
+            # Get contract bytecode (immutable once deployed)
+            if context is not None:
+                bytecode = context.code(token_checksum).hex()
+            elif self.read_cache is not None:
+                bytecode = self.read_cache.get_code(self.w3, self.chain, token_checksum).hex()
+            else:
+                bytecode = self.w3.eth.get_code(token_checksum).hex()
             
             results = {
                 'ownership_renounced': False,
@@ -158,15 +169,7 @@ class SecurityScanner:
             
             # Check ownership (try to call owner function)
             try:
-                owner_abi = [{
-                    "constant": True,
-                    "inputs": [],
-                    "name": "owner",
-                    "outputs": [{"name": "", "type": "address"}],
-                    "type": "function"
-                }]
-                contract = self.w3.eth.contract(address=token_checksum, abi=owner_abi)
-                owner = contract.functions.owner().call()
+                owner = self._owner(token_checksum, context)
                 
                 # Check if owner is burn address
                 burn_addresses = [
@@ -185,6 +188,23 @@ class SecurityScanner:
             logger.error(f"Rug detection error: {e}")
             return {'error': str(e)}
 
+    def _owner(self, token_checksum: str, context=None) -> str:
+        """owner() of the token (raises if the call fails)"""
+        if context is not None and context.token_reads is not None:
+            owner = context.read([(token_checksum, 'owner')])[0]
+            if owner is None:
+                raise ValueError('owner() call failed')
+            return owner
+        owner_abi = [{
+            "constant": True,
+            "inputs": [],
+            "name": "owner",
+            "outputs": [{"name": "", "type": "address"}],
+            "type": "function"
+        }]
+        contract = self.w3.eth.contract(address=token_checksum, abi=owner_abi)
+        return contract.functions.owner().call()
+
     def check_lp_lock(self, token_address: str) -> Dict:
         """Check if liquidity is locked"""
         try:
@@ -18,9 +18,9 @@ if os.path.exists('.env'):
 from bot import (
     analyze_new_pair,
     w3,
+    token_reads,
     USDC_ADDRESS,
     WETH_ADDRESS,
-    ERC20_ABI,
     FACTORY_ADDRESS
 )
 
@@ -83,12 +83,12 @@ def find_pairs_for_token(token_address):
     return pairs_found
 
 def get_token_info(address):
-    """Get token name and symbol"""
+    """Get token name and symbol (one batched read)"""
     try:
-        token = w3.eth.contract(address=address, abi=ERC20_ABI)
-        name = token.functions.name().call()
-        symbol = token.functions.symbol().call()
-        return name, symbol
+        token = token_reads.metadata('base', [address], fields=('name', 'symbol'))[w3.to_checksum_address(address)]
+        if token.name is None or token.symbol is None:
+            return None, None
+        return token.name, token.symbol
     except:
         return None, None
 
@@ -8,9 +8,10 @@ import sys
 import asyncio
 import logging
 import time
+import functools
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from web3 import Web3
-import requests
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand, BotCommandScopeAllGroupChats, MenuButtonCommands
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler, ChatMemberHandler
 from database import UserDatabase
@@ -18,20 +19,26 @@ from trading import TradingBot
 from security_scanner import SecurityScanner
 from admin import AdminManager
 from payment_monitor import PaymentMonitor
+from log_scanner import FactoryLogScanner
+from block_range import provider_key
+from ws_ingest import LogSubscriber, LatencyTracker
+from flashblocks import FlashblocksConsumer, PreconfirmationLedger
+from reorg import ReorgDetector
+from executors import ChainExecutor, AnalysisPool, AnalysisTier, LoopLagMonitor, RpcBudget
+from pair_index import SeenPairIndex
+from chains import ChainConfig, ChainRegistry, chains_from_json
+from multicall import MULTICALL3_ADDRESS, TokenReadService
+from rpc_quota import HIGH, LOW, NORMAL, QuotaLedger, parse_rate_limits, rpc_context
+from read_cache import ImmutableReadCache
+from analysis_context import LaunchCostTracker, TokenAnalysisContext
+from alert_editor import AlertEditor
 import html
+import aiohttp
 
 # Setup logging early for import errors
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# DEBUG: List files to diagnose Railway volume/mount issues
-try:
-    logger.info(f"📂 Current Working Directory: {os.getcwd()}")
-    logger.info(f"📂 Files in CWD: {os.listdir('.')}")
-    logger.info(f"📂 Sys Path: {sys.path}")
-except Exception as e:
-    logger.error(f"Failed to list directory: {e}")
-
 # Ensure CWD is in path
 if os.getcwd() not in sys.path:
     sys.path.append(os.getcwd())
@@ -94,11 +101,102 @@ if ALCHEMY_KEY:
     BASE_RPC_FALLBACKS.insert(0, f'https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_KEY}')
 # Ensure primary is first, remove duplicates
 BASE_RPC_FALLBACKS = [BASE_RPC] + [r for r in BASE_RPC_FALLBACKS if r != BASE_RPC]
-_current_base_rpc_index = 0
 
 # Monad chain RPC
 MONAD_RPC = os.getenv('MONAD_RPC_URL', 'https://rpc.monad.xyz')
 MONAD_ENABLED = os.getenv('MONAD_ENABLED', 'true').lower() == 'true'
+# List of RPCs to try (env var first, then public backups with higher rate limits)
+# Priority: Goldsky (300rps) -> Ankr (300rps) -> Alchemy (15rps) -> Official -> Others
+MONAD_RPC_FALLBACKS = [MONAD_RPC] + [
+    'https://rpc2.monad.xyz', # Goldsky (300rps, archival)
+    'https://rpc3.monad.xyz', # Ankr (300rps)
+    'https://rpc1.monad.xyz', # Alchemy (15rps)
+    'https://monad-mainnet.api.onfinality.io/public',
+    'https://rpc-mainnet.monadinfra.com',
+    'https://api-monad-mainnet-full.n.dwellir.com/d8d3c1c5-c22e-40f3-8407-50fa0e01eef9',
+    'https://rpc.monad.xyz'   # QuickNode (25rps)
+]
+
+# Hedged reads: if eth_call/eth_getCode/eth_getLogs hasn't answered within the method's p90 latency,
+# send it to a second endpoint too (first answer wins). Budget = max fraction of those reads duplicated, 0 = off
+RPC_HEDGE_BUDGET = float(os.getenv('RPC_HEDGE_BUDGET', '0.1'))
+
+# Client-side RPC rate limits per endpoint host (requests/second, or {"rps": r, "burst": b}) so documented
+# provider limits are enforced before they turn into 429s; RPC_RATE_LIMITS (JSON) adds to/overrides these
+RPC_RATE_LIMITS = {
+    'rpc2.monad.xyz': 300,  # Goldsky
+    'rpc3.monad.xyz': 300,  # Ankr
+    'rpc1.monad.xyz': 15,  # Alchemy
+    'rpc.monad.xyz': 25,  # QuickNode
+}
+RPC_RATE_LIMITS_JSON = os.getenv('RPC_RATE_LIMITS', '')
+
+# Startup waits at most this long for a healthy RPC per chain (every endpoint is probed concurrently)
+RPC_PROBE_DEADLINE = float(os.getenv('RPC_PROBE_DEADLINE', '10'))
+
+# Extra chains without code changes: JSON list of chain declarations (see chains.ChainConfig), e.g.
+# [{"chain": "unichain", "name": "Unichain", "emoji": "🦄", "rpc_urls": ["https://..."],
+#   "factories": {...}, "quote_tokens": {"WETH": "0x..."}, "explorer_url": "https://uniscan.xyz"}]
+EXTRA_CHAINS = os.getenv('EXTRA_CHAINS', '')
+
+# Optional WebSocket RPCs for push-based log ingestion (eth_subscribe); polling is used without them
+BASE_WS_RPC = os.getenv('BASE_WS_RPC_URL', '')
+MONAD_WS_RPC = os.getenv('MONAD_WS_RPC_URL', '')
+INGEST_MODE = os.getenv('INGEST_MODE', 'websocket').lower()  # 'websocket' or 'poll'
+# Per-chain scan tuning: eth_getLogs window (blocks) and poll interval (seconds)
+# Base has 2s blocks and Alchemy free tier caps getLogs at 10 blocks;
+# Monad has ~0.4s blocks, so it gets wider windows and shorter sleeps
+BASE_SCAN_WINDOW = int(os.getenv('BASE_SCAN_WINDOW', '10'))
+BASE_SCAN_INTERVAL = float(os.getenv('BASE_SCAN_INTERVAL', '10'))
+MONAD_SCAN_WINDOW = int(os.getenv('MONAD_SCAN_WINDOW', '100'))
+MONAD_SCAN_INTERVAL = float(os.getenv('MONAD_SCAN_INTERVAL', '5'))
+# The window is only the starting size: it grows while the RPC accepts it and halves on
+# range/429/timeout errors, up to these caps (so falling behind catches up in wide chunks)
+BASE_MAX_SCAN_WINDOW = int(os.getenv('BASE_MAX_SCAN_WINDOW', '2000'))
+MONAD_MAX_SCAN_WINDOW = int(os.getenv('MONAD_MAX_SCAN_WINDOW', '1000'))
+
+# Restart catch-up: resume from the cursor saved in SQLite with bounded depth and concurrency,
+# without alerting on launches older than BACKFILL_ALERT_MAX_AGE_MINUTES
+BASE_MAX_BACKFILL_BLOCKS = int(os.getenv('BASE_MAX_BACKFILL_BLOCKS', '1800'))  # ~1 hour of Base blocks
+MONAD_MAX_BACKFILL_BLOCKS = int(os.getenv('MONAD_MAX_BACKFILL_BLOCKS', '9000'))  # ~1 hour of Monad blocks
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', '4'))
+BACKFILL_ALERT_MAX_AGE_MINUTES = float(os.getenv('BACKFILL_ALERT_MAX_AGE_MINUTES', '10'))
+# Analysis worker pool: N pairs analyzed concurrently off the event loop, paced by the RPC budget
+# (requests/second shared by all analyses; each analysis is charged ANALYSIS_RPC_COST requests up front)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '4'))
+RPC_BUDGET_PER_SECOND = float(os.getenv('RPC_BUDGET_PER_SECOND', '10'))  # 0 = unlimited
+RPC_BUDGET_BURST = float(os.getenv('RPC_BUDGET_BURST', '40'))
+ANALYSIS_RPC_COST = float(os.getenv('ANALYSIS_RPC_COST', '10'))
+# Heavy analysis tier (security scans, on-chain Transfer sweeps): its own threads, a bounded number of
+# pending tasks (beyond it alerts go out without that section) and a deadline per task
+HEAVY_ANALYSIS_WORKERS = int(os.getenv('HEAVY_ANALYSIS_WORKERS', '2'))
+HEAVY_ANALYSIS_MAX_PENDING = int(os.getenv('HEAVY_ANALYSIS_MAX_PENDING', '16'))
+SECURITY_SCAN_DEADLINE = float(os.getenv('SECURITY_SCAN_DEADLINE', '15'))
+ONCHAIN_ANALYSIS_DEADLINE = float(os.getenv('ONCHAIN_ANALYSIS_DEADLINE', '30'))
+# Two-phase alerts: the basic alert is edited in place at most ALERT_EDIT_RATE edits/s overall and one
+# edit per DM / group chat every ALERT_EDIT_DM_INTERVAL / ALERT_EDIT_GROUP_INTERVAL seconds
+ALERT_EDIT_RATE = float(os.getenv('ALERT_EDIT_RATE', '20'))
+ALERT_EDIT_DM_INTERVAL = float(os.getenv('ALERT_EDIT_DM_INTERVAL', '1'))
+ALERT_EDIT_GROUP_INTERVAL = float(os.getenv('ALERT_EDIT_GROUP_INTERVAL', '3'))
+# Alert metrics: DexScreener, Alchemy and chain sources run concurrently, each given this many seconds
+# before the alert goes out without it
+METRICS_SOURCE_TIMEOUT = float(os.getenv('METRICS_SOURCE_TIMEOUT', '5'))
+DEXSCREENER_API = os.getenv('DEXSCREENER_API', 'https://api.dexscreener.com/latest/dex')
+# Chain head refresh interval (seconds) for the shared head trackers; newHeads pushes replace polling
+BASE_HEAD_INTERVAL = float(os.getenv('BASE_HEAD_INTERVAL', '5'))
+MONAD_HEAD_INTERVAL = float(os.getenv('MONAD_HEAD_INTERVAL', '2'))
+# Reorg safety: polling scans stop this many blocks behind head; recent scanned block hashes are
+# re-checked each cycle and a reorged range is re-scanned (alerts for vanished pairs are retracted)
+BASE_CONFIRMATIONS = int(os.getenv('BASE_CONFIRMATIONS', '0'))
+MONAD_CONFIRMATIONS = int(os.getenv('MONAD_CONFIRMATIONS', '2'))
+REORG_HASH_RING_SIZE = int(os.getenv('REORG_HASH_RING_SIZE', '64'))
+# Pair dedupe: bounded in-memory LRU over a SQLite table, pruned to a per-chain block horizon
+DEDUPE_CACHE_SIZE = int(os.getenv('DEDUPE_CACHE_SIZE', '20000'))
+BASE_DEDUPE_RETENTION_BLOCKS = int(os.getenv('BASE_DEDUPE_RETENTION_BLOCKS', '302400'))  # ~7 days of Base blocks
+MONAD_DEDUPE_RETENTION_BLOCKS = int(os.getenv('MONAD_DEDUPE_RETENTION_BLOCKS', '1512000'))  # ~7 days of Monad blocks
+
+# Optional Base Flashblocks stream (200ms preconfirmations), e.g. wss://mainnet.flashblocks.base.org/ws
+FLASHBLOCKS_WS_URL = os.getenv('FLASHBLOCKS_WS_URL', '')
 
 # Payment wallet for sponsorship/payment monitoring (optional)
 payment_wallet = os.getenv('PAYMENT_WALLET_ADDRESS') or None
@@ -119,6 +217,13 @@ AD_TIERS = {
 USDC_ADDRESS = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913".lower()
 WETH_ADDRESS = "0x4200000000000000000000000000000000000006".lower()
 
+# Base tokens that are never "new" launches (a pair of two of these is skipped)
+BASE_KNOWN_TOKENS = [
+    '0x50c5725949a6f0c72e6c4a641f24049a917db0cb',  # DAI on Base
+    '0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca',  # USDbC on Base
+    '0x2ae3f1ec7f1f5012cfeab0185bfc7aa3cf0dec22',  # cbETH on Base
+]
+
 # Multi-DEX Factory Configuration
 FACTORIES = {
     'uniswap_v3': {
@@ -191,84 +296,75 @@ MONAD_FACTORIES = {
 # Keep old FACTORY_ADDRESS for backward compatibility
 FACTORY_ADDRESS = FACTORIES['uniswap_v3']['address']
 
-# Initialize
-logger.info("🚀 Initializing Base Fair Launch Sniper Bot...")
-db = UserDatabase()
-logger.info(f"✅ Database connected: {db.db_path}")
+# Factory log scan mode: 'combined' = one eth_getLogs for all factories per window,
+# 'per_factory' = legacy one call per factory
+LOG_SCAN_MODE = os.getenv('LOG_SCAN_MODE', 'combined').lower()
 
-# Try Base RPCs in order until one connects
-w3 = None
-for _rpc_url in BASE_RPC_FALLBACKS:
-    try:
-        _test_w3 = Web3(Web3.HTTPProvider(_rpc_url, request_kwargs={'timeout': 10}))
-        if _test_w3.is_connected():
-            w3 = _test_w3
-            _current_base_rpc_index = BASE_RPC_FALLBACKS.index(_rpc_url)
-            logger.info(f"✅ Connected to Base RPC: {_rpc_url}")
-            break
-    except Exception as e:
-        logger.warning(f"⚠️ Base RPC failed ({_rpc_url}): {e}")
-
-if not w3:
-    logger.error(f"❌ Failed to connect to any Base RPC!")
-    w3 = Web3(Web3.HTTPProvider(BASE_RPC))  # Use primary anyway
-
-# Monad Web3 connection
-w3_monad = None
+# Requests and compute units per feature, shared by every chain's router
+rpc_ledger = QuotaLedger()
+try:
+    RPC_RATE_LIMITS.update(parse_rate_limits(RPC_RATE_LIMITS_JSON))
+except ValueError as e:
+    logger.error(f"❌ Invalid RPC_RATE_LIMITS configuration: {e}")
+
+# Chain registry: every scanned chain is declared here (or in EXTRA_CHAINS) and scanned concurrently
+chain_registry = ChainRegistry()
+chain_registry.register(ChainConfig(
+    'base', 'Base', '🔵', BASE_RPC_FALLBACKS, FACTORIES,
+    quote_tokens={'WETH': WETH_ADDRESS, 'USDC': USDC_ADDRESS}, known_tokens=BASE_KNOWN_TOKENS,
+    explorer_url='https://basescan.org',
+    ws_url=BASE_WS_RPC, flashblocks_ws_url=FLASHBLOCKS_WS_URL,
+    scan_window=BASE_SCAN_WINDOW, max_scan_window=BASE_MAX_SCAN_WINDOW, scan_interval=BASE_SCAN_INTERVAL,
+    head_interval=BASE_HEAD_INTERVAL, confirmations=BASE_CONFIRMATIONS,
+    max_backfill_blocks=BASE_MAX_BACKFILL_BLOCKS, dedupe_retention_blocks=BASE_DEDUPE_RETENTION_BLOCKS,
+    required=True, combined_logs=LOG_SCAN_MODE == 'combined', reorg_ring_size=REORG_HASH_RING_SIZE,
+    hedge_budget=RPC_HEDGE_BUDGET, rate_limits=RPC_RATE_LIMITS, ledger=rpc_ledger, probe_deadline=RPC_PROBE_DEADLINE,
+))
 if MONAD_ENABLED:
-    # List of RPCs to try (env var first, then public backups with higher rate limits)
-    # Priority: Goldsky (300rps) -> Ankr (300rps) -> Alchemy (15rps) -> Official -> Others
-    monad_rpcs = [MONAD_RPC] + [
-        'https://rpc2.monad.xyz', # Goldsky (300rps, archival)
-        'https://rpc3.monad.xyz', # Ankr (300rps)
-        'https://rpc1.monad.xyz', # Alchemy (15rps)
-        'https://monad-mainnet.api.onfinality.io/public',
-        'https://rpc-mainnet.monadinfra.com',
-        'https://api-monad-mainnet-full.n.dwellir.com/d8d3c1c5-c22e-40f3-8407-50fa0e01eef9',
-        'https://rpc.monad.xyz'   # QuickNode (25rps)
-    ]
-    
-    # Remove duplicates
-    monad_rpcs = list(dict.fromkeys(monad_rpcs))
-    
-    for rpc in monad_rpcs:
-        try:
-            logger.info(f"🟣 Connecting to Monad RPC: {rpc}...")
-            temp_w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 5}))
-            if temp_w3.is_connected():
-                w3_monad = temp_w3
-                chain_id = w3_monad.eth.chain_id
-                logger.info(f"✅ Connected to Monad RPC! (Chain ID: {chain_id})")
-                break
-        except Exception as e:
-            logger.warning(f"⚠️ Monad connection failed for {rpc}: {e}")
-            
-    if not w3_monad:
-        logger.warning(f"⚠️ Failed to connect to any Monad RPC - Monad scanning disabled")
-else:
-    logger.info("ℹ️ Monad chain scanning disabled")
-    
-trading_bot = TradingBot(w3)
-security_scanner = SecurityScanner(w3)
-onchain_analyzer = OnChainAnalyzer(w3) if ONCHAIN_AVAILABLE else None
+    chain_registry.register(ChainConfig(
+        'monad', 'Monad', '🟣', MONAD_RPC_FALLBACKS, MONAD_FACTORIES,
+        quote_tokens={'WMON': MONAD_WETH_ADDRESS, 'WETH': MONAD_WETH_ADDRESS, 'USDC': MONAD_USDC_ADDRESS},
+        explorer_url='https://monadscan.com',
+        ws_url=MONAD_WS_RPC,
+        scan_window=MONAD_SCAN_WINDOW, max_scan_window=MONAD_MAX_SCAN_WINDOW, scan_interval=MONAD_SCAN_INTERVAL,
+        head_interval=MONAD_HEAD_INTERVAL, confirmations=MONAD_CONFIRMATIONS,
+        max_backfill_blocks=MONAD_MAX_BACKFILL_BLOCKS, dedupe_retention_blocks=MONAD_DEDUPE_RETENTION_BLOCKS,
+        rpc_timeout=5, combined_logs=LOG_SCAN_MODE == 'combined', reorg_ring_size=REORG_HASH_RING_SIZE,
+        hedge_budget=RPC_HEDGE_BUDGET, rate_limits=RPC_RATE_LIMITS, ledger=rpc_ledger, probe_deadline=RPC_PROBE_DEADLINE,
+    ))
+try:
+    for _extra_chain in chains_from_json(EXTRA_CHAINS, combined_logs=LOG_SCAN_MODE == 'combined',
+                                     reorg_ring_size=REORG_HASH_RING_SIZE, hedge_budget=RPC_HEDGE_BUDGET,
+                                     rate_limits=RPC_RATE_LIMITS, ledger=rpc_ledger,
+                                     probe_deadline=RPC_PROBE_DEADLINE):
+        chain_registry.register(_extra_chain)
+except Exception as e:
+    logger.error(f"❌ Invalid EXTRA_CHAINS configuration: {e}")
+
+# Initialize (no network or disk access at import: the database is created on first use and the
+# RPC pools are probed concurrently in main(), or on a chain's first request)
+db = UserDatabase(lazy=True)
+
+chain_registry.connect_all()
+w3 = chain_registry.w3('base')
+w3_monad = chain_registry.w3('monad')  # Re-read after probing (None if Monad is disabled or unreachable)
+
+# Immutable reads (token metadata, bytecode) cached in memory + SQLite
+read_cache = ImmutableReadCache(db)
+# Bulk ERC20 reads: concurrent callers within a few ms share one Multicall3 call per chain
+token_reads = TokenReadService(chain_registry.w3, cache=read_cache)
+trading_bot = TradingBot(w3, token_reads=token_reads)
+security_scanner = SecurityScanner(w3, read_cache=read_cache)
+# Transfer-log scans share Base's factory-scan range controller: one AIMD state per provider
+onchain_analyzer = OnChainAnalyzer(w3, block_range=chain_registry['base'].log_scanner.block_range,
+                                   head_tracker=chain_registry['base'].head_tracker) if ONCHAIN_AVAILABLE else None
 if onchain_analyzer:
     logger.info("✅ On-chain analyzer initialized")
 admin_manager = AdminManager(db, w3)
 
-def _switch_base_rpc():
-    """Switch to next fallback Base RPC when current one fails (503/429)"""
-    global w3, _current_base_rpc_index
-    _current_base_rpc_index = (_current_base_rpc_index + 1) % len(BASE_RPC_FALLBACKS)
-    new_rpc = BASE_RPC_FALLBACKS[_current_base_rpc_index]
-    logger.warning(f"🔄 RPC error detected, switching to fallback: {new_rpc}")
-    try:
-        w3 = Web3(Web3.HTTPProvider(new_rpc, request_kwargs={'timeout': 10}))
-        if w3.is_connected():
-            logger.info(f"✅ Successfully switched to {new_rpc}")
-        else:
-            logger.warning(f"⚠️ Fallback RPC {new_rpc} not responding")
-    except Exception as rpc_err:
-        logger.error(f"Failed to switch RPC: {rpc_err}")
+def _switch_rpc(chain: str):
+    """Route a chain away from its current RPC when the scan loop still sees 503/429 (every component follows)"""
+    chain_registry[chain].switch_rpc()
 
 # Initialize group poster if available
 if GROUP_POSTER_AVAILABLE:
@@ -424,6 +520,9 @@ ERC20_ABI = [
     {"constant":True,"inputs":[],"name":"owner","outputs":[{"name":"","type":"address"}],"type":"function"}
 ]
 
+# ERC20 reads analyze_token batches for both pair tokens (same order as the unpacking below)
+ANALYZE_FIELDS = ('name', 'symbol', 'totalSupply', 'decimals', 'owner')
+
 POOL_ABI = [
     {"constant":True,"inputs":[],"name":"token0","outputs":[{"name":"","type":"address"}],"type":"function"},
     {"constant":True,"inputs":[],"name":"token1","outputs":[{"name":"","type":"address"}],"type":"function"}
@@ -431,178 +530,88 @@ POOL_ABI = [
 
 # ===== SCANNING FUNCTIONS =====
 
-def get_new_pairs(last_block: int = None) -> list:
-    """Scan for new pairs across multiple DEXs on Base"""
-    if last_block is None:
-        current_block = w3.eth.block_number
-        last_block = current_block - 5  # Alchemy free tier: max 10 block range
-
-    all_pools = []
-    
-    # Alchemy free tier limits eth_getLogs to 10 block range
-    current_block = w3.eth.block_number
-    to_block = min(last_block + 10, current_block)
-    from_block_hex = hex(last_block)
-    to_block_hex = hex(to_block)
-
-    # Scan each enabled DEX factory
-    for dex_id, config in FACTORIES.items():
-        if not config.get('enabled', True):
-            continue
-            
-        try:
-            logs = w3.eth.get_logs({
-                'fromBlock': from_block_hex,
-                'toBlock': to_block_hex,
-                'address': Web3.to_checksum_address(config['address']),
-                'topics': [config['event_topic']]
-            })
-
-            for log in logs:
-                try:
-                    pool_data = parse_pair_event(log, config['type'], dex_id, config)
-                    if pool_data:
-                        pool_data['chain'] = 'base'
-                        pool_data['chain_emoji'] = '🔵'
-                        all_pools.append(pool_data)
-                        logger.info(f"{config['emoji']} Found new {config['name']} {pool_data['pair_type']} pair: {pool_data['address']}")
-                except Exception as e:
-                    logger.warning(f"Failed to decode {config['name']} log: {e}")
-                    continue
-
-        except Exception as e:
-            logger.error(f"Failed to scan {config['name']}: {e}")
-            continue
-
-    all_pools.sort(key=lambda x: x['block'], reverse=True)
-    return all_pools
-
-def get_new_pairs_monad(last_block: int = None) -> list:
-    """Scan for new pairs on Monad chain"""
-    if not w3_monad:
+def get_new_pairs(last_block: int = None, window: int = None, chain: str = 'base') -> list:
+    """Scan for new pairs across every DEX factory declared for a chain"""
+    config = chain_registry.get(chain)
+    if not config:
+        return []
+    config.log_scanner.clear_last_window()  # An early return below must not leave the previous window behind
+    if not config.w3:
         return []
-    
-    try:
-        if last_block is None:
-            current_block = w3_monad.eth.block_number
-            last_block = current_block - 5
-
-        all_pools = []
-        current_block = w3_monad.eth.block_number
-        to_block = min(last_block + 50, current_block)  # Monad is fast, scan wider range
-        from_block_hex = hex(last_block)
-        to_block_hex = hex(to_block)
-
-        for dex_id, config in MONAD_FACTORIES.items():
-            if not config.get('enabled', True):
-                continue
-                
-            try:
-                logs = w3_monad.eth.get_logs({
-                    'fromBlock': from_block_hex,
-                    'toBlock': to_block_hex,
-                    'address': Web3.to_checksum_address(config['address']),
-                    'topics': [config['event_topic']]
-                })
-
-                for log in logs:
-                    try:
-                        pool_data = parse_pair_event(log, config['type'], dex_id, config)
-                        if pool_data:
-                            pool_data['chain'] = 'monad'
-                            pool_data['chain_emoji'] = '🟣'
-                            all_pools.append(pool_data)
-                            logger.info(f"🟣 Found new Monad {config['name']} {pool_data['pair_type']} pair: {pool_data['address']}")
-                    except Exception as e:
-                        logger.warning(f"Failed to decode Monad {config['name']} log: {e}")
-                        continue
 
-            except Exception as e:
-                logger.error(f"Failed to scan Monad {config['name']}: {e}")
-                continue
+    # Polling stops `confirmations` blocks behind head; the range controller adapts the window to the RPC
+    current_block = config.head_tracker.block_number() - config.confirmations
+    if last_block is None:
+        last_block = current_block - 5
+    if last_block > current_block:
+        return []
+    to_block = min(last_block + (window or config.scan_window) - 1, current_block)
 
-        all_pools.sort(key=lambda x: x['block'], reverse=True)
-        return all_pools
+    # One getLogs for every enabled DEX factory (per-factory fallback if the RPC rejects it)
+    try:
+        factory_logs = config.log_scanner.fetch_logs(config.w3, last_block, to_block)
     except Exception as e:
-        logger.error(f"Monad scan error: {e}")
+        logger.error(f"Failed to scan {config.name} factories: {e}")
         return []
 
+    all_pools = decode_factory_logs(factory_logs, chain)
+    all_pools.sort(key=lambda x: x['block'], reverse=True)
+    config.metrics.record_window(to_block - last_block + 1, len(all_pools))
+    return all_pools
 
-def parse_pair_event(log, dex_type: str, dex_id: str, config: dict) -> dict:
-    """Parse pair creation event based on DEX type"""
-    
-    if dex_type == 'v2':
-        # V2 DEXs (Uniswap V2, SushiSwap, BaseSwap, SwapBased)
-        # Event: PairCreated(address indexed token0, address indexed token1, address pair, uint)
-        if len(log['topics']) >= 3:
-            token0 = '0x' + log['topics'][1].hex()[-40:]
-            token1 = '0x' + log['topics'][2].hex()[-40:]
-            # Pair address is in the data field
-            pair_address = '0x' + log['data'].hex()[-40:]
-            
-    elif dex_type == 'v3':
-        # V3 DEXs (Uniswap V3)
-        # Event: PoolCreated(address indexed token0, address indexed token1, uint24 indexed fee, int24 tickSpacing, address pool)
-        if len(log['topics']) >= 4:
-            token0 = '0x' + log['topics'][1].hex()[-40:]
-            token1 = '0x' + log['topics'][2].hex()[-40:]
-            # Pool address is in the data field
-            pair_address = '0x' + log['data'].hex()[-40:]
-            
-    elif dex_type == 'velodrome':
-        # Velodrome-style DEXs (Aerodrome)
-        # Event: PairCreated(address indexed token0, address indexed token1, bool stable, address pair, uint)
-        if len(log['topics']) >= 3:
-            token0 = '0x' + log['topics'][1].hex()[-40:]
-            token1 = '0x' + log['topics'][2].hex()[-40:]
-            # Pair address is in the data field (after stable bool)
-            pair_address = '0x' + log['data'].hex()[-40:]
-    else:
-        return None
-
-    # Only track USDC or WETH pairs
-    if not (token0.lower() == USDC_ADDRESS or token1.lower() == USDC_ADDRESS or
-            token0.lower() == WETH_ADDRESS or token1.lower() == WETH_ADDRESS):
-        return None
-
-    pair_type = "USDC" if (token0.lower() == USDC_ADDRESS or token1.lower() == USDC_ADDRESS) else "WETH"
-
-    # Filter out invalid/zero pair addresses (e.g. 0x00000000000000000000000000000000002bb2a4)
-    pair_clean = pair_address.lower().replace('0x', '')
-    # Count leading zeros — real addresses don't have 20+ leading zeros
-    leading_zeros = len(pair_clean) - len(pair_clean.lstrip('0'))
-    if leading_zeros > 20:
-        logger.debug(f"Skipping invalid pair address (too many leading zeros): {pair_address}")
-        return None
-
-    # Filter out known base tokens being detected as "new" launches
-    KNOWN_TOKENS = {
-        WETH_ADDRESS, USDC_ADDRESS,
-        '0x50c5725949a6f0c72e6c4a641f24049a917db0cb'.lower(),  # DAI on Base
-        '0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca'.lower(),  # USDbC on Base
-        '0x2Ae3F1Ec7F1F5012CFEab0185bfc7aa3cf0DEc22'.lower(),  # cbETH on Base
-    }
-    # Both tokens in the pair are known base tokens — skip
-    if token0.lower() in KNOWN_TOKENS and token1.lower() in KNOWN_TOKENS:
-        logger.debug(f"Skipping pair of known tokens: {token0} / {token1}")
-        return None
-
-    return {
-        'address': pair_address,
-        'token0': token0,
-        'token1': token1,
-        'block': log['blockNumber'],
-        'pair_type': pair_type,
-        'dex_id': dex_id,
-        'dex_name': config['name'],
-        'dex_emoji': config['emoji']
-    }
-
-def analyze_token(pair_address: str, token0: str, token1: str, premium_analytics: bool = False, dex_name: str = "Unknown", dex_emoji: str = "🔷", dex_id: str = "unknown", chain: str = "base") -> dict:
-    """Analyze a new token launch"""
+def get_new_pairs_monad(last_block: int = None, window: int = None) -> list:
+    """Scan for new pairs on Monad chain"""
+    return get_new_pairs(last_block, window, chain='monad')
+
+def decode_factory_logs(factory_logs: list, chain: str, arrived_at: float = None) -> list:
+    """Decode routed (log, dex_id, config) tuples into pool dicts tagged with chain + arrival time"""
+    arrived_at = arrived_at if arrived_at is not None else time.monotonic()
+    config = chain_registry[chain]
+    pools = []
+    for record in config.pair_decoder.decode_batch(factory_logs):
+        pool_data = record.as_pool()
+        pool_data['chain'] = chain
+        pool_data['chain_emoji'] = config.emoji
+        pool_data['detected_at'] = arrived_at
+        pools.append(pool_data)
+        logger.info(f"{config.emoji} Found new {config.name} {record.factory['name']} {record.pair_type} pair: {record.address}")
+    return pools
+
+def scan_pairs_range(chain: str, from_block: int, to_block: int) -> list:
+    """Fetch and decode factory pairs for an explicit block range (errors propagate so nothing is skipped)"""
+    config = chain_registry[chain]
+    return decode_factory_logs(config.log_scanner.fetch_logs(config.w3, from_block, to_block), chain)
+
+def drain_flashblocks(consumer: FlashblocksConsumer) -> list:
+    """Decode Base pairs seen in preconfirmed Flashblocks, flagged as preconfirmed"""
+    pools = []
+    for arrived_at, log, dex_id, config in consumer.drain():
+        for pool_data in decode_factory_logs([(log, dex_id, config)], 'base', arrived_at=arrived_at):
+            pool_data['preconfirmed'] = True
+            pools.append(pool_data)
+    return pools
+
+def drain_log_subscriber(subscriber: LogSubscriber, scanner: FactoryLogScanner, chain: str) -> list:
+    """Decode every log pushed by a WebSocket subscription since the last drain"""
+    pools = []
+    for arrived_at, log in subscriber.drain():
+        routed = scanner.route(log)
+        if routed:
+            pools.extend(decode_factory_logs([(log, routed[0], routed[1])], chain, arrived_at=arrived_at))
+    return pools
+
+
+def parse_pair_event(log, dex_type: str, dex_id: str, config: dict, chain: str = 'base') -> dict:
+    """Parse one pair creation event based on DEX type (layouts in pair_decoder.FactoryLogDecoder)"""
+    record = chain_registry[chain].pair_decoder.decode(log, dex_type, dex_id, config)
+    return record.as_pool() if record else None
+
+def analyze_token(pair_address: str, token0: str, token1: str, premium_analytics: bool = False, dex_name: str = "Unknown", dex_emoji: str = "🔷", dex_id: str = "unknown", chain: str = "base",
+                  context: TokenAnalysisContext = None) -> dict:
+    """Analyze a new token launch (reads go through the launch's context, so later checks reuse them)"""
     try:
         # Select correct Web3 instance
-        target_w3 = w3_monad if chain == 'monad' else w3
+        target_w3 = _chain_w3(chain)
         
         if not target_w3:
             logger.error(f"Cannot analyze {chain} token - Web3 connection missing")
@@ -613,68 +622,44 @@ def analyze_token(pair_address: str, token0: str, token1: str, premium_analytics
         token0 = target_w3.to_checksum_address(token0)
         token1 = target_w3.to_checksum_address(token1)
         
-        # Identify the new token (not USDC/WETH - generic check for both chains)
-        # Note: USDC/WETH addresses might differ on Monad, but we passed them correctly in get_new_pairs
-        # Ideally we should use chain-specific constants here
-        
-        # Simple heuristic: assuming standard WETH/USDC addresses for Base
-        # For Monad, we might need different checks, but let's assume the scanner logic already identified the pair type correctly
-        
-        # Improved logic: check if token is one of the known bases for THIS chain
-        # For simplicity, we assume token0/token1 passed from scanner are correct
-        # We need to determine which one is the "new" token
-        
-        # On Monad, we defined MONAD_WETH and MONAD_USDC in get_new_pairs_monad
-        # But here we don't have scope of them easily unless we use globals or chain specific config
-        
-        # Fallback: check which one is the "base" token by checking common stable/native wrappers
-        known_bases = [USDC_ADDRESS, WETH_ADDRESS]
-        if chain == 'monad':
-            known_bases = [MONAD_WETH_ADDRESS, MONAD_USDC_ADDRESS]
-            
-        contract0 = target_w3.eth.contract(address=token0, abi=ERC20_ABI)
-        try:
-            sym0 = contract0.functions.symbol().call()
-        except:
-            sym0 = "UNKNOWN"
-            
-        # Heuristic: verify which is the quote token
-        if sym0 in ['USDC', 'WETH', 'WMON', 'USDT', 'DAI']:
-            new_token = token1
-            base_token = sym0
-            base_token_address = token0
+        # Identify the new token: the quote tokens declared for this chain mark the "base" side
+        # (symbol heuristic below covers quote tokens that aren't declared)
+        quote_symbols = {address: symbol for symbol, address in chain_registry[chain].quote_tokens.items()}
+        if context is None:
+            context = TokenAnalysisContext(chain, target_w3, pair_address, token0, token1, token_reads, read_cache)
+
+        if token0.lower() in quote_symbols:
+            new_token, base_token_address, base_token = token1, token0, quote_symbols[token0.lower()]
+        elif token1.lower() in quote_symbols:
+            new_token, base_token_address, base_token = token0, token1, quote_symbols[token1.lower()]
         else:
-            new_token = token0
-            # Try to get symbol of token1 to confirm
-            try:
-                contract1 = target_w3.eth.contract(address=token1, abi=ERC20_ABI)
-                base_token = contract1.functions.symbol().call()
-            except:
-                base_token = "ETH" # Fallback
-            base_token_address = token1
+            # Heuristic: verify which is the quote token by symbol (an extra round trip, off the decoder's path)
+            sym0, sym1 = context.read([(token0, 'symbol'), (token1, 'symbol')])
+            if sym0 in ['USDC', 'WETH', 'WMON', 'USDT', 'DAI']:
+                new_token, base_token_address, base_token = token1, token0, sym0
+            else:
+                new_token, base_token_address, base_token = token0, token1, sym1 or "ETH"  # Fallback
 
-        # Get token info
-        token_contract = target_w3.eth.contract(address=new_token, abi=ERC20_ABI)
+        # Everything the alert needs for the new token in one Multicall3 round trip (each read may fail)
+        requests_ = [(new_token, field) for field in ANALYZE_FIELDS]
+        if premium_analytics:
+            requests_ += [(base_token_address, 'balanceOf', pair_address), (base_token_address, 'decimals')]
+        values = dict(zip(requests_, context.read(requests_)))
 
-        try:
-            name = token_contract.functions.name().call()
-            symbol = token_contract.functions.symbol().call()
-            total_supply = token_contract.functions.totalSupply().call()
-            decimals = token_contract.functions.decimals().call()
-        except:
+        # Get token info
+        name, symbol, total_supply, decimals, owner = (values[(new_token, field)] for field in ANALYZE_FIELDS)
+        if name is None or symbol is None or total_supply is None or decimals is None:
             return None  # Not a valid ERC20
 
         # Check ownership
-        owner = "0x0"
-        renounced = False
-        try:
-            owner = token_contract.functions.owner().call()
+        if owner is None:
+            owner = "0x0"
+            renounced = True  # No owner function = likely renounced
+        else:
             burn_addresses = ["0x0000000000000000000000000000000000000000",
                             "0x0000000000000000000000000000000000000001",
                             "0x000000000000000000000000000000000000dEaD"]
             renounced = owner.lower() in [a.lower() for a in burn_addresses]
-        except:
-            renounced = True  # No owner function = likely renounced
 
         result = {
             'token_address': new_token,
@@ -696,9 +681,10 @@ def analyze_token(pair_address: str, token0: str, token1: str, premium_analytics
         if premium_analytics:
             try:
                 # Get liquidity in the pool
-                base_contract = w3.eth.contract(address=base_token_address, abi=ERC20_ABI)
-                liquidity_balance = base_contract.functions.balanceOf(pair_address).call()
-                base_decimals = base_contract.functions.decimals().call()
+                liquidity_balance = values[(base_token_address, 'balanceOf', pair_address)]
+                base_decimals = values[(base_token_address, 'decimals')]
+                if liquidity_balance is None or base_decimals is None:
+                    raise ValueError(f"balanceOf/decimals failed for {base_token_address}")
                 liquidity_formatted = liquidity_balance / (10 ** base_decimals)
 
                 # Get holder count (approximate by checking top holders)
@@ -720,15 +706,49 @@ def analyze_token(pair_address: str, token0: str, token1: str, premium_analytics
 
 # ===== ENHANCED METRICS FUNCTIONS =====
 
-async def get_dexscreener_data(token_address: str) -> dict:
+@asynccontextmanager
+async def _metrics_session(session: aiohttp.ClientSession = None):
+    """The caller's aiohttp session, or a short-lived one for standalone calls"""
+    if session is not None:
+        yield session
+        return
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=METRICS_SOURCE_TIMEOUT)) as own:
+        yield own
+
+async def _alchemy_asset_transfers(session: aiohttp.ClientSession, token_address: str, max_count: int) -> list:
+    """Latest-block ERC20 transfers of a token (alchemy_getAssetTransfers, Base only)"""
+    if not ALCHEMY_KEY:
+        return []
+    url = f"https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_KEY}"
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "alchemy_getAssetTransfers",
+        "params": [{
+            "fromBlock": "latest",
+            "toBlock": "latest",
+            "contractAddresses": [token_address],
+            "category": ["erc20"],
+            "maxCount": hex(max_count),
+            "withMetadata": True
+        }]
+    }
+    async with session.post(url, json=payload) as resp:
+        if resp.status != 200:
+            return []
+        data = await resp.json(content_type=None)
+    return (data.get('result') or {}).get('transfers', [])
+
+async def get_dexscreener_data(token_address: str, session: aiohttp.ClientSession = None) -> dict:
     """Fetch volume, price, and market cap data from DexScreener API"""
     try:
         # Use the /tokens/ endpoint which accepts token contract addresses
-        url = f"https://api.dexscreener.com/latest/dex/tokens/{token_address}"
-        resp = requests.get(url, timeout=10)
-        
-        if resp.status_code == 200:
-            data = resp.json()
+        url = f"{DEXSCREENER_API}/tokens/{token_address}"
+        async with _metrics_session(session) as http:
+            async with http.get(url) as resp:
+                data = await resp.json(content_type=None) if resp.status == 200 else None
+
+        if data is not None:
             # The /tokens/ endpoint returns an array of pairs
             pairs = data.get('pairs', [])
             
@@ -761,52 +781,24 @@ async def get_dexscreener_data(token_address: str) -> dict:
         'ath': None
     }
 
-async def calculate_pool_price(pair_address: str, token_address: str, base_token_address: str, chain: str = 'base') -> float:
+async def calculate_pool_price(pair_address: str, token_address: str, base_token_address: str, chain: str = 'base',
+                               context: TokenAnalysisContext = None) -> float:
     """Calculate token price from pool reserves (fallback if DexScreener fails)"""
     try:
-        # Select correct Web3 instance
-        target_w3 = w3_monad if chain == 'monad' else w3
-        if not target_w3:
+        if not _chain_w3(chain):
             return 0
 
-        # Get pool reserves
-        pool_abi = [
-            {"constant":True,"inputs":[],"name":"token0","outputs":[{"name":"","type":"address"}],"type":"function"},
-            {"constant":True,"inputs":[],"name":"token1","outputs":[{"name":"","type":"address"}],"type":"function"},
-            {"constant":True,"inputs":[],"name":"getReserves","outputs":[{"name":"","type":"uint112"},{"name":"","type":"uint112"},{"name":"","type":"uint32"}],"type":"function"}
+        # Balances and decimals of both sides in one batched read (balanceOf works for V2;
+        # FIXME: Monad Uniswap V3 logic is different - V3 pools hold liquidity across ticks)
+        reads = [
+            (token_address, 'balanceOf', pair_address), (base_token_address, 'balanceOf', pair_address),
+            (token_address, 'decimals'), (base_token_address, 'decimals'),
         ]
-        
-        pool_contract = target_w3.eth.contract(address=pair_address, abi=pool_abi)
-        token0 = pool_contract.functions.token0().call().lower()
-        token1 = pool_contract.functions.token1().call().lower()
-        
-        # Get balances/reserves
-        # Note: calling getReserves is better than balanceOf for Uniswap V2
-        # But if V3, getReserves doesn't exist?
-        # Monad is V3. Base is V2/V3.
-        # This function seems designed for V2 (getReserves).
-        # if V3, we need slot0?
-        # If target is Uniswap V3, this might fail.
-        # But let's assume standard V2 checks first or try-catch.
-        
-        # Actually, previous code used balance of pair address (V2 style)
-        # token_balance = token_contract.functions.balanceOf(pair_address).call()
-        # This works for V2.
-        # For V3, liquidity is invalid logic here.
-        
-        # FIXME: Monad Uniswap V3 logic is different.
-        # For now, let's keep it safe and catch errors.
-        
-        # Get balances using balanceOf (works for V2)
-        token_contract = target_w3.eth.contract(address=token_address, abi=ERC20_ABI)
-        base_contract = target_w3.eth.contract(address=base_token_address, abi=ERC20_ABI)
-        
-        token_balance = token_contract.functions.balanceOf(pair_address).call()
-        base_balance = base_contract.functions.balanceOf(pair_address).call()
-        
-        token_decimals = token_contract.functions.decimals().call()
-        base_decimals = base_contract.functions.decimals().call()
-        
+        token_balance, base_balance, token_decimals, base_decimals = await (
+            context.aread(reads) if context is not None else token_reads.aread(chain, reads))
+        if None in (token_balance, base_balance, token_decimals, base_decimals):
+            return 0
+
         # Calculate price
         if token_balance > 0:
             price = (base_balance / (10 ** base_decimals)) / (token_balance / (10 ** token_decimals))
@@ -823,56 +815,36 @@ async def calculate_pool_price(pair_address: str, token_address: str, base_token
         logger.debug(f"Pool price calculation failed: {e}")
         return 0
 
-async def check_transfer_limits(token_address: str, chain: str = 'base') -> dict:
+async def check_transfer_limits(token_address: str, chain: str = 'base', context: TokenAnalysisContext = None) -> dict:
     """Check if token has transfer amount limits"""
     try:
-        # Select correct Web3 instance
-        target_w3 = w3_monad if chain == 'monad' else w3
-        if not target_w3:
+        if not _chain_w3(chain):
+            return {'has_limits': False, 'details': 'No limits'}
+
+        # Total supply plus the common limit getters in one batched read (missing getters come back None)
+        reads = [(token_address, field) for field in ('totalSupply', '_maxTxAmount', 'maxTransactionAmount', '_maxWalletSize')]
+        total_supply, max_tx, max_tx_alt, max_wallet = await (
+            context.aread(reads) if context is not None else token_reads.aread(chain, reads))
+        if total_supply is None:
             return {'has_limits': False, 'details': 'No limits'}
 
-        # Check for common limit functions
-        limit_abi = [
-            {"constant":True,"inputs":[],"name":"_maxTxAmount","outputs":[{"name":"","type":"uint256"}],"type":"function"},
-            {"constant":True,"inputs":[],"name":"maxTransactionAmount","outputs":[{"name":"","type":"uint256"}],"type":"function"},
-            {"constant":True,"inputs":[],"name":"_maxWalletSize","outputs":[{"name":"","type":"uint256"}],"type":"function"},
-        ]
-        
-        contract = target_w3.eth.contract(address=token_address, abi=ERC20_ABI + limit_abi)
-        
-        # Try to get total supply for percentage calculation
-        total_supply = contract.functions.totalSupply().call()
-        
         has_limits = False
         limit_details = []
-        
+
         # Check max transaction amount
-        try:
-            max_tx = contract.functions._maxTxAmount().call()
-            if max_tx > 0 and max_tx < total_supply:
-                has_limits = True
-                limit_pct = (max_tx / total_supply) * 100
-                limit_details.append(f"Max TX: {limit_pct:.2f}%")
-        except:
-            try:
-                max_tx = contract.functions.maxTransactionAmount().call()
-                if max_tx > 0 and max_tx < total_supply:
-                    has_limits = True
-                    limit_pct = (max_tx / total_supply) * 100
-                    limit_details.append(f"Max TX: {limit_pct:.2f}%")
-            except:
-                pass
-        
+        if max_tx is None:
+            max_tx = max_tx_alt
+        if max_tx is not None and max_tx > 0 and max_tx < total_supply:
+            has_limits = True
+            limit_pct = (max_tx / total_supply) * 100
+            limit_details.append(f"Max TX: {limit_pct:.2f}%")
+
         # Check max wallet size
-        try:
-            max_wallet = contract.functions._maxWalletSize().call()
-            if max_wallet > 0 and max_wallet < total_supply:
-                has_limits = True
-                limit_pct = (max_wallet / total_supply) * 100
-                limit_details.append(f"Max Wallet: {limit_pct:.2f}%")
-        except:
-            pass
-        
+        if max_wallet is not None and max_wallet > 0 and max_wallet < total_supply:
+            has_limits = True
+            limit_pct = (max_wallet / total_supply) * 100
+            limit_details.append(f"Max Wallet: {limit_pct:.2f}%")
+
         return {
             'has_limits': has_limits,
             'details': ', '.join(limit_details) if limit_details else 'No limits'
@@ -882,51 +854,34 @@ async def check_transfer_limits(token_address: str, chain: str = 'base') -> dict
     
     return {'has_limits': False, 'details': 'No limits'}
 
-async def calculate_clog_percentage(token_address: str, pair_address: str) -> float:
+async def calculate_clog_percentage(token_address: str, pair_address: str, session: aiohttp.ClientSession = None) -> float:
     """Calculate network clog percentage based on recent transactions"""
     try:
         # Get recent transactions for the pair
-        url = f"https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_KEY}"
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "alchemy_getAssetTransfers",
-            "params": [{
-                "fromBlock": "latest",
-                "toBlock": "latest",
-                "contractAddresses": [token_address],
-                "category": ["erc20"],
-                "maxCount": "0x5",
-                "withMetadata": True
-            }]
-        }
-        
-        resp = requests.post(url, json=payload, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            transfers = data.get('result', {}).get('transfers', [])
+        async with _metrics_session(session) as http:
+            transfers = await _alchemy_asset_transfers(http, token_address, 5)
+
+        if transfers:
+            # Calculate average gas used
+            total_gas = 0
+            count = 0
+            for tx in transfers:
+                if tx.get('metadata', {}).get('gasUsed'):
+                    total_gas += int(tx['metadata']['gasUsed'], 16)
+                    count += 1
             
-            if transfers:
-                # Calculate average gas used
-                total_gas = 0
-                count = 0
-                for tx in transfers:
-                    if tx.get('metadata', {}).get('gasUsed'):
-                        total_gas += int(tx['metadata']['gasUsed'], 16)
-                        count += 1
-                
-                if count > 0:
-                    avg_gas = total_gas / count
-                    # Clog percentage: (avg_gas / 300000) * 100
-                    # 300000 is typical max gas for a swap
-                    clog_pct = min((avg_gas / 300000) * 100, 100)
-                    return round(clog_pct, 2)
+            if count > 0:
+                avg_gas = total_gas / count
+                # Clog percentage: (avg_gas / 300000) * 100
+                # 300000 is typical max gas for a swap
+                clog_pct = min((avg_gas / 300000) * 100, 100)
+                return round(clog_pct, 2)
     except Exception as e:
         logger.debug(f"Clog calculation failed: {e}")
     
     return 0.03  # Default minimal clog
 
-async def detect_airdrops(token_address: str, chain: str = 'base') -> list:
+async def detect_airdrops(token_address: str, chain: str = 'base', session: aiohttp.ClientSession = None) -> list:
     """Detect if token has airdrop functionality or recent batch transfers"""
     airdrops = []
     
@@ -953,49 +908,48 @@ async def detect_airdrops(token_address: str, chain: str = 'base') -> list:
         
         # Check recent transactions for batch transfers
         if chain == 'base' and ALCHEMY_KEY:
-            url = f"https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_KEY}"
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "alchemy_getAssetTransfers",
-                "params": [{
-                    "fromBlock": "latest",
-                    "toBlock": "latest",
-                    "contractAddresses": [token_address],
-                    "category": ["erc20"],
-                    "maxCount": "0xa",
-                    "withMetadata": True
-                }]
-            }
-        
-            resp = requests.post(url, json=payload, timeout=10)
-            if resp.status_code == 200:
-                data = resp.json()
-                transfers = data.get('result', {}).get('transfers', [])
-                
-                # Group by transaction hash
-                tx_groups = {}
-                for transfer in transfers:
-                    tx_hash = transfer.get('hash')
-                    if tx_hash:
-                        if tx_hash not in tx_groups:
-                            tx_groups[tx_hash] = 0
-                        tx_groups[tx_hash] += 1
-                
-                # If any transaction has 5+ transfers, it's likely an airdrop
-                for tx_hash, count in tx_groups.items():
-                    if count >= 5:
-                        airdrops.append(f"Batch transfer detected ({count} recipients)")
-                        break
+            async with _metrics_session(session) as http:
+                transfers = await _alchemy_asset_transfers(http, token_address, 10)
+
+            # Group by transaction hash
+            tx_groups = {}
+            for transfer in transfers:
+                tx_hash = transfer.get('hash')
+                if tx_hash:
+                    if tx_hash not in tx_groups:
+                        tx_groups[tx_hash] = 0
+                    tx_groups[tx_hash] += 1
+            
+            # If any transaction has 5+ transfers, it's likely an airdrop
+            for tx_hash, count in tx_groups.items():
+                if count >= 5:
+                    airdrops.append(f"Batch transfer detected ({count} recipients)")
+                    break
     
     except Exception as e:
         logger.debug(f"Airdrop detection failed: {e}")
     
     return airdrops
 
+async def _bounded_source(name: str, coro, default, unavailable: list):
+    """One metrics source under its own timeout; a slow or failing source yields its default and is noted"""
+    try:
+        return await asyncio.wait_for(coro, timeout=METRICS_SOURCE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.debug(f"Metrics source {name} timed out after {METRICS_SOURCE_TIMEOUT}s")
+    except Exception as e:
+        logger.debug(f"Metrics source {name} failed: {e}")
+    unavailable.append(name)
+    return default
+
 async def get_comprehensive_metrics(token_address: str, pair_address: str, base_token_address: str, 
-                                   total_supply: int, decimals: int, premium: bool = False, chain: str = 'base') -> dict:
-    """Get all comprehensive metrics for a token"""
+                                   total_supply: int, decimals: int, premium: bool = False, chain: str = 'base',
+                                   context: TokenAnalysisContext = None) -> dict:
+    """
+    Get all comprehensive metrics for a token (chain reads reuse the launch's context when given).
+    The sources run concurrently, each bounded by METRICS_SOURCE_TIMEOUT; whatever did not answer in
+    time keeps its default and is listed in metrics['partial'].
+    """
     metrics = {
         'price_usd': 0,
         'market_cap': 0,
@@ -1005,18 +959,45 @@ async def get_comprehensive_metrics(token_address: str, pair_address: str, base_
         'has_limits': False,
         'limit_details': 'No limits',
         'clog_percentage': 0.03,
-        'airdrops': []
+        'airdrops': [],
+        'partial': []
     }
+    started = time.monotonic()
+    unavailable = metrics['partial']
     
     try:
-        # Get DexScreener data (price, volume, liquidity, MC)
-        # IMPORTANT: DexScreener API expects token address, not pair address
-        dex_data = await get_dexscreener_data(token_address)
+        # No session-level timeout: _bounded_source cancels whichever request overruns its budget
+        async with aiohttp.ClientSession() as session:
+            async def price():
+                # IMPORTANT: DexScreener API expects token address, not pair address.
+                dex_data = await _bounded_source('dexscreener', get_dexscreener_data(token_address, session=session),
+                                                 {}, unavailable)
+                if dex_data.get('price_usd'):
+                    return dex_data, 0
+                # Fallback: price from pool reserves (extra RPC reads, only when DexScreener has no price yet);
+                # it still overlaps the other sources rather than running after them
+                return dex_data, await _bounded_source('pool_price', calculate_pool_price(
+                    pair_address, token_address, base_token_address, chain=chain, context=context), 0, unavailable)
+
+            sources = {
+                'price': price(),
+                'limits': _bounded_source('limits', check_transfer_limits(token_address, chain=chain, context=context),
+                                          {'has_limits': False, 'details': 'No limits'}, unavailable),
+                'airdrops': _bounded_source('airdrops', detect_airdrops(token_address, chain=chain, session=session),
+                                            [], unavailable),
+            }
+            # Clog percentage is skipped for Monad as it relies on Alchemy (keeps its default)
+            if chain == 'base':
+                sources['clog'] = _bounded_source('clog', calculate_clog_percentage(token_address, pair_address, session=session),
+                                                  metrics['clog_percentage'], unavailable)
+            results = dict(zip(sources, await asyncio.gather(*sources.values())))
+
+        dex_data, pool_price = results['price']
+        limits = results['limits']
         metrics.update(dex_data)
-        
-        # If DexScreener didn't return price, calculate from pool
+
+        # If DexScreener didn't return price, use the pool price
         if metrics['price_usd'] == 0:
-            pool_price = await calculate_pool_price(pair_address, token_address, base_token_address, chain=chain)
             metrics['price_usd'] = pool_price
             
             # Calculate market cap manually if we have price
@@ -1024,21 +1005,17 @@ async def get_comprehensive_metrics(token_address: str, pair_address: str, base_
                 supply_formatted = total_supply / (10 ** decimals)
                 metrics['market_cap'] = pool_price * supply_formatted
         
-        # Get transfer limits
-        limits = await check_transfer_limits(token_address, chain=chain)
         metrics['has_limits'] = limits['has_limits']
         metrics['limit_details'] = limits['details']
-        
-        # Get clog percentage (skip for Monad as it relies on Alchemy)
-        if chain == 'base':
-            metrics['clog_percentage'] = await calculate_clog_percentage(token_address, pair_address)
-        
-        # Detect airdrops
-        metrics['airdrops'] = await detect_airdrops(token_address, chain=chain)
+        metrics['clog_percentage'] = results.get('clog', metrics['clog_percentage'])
+        metrics['airdrops'] = results['airdrops']
         
     except Exception as e:
         logger.error(f"Error getting comprehensive metrics: {e}")
     
+    if unavailable:
+        logger.info(f"⏱️ Metrics for {token_address} partial after {time.monotonic() - started:.1f}s "
+                    f"(no answer from {', '.join(unavailable)})")
     return metrics
 
 # ===== ALERT FUNCTIONS =====
@@ -1050,6 +1027,22 @@ _group_post_cooldown_until = 0  # timestamp when cooldown ends
 # Track background tasks to prevent garbage collection
 _background_tasks = set()
 
+# Log arrival → analyze_token start latency, per chain and ingestion path
+ingest_latency = LatencyTracker()
+
+# Discovered pairs are analyzed + alerted by this pool instead of inline in the scan loop
+analysis_pool = AnalysisPool(workers=ANALYSIS_WORKERS)
+analysis_executor = ChainExecutor('analysis', max_workers=ANALYSIS_WORKERS)
+# RPC calls per analyzed launch (TokenAnalysisContext counts)
+launch_costs = LaunchCostTracker()
+heavy_analysis = AnalysisTier('heavy analysis', max_workers=HEAVY_ANALYSIS_WORKERS,
+                              max_pending=HEAVY_ANALYSIS_MAX_PENDING, deadline=ONCHAIN_ANALYSIS_DEADLINE)
+# Blocking calls made on behalf of a user command (never queued behind launch analysis)
+interactive_executor = ChainExecutor('interactive', max_workers=2)
+loop_lag = LoopLagMonitor()
+alert_editor = AlertEditor(rate=ALERT_EDIT_RATE, dm_interval=ALERT_EDIT_DM_INTERVAL, group_interval=ALERT_EDIT_GROUP_INTERVAL)
+rpc_budget = RpcBudget(RPC_BUDGET_PER_SECOND, RPC_BUDGET_BURST)
+
 async def _auto_delete_message(app: Application, chat_id: int, message_id: int, delay: int = 300, scheduled_time: int = 0):
     """Delete a message after delay seconds (default 5 minutes)"""
     try:
@@ -1140,162 +1133,185 @@ async def cleanup_old_group_posts(app: Application):
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
             await asyncio.sleep(60)  # Wait before retry on error
-async def post_to_group_with_buy_button(app: Application, analysis: dict, metrics: dict):
-    """Post ALL projects to groups - formats messages directly (no external dependencies)"""
+def _default_metrics() -> dict:
+    """Metrics shown until (or instead of) get_comprehensive_metrics results"""
+    return {
+        'price_usd': 0,
+        'market_cap': 0,
+        'liquidity_usd': 0,
+        'volume_24h': 0,
+        'ath': None,
+        'has_limits': False,
+        'limit_details': 'No limits',
+        'clog_percentage': 0.03,
+        'airdrops': [],
+        'partial': []
+    }
+
+def group_alert_keyboard(analysis: dict) -> InlineKeyboardMarkup:
+    """Group post buttons - all redirect to DM for privacy"""
+    contract = analysis.get('token_address', '')
+    chain_config = chain_registry[analysis.get('chain', 'base')]
+    keyboard = [
+        [
+            InlineKeyboardButton("📊 Chart", url=chain_config.dexscreener_url(contract)),
+            InlineKeyboardButton("🔍 Scan", url=f"https://t.me/{BOT_USERNAME}?start=scan_{contract}"),
+        ],
+        [
+            InlineKeyboardButton("🦄 Swap", url=chain_config.swap_link(contract)),
+            InlineKeyboardButton("🎯 Buy", url=f"https://t.me/{BOT_USERNAME}?start=buy_{contract}"),
+        ],
+        [
+            InlineKeyboardButton("📣 Advertise Your Project", url=f"https://t.me/{BOT_USERNAME}?start=advertise"),
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def format_group_alert(analysis: dict, metrics: dict = None, onchain_section: str = '', loading: tuple = ()) -> str:
+    """
+    Group post text (HTML). Without metrics it is the basic first-phase alert (name, symbol, DEX, pair,
+    contract); `loading` names the sections still on their way.
+    """
+    contract = analysis.get('token_address', '')
+    score = analysis.get('security_score', 50)
+    
+    # Format numbers
+    def fmt(num):
+        if num >= 1_000_000: return f"${num/1_000_000:.1f}M"
+        elif num >= 1_000: return f"${num/1_000:.1f}K"
+        elif num > 0: return f"${num:.2f}"
+        return "N/A"
+    
+    name = analysis.get('name', 'Unknown')
+    symbol = analysis.get('symbol', 'N/A').upper()
+    
+    # Check if this is a sponsored project
+    is_sponsored = contract.lower() in sponsored_projects
+    sponsor_badge = "⭐ SPONSORED ⭐ " if is_sponsored else ""
+    
+    dex_name = analysis.get('dex_name', 'Unknown')
+    dex_emoji = analysis.get('dex_emoji', '🔷')
+    chain = analysis.get('chain', 'base')
+    chain_label = chain_registry[chain].label
+    loading_line = f"⏳ <i>Loading {', '.join(loading)}...</i>\n\n" if loading else ""
+    footer = (
+        f"⚠️ <i>DYOR! Not financial advice.</i>\n\n"
+        f"📣 <b>Want your project featured?</b>\n"
+        f"Contact @{BOT_USERNAME} for promoted listings!\n"
+        f"🚀 Reach 1000s of active Base traders"
+    )
+
+    if metrics is None:
+        return (
+            f"{sponsor_badge}🚀 <b>NEW TOKEN LAUNCH</b> {chain_label} {'💎' if is_sponsored else ''}\n"
+            f"━━━━━━━━━━━━━━━━\n\n"
+            f"<b>{name}</b> (${symbol})\n\n"
+            f"🏪 DEX: {dex_name} {dex_emoji}\n"
+            f"💧 Pair: <code>{analysis.get('pair_address', '')}</code>\n"
+            f"📍 Contract: <code>{contract}</code>\n\n"
+            f"{loading_line}"
+            f"{footer}"
+        )
+
+    mc = fmt(metrics.get('market_cap', 0))
+    liq = fmt(metrics.get('liquidity_usd', 0))
+    vol = fmt(metrics.get('volume_24h', 0))
+    
+    # Score emoji
+    if score >= 75: score_emoji = "🟢"
+    elif score >= 50: score_emoji = "🟡"
+    elif score >= 25: score_emoji = "🔴"
+    else: score_emoji = "⛔"
+    
+    # Safety details
+    renounced = analysis.get('renounced', False)
+    honeypot = analysis.get('is_honeypot', False)
+    lp_locked = analysis.get('liquidity_locked', False)
+    lock_days = analysis.get('lock_days', 0)
+    buy_tax = analysis.get('buy_tax', 0)
+    sell_tax = analysis.get('sell_tax', 0)
+    
+    # Status emojis
+    own_emoji = '✅' if renounced else '⚠️'
+    hp_emoji = '✅' if not honeypot else '🚨'
+    lp_emoji = '✅' if lp_locked else '❌'
+    
+    launch_time = datetime.now(timezone.utc).strftime("%H:%M UTC")
+    
+    # Price info
+    price_usd = metrics.get('price_usd', 0)
+    price_str = f"${price_usd:.8f}" if price_usd > 0 else "N/A"
+    price_change = metrics.get('price_change_24h', 0)
+    change_emoji = "🟢" if price_change > 0 else "🔴" if price_change < 0 else "⚪"
+    change_str = f"{change_emoji} {'+' if price_change > 0 else ''}{price_change:.2f}%"
+    
+    # Token scores (reuse from analysis if available)
+    try:
+        scores = calculate_token_scores(analysis, metrics)
+        social_score = format_score(scores['social_score'])
+        viral_score = format_score(scores['viral_score'])
+        security_score_str = format_score(scores['security_score'])
+        overall_score = format_score(scores['overall_score'])
+    except Exception:
+        social_score = "N/A"
+        viral_score = "N/A"
+        security_score_str = f"{score_emoji} {score}/100"
+        overall_score = f"{score_emoji} {score}/100"
+    
+    # Build message (HTML format - matching DM design)
+    return (
+        f"{sponsor_badge}🚀 <b>NEW TOKEN LAUNCH</b> {chain_label} {'💎' if is_sponsored else ''}\n"
+        f"━━━━━━━━━━━━━━━━\n\n"
+        f"<b>{name}</b> (${symbol})\n\n"
+        f"{loading_line}"
+        f"📊 <b>LIVE MARKET DATA</b>\n"
+        f"💰 Price: {price_str}\n"
+        f"🏦 Market Cap: <b>{mc}</b>\n"
+        f"📊 Volume (24h): {vol}\n"
+        f"💧 Liquidity: {liq}\n"
+        f"📉 Change (24h): {change_str}\n"
+        f"🏪 DEX: {dex_name} {dex_emoji}\n"
+        f"🚀 Release: {launch_time}\n"
+        f"━━━━━━━━━━━━━━━━\n"
+        f"🎱 <b>TOKEN SCORES</b>\n"
+        f"📱 Social Score: {social_score}\n"
+        f"🚀 Viral Score: {viral_score}\n"
+        f"🔒 Security Score: {security_score_str}\n"
+        f"⭐️ Overall Score: {overall_score}\n"
+        f"━━━━━━━━━━━━━━━━\n\n"
+        f"🛡️ <b>SAFETY CHECKS</b>\n"
+        f"{own_emoji} Ownership: {'Renounced ✅' if renounced else 'NOT Renounced ⚠️'}\n"
+        f"{hp_emoji} Honeypot: {'SAFE' if not honeypot else 'DETECTED ⚠️'}\n"
+        f"{lp_emoji} LP Locked: {'YES' if lp_locked else 'NO'}"
+        f"{f' ({lock_days} days)' if lp_locked and lock_days else ''}\n"
+        f"🏧 Taxes: B:{buy_tax:.1f}% S:{sell_tax:.1f}%\n"
+        # On-chain analytics section
+        f"{onchain_section}"
+        f"━━━━━━━━━━━━━━━━\n\n"
+        f"📍 <b>CONTRACT</b>\n"
+        f"<code>{contract}</code>\n\n"
+        f"{footer}"
+    )
+
+async def post_to_group_with_buy_button(app: Application, analysis: dict, metrics: dict = None, onchain_section: str = '',
+                                        loading: tuple = (), posted: list = None) -> list:
+    """
+    Post ALL projects to groups - formats messages directly (no external dependencies).
+    Returns (group_id, message_id) per post so send_launch_alert can enrich them in place; pass `posted`
+    to have each post appended to that list as soon as it is sent.
+    """
     global _group_post_count, _group_post_cooldown_until
+    posted = [] if posted is None else posted
     
     try:
         # No cooldown - post every qualifying token immediately
-        
-        # Get security score for display
         contract = analysis.get('token_address', '')
         score = analysis.get('security_score', 50)
-        
-        # Format numbers
-        def fmt(num):
-            if num >= 1_000_000: return f"${num/1_000_000:.1f}M"
-            elif num >= 1_000: return f"${num/1_000:.1f}K"
-            elif num > 0: return f"${num:.2f}"
-            return "N/A"
-        
         name = analysis.get('name', 'Unknown')
         symbol = analysis.get('symbol', 'N/A').upper()
-        
-        # Check if this is a sponsored project
         is_sponsored = contract.lower() in sponsored_projects
-        sponsor_badge = "⭐ SPONSORED ⭐ " if is_sponsored else ""
-        
-        dex_name = analysis.get('dex_name', 'Unknown')
-        dex_emoji = analysis.get('dex_emoji', '🔷')
-        mc = fmt(metrics.get('market_cap', 0))
-        liq = fmt(metrics.get('liquidity_usd', 0))
-        vol = fmt(metrics.get('volume_24h', 0))
-        
-        # Score emoji
-        if score >= 75: score_emoji = "🟢"
-        elif score >= 50: score_emoji = "🟡"
-        elif score >= 25: score_emoji = "🔴"
-        else: score_emoji = "⛔"
-        
-        # Safety details
-        renounced = analysis.get('renounced', False)
-        honeypot = analysis.get('is_honeypot', False)
-        lp_locked = analysis.get('liquidity_locked', False)
-        lock_days = analysis.get('lock_days', 0)
-        buy_tax = analysis.get('buy_tax', 0)
-        sell_tax = analysis.get('sell_tax', 0)
-        
-        # Status emojis
-        own_emoji = '✅' if renounced else '⚠️'
-        hp_emoji = '✅' if not honeypot else '🚨'
-        lp_emoji = '✅' if lp_locked else '❌'
-        
-        launch_time = datetime.now(timezone.utc).strftime("%H:%M UTC")
-        
-        # Price info
-        price_usd = metrics.get('price_usd', 0)
-        price_str = f"${price_usd:.8f}" if price_usd > 0 else "N/A"
-        price_change = metrics.get('price_change_24h', 0)
-        change_emoji = "🟢" if price_change > 0 else "🔴" if price_change < 0 else "⚪"
-        change_str = f"{change_emoji} {'+' if price_change > 0 else ''}{price_change:.2f}%"
-        
-        # Token scores (reuse from analysis if available)
-        try:
-            scores = calculate_token_scores(analysis, metrics)
-            social_score = format_score(scores['social_score'])
-            viral_score = format_score(scores['viral_score'])
-            security_score_str = format_score(scores['security_score'])
-            overall_score = format_score(scores['overall_score'])
-        except Exception:
-            social_score = "N/A"
-            viral_score = "N/A"
-            security_score_str = f"{score_emoji} {score}/100"
-            overall_score = f"{score_emoji} {score}/100"
-        
-        # Build message (HTML format - matching DM design)
-        chain = analysis.get('chain', 'base')
-        chain_label = '🔵 Base' if chain == 'base' else '🟣 Monad'
-        message_text = (
-            f"{sponsor_badge}🚀 <b>NEW TOKEN LAUNCH</b> {chain_label} {'💎' if is_sponsored else ''}\n"
-            f"━━━━━━━━━━━━━━━━\n\n"
-            f"<b>{name}</b> (${symbol})\n\n"
-            f"📊 <b>LIVE MARKET DATA</b>\n"
-            f"💰 Price: {price_str}\n"
-            f"🏦 Market Cap: <b>{mc}</b>\n"
-            f"📊 Volume (24h): {vol}\n"
-            f"💧 Liquidity: {liq}\n"
-            f"📉 Change (24h): {change_str}\n"
-            f"🏪 DEX: {dex_name} {dex_emoji}\n"
-            f"🚀 Release: {launch_time}\n"
-            f"━━━━━━━━━━━━━━━━\n"
-            f"🎱 <b>TOKEN SCORES</b>\n"
-            f"📱 Social Score: {social_score}\n"
-            f"🚀 Viral Score: {viral_score}\n"
-            f"🔒 Security Score: {security_score_str}\n"
-            f"⭐️ Overall Score: {overall_score}\n"
-            f"━━━━━━━━━━━━━━━━\n\n"
-            f"🛡️ <b>SAFETY CHECKS</b>\n"
-            f"{own_emoji} Ownership: {'Renounced ✅' if renounced else 'NOT Renounced ⚠️'}\n"
-            f"{hp_emoji} Honeypot: {'SAFE' if not honeypot else 'DETECTED ⚠️'}\n"
-            f"{lp_emoji} LP Locked: {'YES' if lp_locked else 'NO'}"
-            f"{f' ({lock_days} days)' if lp_locked and lock_days else ''}\n"
-            f"🏧 Taxes: B:{buy_tax:.1f}% S:{sell_tax:.1f}%\n"
-        )
-        
-        # Add on-chain analytics section
-        if onchain_analyzer:
-            try:
-                onchain_data = onchain_analyzer.analyze_token_onchain(
-                    contract,
-                    pair_address=analysis.get('pair_address'),
-                    total_supply=analysis.get('total_supply', 0),
-                    decimals=analysis.get('decimals', 18)
-                )
-                message_text += format_onchain_section_html(onchain_data)
-            except Exception as e:
-                logger.warning(f"On-chain analysis failed for group post: {e}")
-        
-        message_text += (
-            f"━━━━━━━━━━━━━━━━\n\n"
-            f"📍 <b>CONTRACT</b>\n"
-            f"<code>{contract}</code>\n\n"
-            f"⚠️ <i>DYOR! Not financial advice.</i>\n\n"
-            f"📣 <b>Want your project featured?</b>\n"
-            f"Contact @{BOT_USERNAME} for promoted listings!\n"
-            f"🚀 Reach 1000s of active Base traders"
-        )
-        
-        # Determine correct explorer links
-        chain = analysis.get('chain', 'base')
-        if chain == 'monad':
-            scan_url = f"https://monadscan.com/token/{contract}"
-            dex_url = f"https://dexscreener.com/monad/{contract}"
-            swap_url = f"https://app.uniswap.org/#/tokens/monad/{contract}" # Assumption for Uniswap
-            # Or use Monad specific DEX if known. Standard Uniswap URL structure usually supports chain prefixes if supported.
-            # But Monad might not be on standard app.uniswap.org yet.
-            # Let's keep it simple or use a generic swap link if unsure.
-            # The user docs didn't specify swap URL.
-            # Let's use dex_url for chart.
-        else: # Base
-            scan_url = f"https://basescan.org/token/{contract}"
-            dex_url = f"https://dexscreener.com/base/{contract}"
-            swap_url = f"https://app.uniswap.org/#/tokens/base/{contract}"
-
-        # Action buttons - all redirect to DM for privacy
-        keyboard = [
-            [
-                InlineKeyboardButton("📊 Chart", url=dex_url),
-                InlineKeyboardButton("🔍 Scan", url=f"https://t.me/{BOT_USERNAME}?start=scan_{contract}"),
-            ],
-            [
-                InlineKeyboardButton("🦄 Swap", url=swap_url),
-                InlineKeyboardButton("🎯 Buy", url=f"https://t.me/{BOT_USERNAME}?start=buy_{contract}"),
-            ],
-            [
-                InlineKeyboardButton("📣 Advertise Your Project", url=f"https://t.me/{BOT_USERNAME}?start=advertise"),
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        message_text = format_group_alert(analysis, metrics, onchain_section, loading)
+        reply_markup = group_alert_keyboard(analysis)
         
         # Get all auto-detected groups
         all_groups = db.get_all_groups()
@@ -1310,7 +1326,7 @@ async def post_to_group_with_buy_button(app: Application, analysis: dict, metric
         
         if not all_groups:
             logger.info(f"No groups configured. Add bot to a group for auto-posting!")
-            return
+            return posted
         
         logger.info(f"📢 Posting {name} (${symbol}) to {len(all_groups)} group(s) (score: {score}/100)")
         
@@ -1325,6 +1341,10 @@ async def post_to_group_with_buy_button(app: Application, analysis: dict, metric
                     disable_web_page_preview=True
                 )
                 db.update_group_post_count(group['group_id'])
+                db.add_alert_message(analysis.get('chain', 'base'), analysis['pair_address'], group['group_id'], sent_msg.message_id, 'group',
+                                     block=analysis.get('block'))
+                alert_editor.track(group['group_id'], sent_msg.message_id, message_text)
+                posted.append((group['group_id'], sent_msg.message_id))
                 logger.info(f"📢 Posted to group {group['group_id']}: {name} (score: {score}/100)")
                 
                 # Schedule auto-delete after 4 minutes (skip for sponsored)
@@ -1346,88 +1366,53 @@ async def post_to_group_with_buy_button(app: Application, analysis: dict, metric
                 logger.warning(f"Failed to post to group {group['group_id']}: {e}")
         
         # Post count tracking (no cooldown)
-        _group_post_count += 1
-        logger.info(f"📊 Total group posts this session: {_group_post_count}")
-    except Exception as e:
-        logger.error(f"Error in group posting: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-async def send_launch_alert(app: Application, analysis: dict):
-    """Send alert for new token launch - includes safety score for user reference"""
-
-    # Get security score for display (NOT for filtering)
-    contract = analysis.get('token_address')
-    try:
-        rating = security_scanner.scan_token(contract) if security_scanner else {}
+        _group_post_count += 1
+        logger.info(f"📊 Total group posts this session: {_group_post_count}")
     except Exception as e:
-        logger.warning(f"Security scan error for {contract}: {e}")
-        rating = {}
-    score = rating.get('score', 50)  # Default to 50 if scan fails
-    analysis['security_score'] = score
-    analysis['security_rating'] = rating
-    
-    # Enrich analysis with security details for group posting
-    rug_data = rating.get('rug_detection', {})
-    hp_data = rating.get('honeypot', {})
-    analysis['is_honeypot'] = hp_data.get('is_honeypot', False)
-    analysis['risk_level'] = rating.get('risk_level', 'UNKNOWN')
-    analysis['warnings'] = rating.get('warnings', [])
-    # Only override renounced if scanner found a result
-    if 'ownership_renounced' in rug_data:
-        analysis['renounced'] = rug_data['ownership_renounced']
-    
-    logger.info(f"📢 Sending alert for {analysis.get('name')} (safety score: {score}/100)")
-
-    # Get all users with alerts enabled
-    users = db.get_users_with_alerts()
-
-    # Separate premium and free users for priority delivery
-    premium_users = []
-    free_users = []
+        logger.error(f"Error in group posting: {e}")
+        import traceback
+        traceback.print_exc()
+    return posted
 
-    for user in users:
-        user_data = db.get_user(user['user_id'])
-        if user_data and user_data['tier'] == 'premium':
-            premium_users.append(user)
-        else:
-            free_users.append(user)
 
-    # Fetch comprehensive metrics
-    analysis_chain = analysis.get('chain', 'base')
-    
-    # Determine correct base token address for the chain
-    base_sym = analysis.get('base_token', 'WETH')
-    if analysis_chain == 'monad':
-        base_address = MONAD_USDC_ADDRESS if base_sym == 'USDC' else MONAD_WETH_ADDRESS
-    else:
-        base_address = USDC_ADDRESS if base_sym == 'USDC' else WETH_ADDRESS
+def dm_alert_keyboard(analysis: dict) -> InlineKeyboardMarkup:
+    """DM alert buttons (explorer, pair, DexScreener, swap)"""
+    chain_config = chain_registry[analysis.get('chain', 'base')]
+    keyboard = [
+        [
+            InlineKeyboardButton("🔍 View Token", url=chain_config.token_url(analysis['token_address'])),
+            InlineKeyboardButton("💧 View Pair", url=chain_config.address_url(analysis['pair_address']))
+        ],
+        [
+            InlineKeyboardButton("📊 DexScreener", url=chain_config.dexscreener_url(analysis['pair_address'])),
+            InlineKeyboardButton("🦄 Uniswap", url=chain_config.swap_link(analysis['token_address']))
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)
 
-    # Fetch comprehensive metrics
-    try:
-        metrics = await get_comprehensive_metrics(
-            analysis['token_address'],
-            analysis['pair_address'],
-            base_address,
-            analysis['total_supply'],
-            analysis['decimals'],
-            premium=True,
-            chain=analysis_chain
+def format_dm_alert(analysis: dict, metrics: dict = None, onchain_section: str = '', premium: bool = False,
+                    loading: tuple = ()) -> str:
+    """
+    DM alert text (Markdown), premium or free layout. Without metrics it is the basic first-phase alert
+    (name, symbol, DEX, pair, contract); `loading` names the sections still on their way.
+    """
+    header = f"🚀 *NEW TOKEN LAUNCH*{' 💎' if premium else ''}\n"
+    title = f"*{analysis['name']}* (${analysis['symbol'].upper()})\n\n"
+    dex_line = f"🏪 DEX: {analysis.get('dex_name', 'Unknown')} {analysis.get('dex_emoji', '🔷')}\n"
+    loading_line = f"⏳ _Loading {', '.join(loading)}..._\n\n" if loading else ""
+
+    if metrics is None:
+        return (
+            f"{header}"
+            f"━━━━━━━━━━━━━━━━\n\n"
+            f"{title}"
+            f"⛓️ Chain: {chain_registry[analysis.get('chain', 'base')].label}\n"
+            f"{dex_line}"
+            f"💧 Pair: `{analysis['pair_address']}`\n"
+            f"📍 Contract: `{analysis['token_address']}`\n\n"
+            f"{loading_line}"
+            f"⚠️ *DYOR! Not financial advice.*"
         )
-    except Exception as e:
-        logger.error(f"Failed to fetch metrics: {e}")
-        metrics = {
-            'price_usd': 0,
-            'market_cap': 0,
-            'liquidity_usd': 0,
-            'volume_24h': 0,
-            'ath': None,
-            'has_limits': False,
-            'limit_details': 'No limits',
-            'clog_percentage': 0.03,
-            'airdrops': []
-        }
 
     # Format numbers
     def format_number(num):
@@ -1439,7 +1424,6 @@ async def send_launch_alert(app: Application, analysis: dict):
             return f"${num:.2f}"
 
     mc_str = format_number(metrics['market_cap']) if metrics['market_cap'] > 0 else "N/A"
-    ath_str = format_number(metrics['ath']) if metrics.get('ath') else "N/A"
     liq_str = format_number(metrics['liquidity_usd']) if metrics['liquidity_usd'] > 0 else "N/A"
     price_str = f"${metrics['price_usd']:.8f}" if metrics['price_usd'] > 0 else "N/A"
     vol_str = format_number(metrics['volume_24h']) if metrics['volume_24h'] > 0 else "N/A"
@@ -1447,47 +1431,16 @@ async def send_launch_alert(app: Application, analysis: dict):
     # Get tax info from analysis
     buy_tax = analysis.get('buy_tax', 0)
     sell_tax = analysis.get('sell_tax', 0)
-    transfer_tax = analysis.get('transfer_tax', 0)
-    total_tax = buy_tax + sell_tax + transfer_tax
 
     # Safety check emoji
     status_emoji = "✅" if analysis['renounced'] else "⚠️"
 
-    # Airdrop info
-    airdrop_str = ", ".join(metrics['airdrops']) if metrics['airdrops'] else "None detected"
-
-    # Create action buttons
-    if analysis_chain == 'monad':
-        scan_url_base = f"https://monadscan.com/token/{analysis['token_address']}"
-        scan_url_pair = f"https://monadscan.com/address/{analysis['pair_address']}"
-        dex_url = f"https://dexscreener.com/monad/{analysis['pair_address']}"
-        uniswap_url = f"https://app.uniswap.org/#/tokens/monad/{analysis['token_address']}"
-    else: # Base
-        scan_url_base = f"https://basescan.org/token/{analysis['token_address']}"
-        scan_url_pair = f"https://basescan.org/address/{analysis['pair_address']}"
-        dex_url = f"https://dexscreener.com/base/{analysis['pair_address']}"
-        uniswap_url = f"https://app.uniswap.org/#/tokens/base/{analysis['token_address']}"
-
-    keyboard = [
-        [
-            InlineKeyboardButton("🔍 View Token", url=scan_url_base),
-            InlineKeyboardButton("💧 View Pair", url=scan_url_pair)
-        ],
-        [
-            InlineKeyboardButton("📊 DexScreener", url=dex_url),
-            InlineKeyboardButton("🦄 Uniswap", url=uniswap_url)
-        ]
-    ]
-
-    sent_count = 0
-
     # Get price change emoji
     price_change = metrics.get('price_change_24h', 0)
     change_emoji = "🟢" if price_change > 0 else "🔴" if price_change < 0 else "⚪"
     change_str = f"{change_emoji} {'+' if price_change > 0 else ''}{price_change:.2f}%"
     
     # Calculate time since release
-    from datetime import datetime, timezone
     now = datetime.now(timezone.utc)
     pair_created_at = metrics.get('pair_created_at', 0)
     if pair_created_at > 0:
@@ -1503,129 +1456,240 @@ async def send_launch_alert(app: Application, analysis: dict):
     else:
         release_time = "Just now"
         release_date = now.strftime("%b %d, %Y")
-    
-    # Calculate token scores
-    scores = calculate_token_scores(analysis, metrics)
-    
-    # Run on-chain analysis once (shared across all DM alerts)
-    onchain_section_md = ""
-    if onchain_analyzer:
-        try:
-            onchain_data = onchain_analyzer.analyze_token_onchain(
-                analysis['token_address'],
-                pair_address=analysis.get('pair_address'),
-                total_supply=analysis.get('total_supply', 0),
-                decimals=analysis.get('decimals', 18)
-            )
-            onchain_section_md = format_onchain_section_markdown(onchain_data)
-        except Exception as e:
-            logger.warning(f"On-chain analysis failed for DM alerts: {e}")
-    
-    # PRIORITY ALERTS: Send to premium users FIRST (5-10 seconds faster)
-    for user in premium_users:
-        try:
-            message = (
-                f"🚀 *NEW TOKEN LAUNCH* 💎\n"
-                f"━━━━━━━━━━━━━━━━\n\n"
-                f"*{analysis['name']}* (${analysis['symbol'].upper()})\n\n"
-                f"📊 *LIVE MARKET DATA*\n"
-                f"💰 Price: {price_str}\n"
-                f"🏦 Market Cap: {mc_str}\n"
-                f"📊 Volume (24h): {vol_str}\n"
-                f"💧 Liquidity: {liq_str}\n"
-                f"📉 Change (24h): {change_str}\n"
-                f"🏪 DEX: {analysis.get('dex_name', 'Unknown')} {analysis.get('dex_emoji', '🔷')}\n"
-                f"🚀 Release: {release_date} ({release_time})\n"
-                f"━━━━━━━━━━━━━━━━\n"
-                f"🎱 *TOKEN SCORES*\n"
-                f"📱 Social Score: {format_score(scores['social_score'])}\n"
-                f"🚀 Viral Score: {format_score(scores['viral_score'])}\n"
-                f"🔒 Security Score: {format_score(scores['security_score'])}\n"
-                f"⭐️ Overall Score: {format_score(scores['overall_score'])}\n"
-                f"━━━━━━━━━━━━━━━━\n\n"
-                f"🛡️ *SAFETY CHECKS*\n"
-                f"{status_emoji} Ownership: {'Renounced ✅' if analysis['renounced'] else 'NOT Renounced ⚠️'}\n"
-                f"{'✅' if not analysis.get('is_honeypot') else '🚨'} Honeypot: {'SAFE' if not analysis.get('is_honeypot') else 'DETECTED ⚠️'}\n"
-                f"{'✅' if analysis.get('liquidity_locked') else '❌'} LP Locked: {'YES' if analysis.get('liquidity_locked') else 'NO'}"
-            )
-            
-            if analysis.get('liquidity_locked'):
-                message += f" ({analysis.get('lock_days', 0)} days)"
-            
-            message += f"\n🏧 Taxes: B:{buy_tax:.1f}% S:{sell_tax:.1f}%\n"
-            
-            # Add on-chain analytics
-            if onchain_section_md:
-                message += onchain_section_md
-            
-            message += (
-                f"━━━━━━━━━━━━━━━━\n\n"
-                f"📍 *CONTRACT*\n"
-                f"`{analysis['token_address']}`\n\n"
-                f"⚠️ *DYOR! Not financial advice.*"
-            )
-
-            await app.bot.send_message(
-                chat_id=user['user_id'],
-                text=message,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                disable_web_page_preview=True
-            )
-            sent_count += 1
-            await asyncio.sleep(0.03)  # Faster for premium
-        except Exception as e:
-            logger.warning(f"Failed to send to premium user {user['user_id']}: {e}")
 
-    # Standard message for free users
-    free_message = (
-        f"🚀 *NEW TOKEN LAUNCH*\n"
-        f"━━━━━━━━━━━━━━━━\n\n"
-        f"*{analysis['name']}* (${analysis['symbol'].upper()})\n\n"
+    market = (
         f"📊 *LIVE MARKET DATA*\n"
         f"💰 Price: {price_str}\n"
         f"🏦 Market Cap: {mc_str}\n"
         f"📊 Volume (24h): {vol_str}\n"
         f"💧 Liquidity: {liq_str}\n"
         f"📉 Change (24h): {change_str}\n"
-        f"🏪 DEX: {analysis.get('dex_name', 'Unknown')} {analysis.get('dex_emoji', '🔷')}\n"
+        f"{dex_line}"
         f"🚀 Release: {release_date} ({release_time})\n"
+    )
+    ownership = f"{status_emoji} Ownership: {'Renounced ✅' if analysis['renounced'] else 'NOT Renounced ⚠️'}\n"
+    honeypot = f"{'✅' if not analysis.get('is_honeypot') else '🚨'} Honeypot: {'SAFE' if not analysis.get('is_honeypot') else 'DETECTED ⚠️'}\n"
+
+    if premium:
+        # Calculate token scores
+        scores = calculate_token_scores(analysis, metrics)
+        message = (
+            f"{header}"
+            f"━━━━━━━━━━━━━━━━\n\n"
+            f"{title}"
+            f"{loading_line}"
+            f"{market}"
+            f"━━━━━━━━━━━━━━━━\n"
+            f"🎱 *TOKEN SCORES*\n"
+            f"📱 Social Score: {format_score(scores['social_score'])}\n"
+            f"🚀 Viral Score: {format_score(scores['viral_score'])}\n"
+            f"🔒 Security Score: {format_score(scores['security_score'])}\n"
+            f"⭐️ Overall Score: {format_score(scores['overall_score'])}\n"
+            f"━━━━━━━━━━━━━━━━\n\n"
+            f"🛡️ *SAFETY CHECKS*\n"
+            f"{ownership}"
+            f"{honeypot}"
+            f"{'✅' if analysis.get('liquidity_locked') else '❌'} LP Locked: {'YES' if analysis.get('liquidity_locked') else 'NO'}"
+        )
+        
+        if analysis.get('liquidity_locked'):
+            message += f" ({analysis.get('lock_days', 0)} days)"
+        
+        message += f"\n🏧 Taxes: B:{buy_tax:.1f}% S:{sell_tax:.1f}%\n"
+        
+        # Add on-chain analytics
+        message += onchain_section
+        
+        message += (
+            f"━━━━━━━━━━━━━━━━\n\n"
+            f"📍 *CONTRACT*\n"
+            f"`{analysis['token_address']}`\n\n"
+            f"⚠️ *DYOR! Not financial advice.*"
+        )
+        return message
+
+    # Standard message for free users (on-chain analytics included too)
+    return (
+        f"{header}"
+        f"━━━━━━━━━━━━━━━━\n\n"
+        f"{title}"
+        f"{loading_line}"
+        f"{market}"
         f"━━━━━━━━━━━━━━━━\n\n"
         f"🛡️ *SAFETY*\n"
-        f"{status_emoji} Ownership: {'Renounced ✅' if analysis['renounced'] else 'NOT Renounced ⚠️'}\n"
-        f"{'✅' if not analysis.get('is_honeypot') else '🚨'} Honeypot: {'SAFE' if not analysis.get('is_honeypot') else 'DETECTED ⚠️'}\n"
-    )
-    
-    # Add on-chain analytics to free alerts too
-    if onchain_section_md:
-        free_message += onchain_section_md
-    
-    free_message += (
+        f"{ownership}"
+        f"{honeypot}"
+        f"{onchain_section}"
         f"━━━━━━━━━━━━━━━━\n\n"
         f"📍 `{analysis['token_address']}`\n\n"
         f"💡 *Upgrade to Premium for advanced metrics!*\n"
         f"⚠️ *DYOR! Not financial advice.*"
     )
 
-    # Send to free users (after premium users get priority)
-    for user in free_users:
+
+async def send_launch_alert(app: Application, analysis: dict, context: TokenAnalysisContext = None):
+    """
+    Two-phase launch alert. A basic alert (name, symbol, DEX, pair, contract) goes to every DM and group
+    right after analyze_token; meanwhile the security scan, market metrics and on-chain analytics run
+    concurrently and every sent message is edited in place (through alert_editor) as each one lands.
+    Returns once the basic alerts are out, with the enrichment still running as a background task
+    (returned, None if nobody was alerted). The safety score is for user reference, NOT for filtering.
+    """
+    contract = analysis.get('token_address')
+    analysis_chain = analysis.get('chain', 'base')
+    started = time.monotonic()
+
+    # Get all users with alerts enabled
+    users = db.get_users_with_alerts()
+
+    # Separate premium and free users for priority delivery
+    premium_users = []
+    free_users = []
+
+    for user in users:
+        user_data = db.get_user(user['user_id'])
+        if user_data and user_data['tier'] == 'premium':
+            premium_users.append(user)
+        else:
+            free_users.append(user)
+
+    loading = ['security scan', 'market data'] + (['on-chain analytics'] if onchain_analyzer else [])
+    basic_loading = tuple(loading)
+    dm_keyboard = dm_alert_keyboard(analysis)
+    group_keyboard = group_alert_keyboard(analysis)
+    sent_dms = []  # (chat_id, message_id, premium)
+    group_posts = []  # (group_id, message_id)
+    state = {'metrics': None, 'onchain_md': '', 'onchain_html': ''}
+
+    def enrich_dm(chat_id, message_id, premium):
+        text = format_dm_alert(analysis, state['metrics'] or _default_metrics(), state['onchain_md'], premium, tuple(loading))
+        alert_editor.submit(chat_id, message_id, text, parse_mode='Markdown', reply_markup=dm_keyboard,
+                            disable_web_page_preview=True)
+
+    def enrich_groups():
+        group_text = format_group_alert(analysis, state['metrics'] or _default_metrics(), state['onchain_html'], tuple(loading))
+        for chat_id, message_id in group_posts:
+            alert_editor.submit(chat_id, message_id, group_text, parse_mode='HTML', reply_markup=group_keyboard,
+                                disable_web_page_preview=True)
+
+    def refresh():
+        # Reads sent_dms / group_posts as they stand: only messages already sent get edited
+        for chat_id, message_id, premium in sent_dms:
+            enrich_dm(chat_id, message_id, premium)
+        enrich_groups()
+
+    async def security():
         try:
-            await app.bot.send_message(
-                chat_id=user['user_id'],
-                text=free_message,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                disable_web_page_preview=True
+            rating = await heavy_analysis.run(security_scanner.scan_token, contract, context=context,
+                                              deadline=SECURITY_SCAN_DEADLINE) if security_scanner else {}
+        except Exception as e:
+            logger.warning(f"Security scan error for {contract}: {e!r}")
+            rating = {}
+        score = rating.get('score', 50)  # Default to 50 if scan fails
+        analysis['security_score'] = score
+        analysis['security_rating'] = rating
+        
+        # Enrich analysis with security details for the alerts
+        rug_data = rating.get('rug_detection', {})
+        hp_data = rating.get('honeypot', {})
+        analysis['is_honeypot'] = hp_data.get('is_honeypot', False)
+        analysis['risk_level'] = rating.get('risk_level', 'UNKNOWN')
+        analysis['warnings'] = rating.get('warnings', [])
+        if 'ownership_renounced' in rug_data:
+            analysis['renounced'] = rug_data['ownership_renounced']
+        logger.info(f"🛡️ Security score for {analysis.get('name')}: {score}/100")
+
+    async def market():
+        # Determine correct base token address for the chain
+        base_sym = analysis.get('base_token', 'WETH')
+        base_address = chain_registry[analysis_chain].quote_address('USDC' if base_sym == 'USDC' else 'WETH')
+        try:
+            state['metrics'] = await get_comprehensive_metrics(
+                analysis['token_address'],
+                analysis['pair_address'],
+                base_address,
+                analysis['total_supply'],
+                analysis['decimals'],
+                premium=True,
+                chain=analysis_chain,
+                context=context
             )
-            sent_count += 1
-            await asyncio.sleep(0.05)  # Standard rate limiting
         except Exception as e:
-            logger.warning(f"Failed to send to user {user['user_id']}: {e}")
+            logger.error(f"Failed to fetch metrics: {e}")
+            state['metrics'] = _default_metrics()
 
-    logger.info(f"📢 Alert sent to {sent_count} users ({len(premium_users)} premium, {len(free_users)} free) for ${analysis['symbol']}")
-    
-    # Post to group if rating is good
-    await post_to_group_with_buy_button(app, analysis, metrics)
+    async def onchain():
+        # Run on-chain analysis once (shared by all DM alerts and group posts)
+        try:
+            onchain_data = await heavy_analysis.run(
+                onchain_analyzer.analyze_token_onchain,
+                analysis['token_address'],
+                pair_address=analysis.get('pair_address'),
+                total_supply=analysis.get('total_supply', 0),
+                decimals=analysis.get('decimals', 18),
+                context=context,
+                deadline=ONCHAIN_ANALYSIS_DEADLINE
+            )
+            state['onchain_md'] = format_onchain_section_markdown(onchain_data)
+            state['onchain_html'] = format_onchain_section_html(onchain_data)
+        except Exception as e:
+            logger.warning(f"On-chain analysis failed for alerts: {e!r}")
+
+    async def enrich():
+        # PHASE 2: enrich in place as each section arrives
+        waiting = set(steps)
+        while waiting:
+            done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for step in done:
+                loading.remove(steps[step])
+            refresh()
+        logger.info(f"✏️ ${analysis['symbol']} alert enriched after {time.monotonic() - started:.1f}s "
+                    f"({len(sent_dms)} DM(s), {len(group_posts)} group post(s))")
+
+    # Phase 2 starts before the fan-out, so enrichment runs while the basic alerts are still going out
+    steps = {asyncio.create_task(security()): 'security scan', asyncio.create_task(market()): 'market data'}
+    if onchain_analyzer:
+        steps[asyncio.create_task(onchain())] = 'on-chain analytics'
+    enriching = asyncio.create_task(enrich())
+
+    # PHASE 1: basic alert to everyone - premium users FIRST
+    for premium, recipients, pause in ((True, premium_users, 0.03), (False, free_users, 0.05)):
+        basic = format_dm_alert(analysis, premium=premium, loading=basic_loading)
+        for user in recipients:
+            try:
+                sent_msg = await app.bot.send_message(
+                    chat_id=user['user_id'],
+                    text=basic,
+                    parse_mode='Markdown',
+                    reply_markup=dm_keyboard,
+                    disable_web_page_preview=True
+                )
+                db.add_alert_message(analysis_chain, analysis['pair_address'], user['user_id'], sent_msg.message_id, 'user',
+                                     block=analysis.get('block'))
+                alert_editor.track(user['user_id'], sent_msg.message_id, basic)
+                sent_dms.append((user['user_id'], sent_msg.message_id, premium))
+                if len(loading) < len(steps):  # A section landed before this send: catch it up right away
+                    enrich_dm(user['user_id'], sent_msg.message_id, premium)
+                await asyncio.sleep(pause)  # Faster for premium
+            except Exception as e:
+                logger.warning(f"Failed to send to {'premium ' if premium else ''}user {user['user_id']}: {e}")
+
+    logger.info(f"📢 Alert sent to {len(sent_dms)} users ({len(premium_users)} premium, {len(free_users)} free) "
+                f"for ${analysis['symbol']} in {time.monotonic() - started:.1f}s")
+    await post_to_group_with_buy_button(app, analysis, loading=basic_loading, posted=group_posts)
+    if not sent_dms and not group_posts:
+        enriching.cancel()
+        for step in steps:
+            step.cancel()
+        return None
+    if len(loading) < len(steps):
+        enrich_groups()  # Catch up group posts sent after a section had already landed
+
+    # Enrichment finishes in the background so the analysis worker is free for the next launch's basic alert
+    # (the heavy analysis tier bounds how many enrichments run at once)
+    _background_tasks.add(enriching)
+    enriching.add_done_callback(_background_tasks.discard)
+    return enriching
 
 # ===== BOT UI FUNCTIONS =====
 
@@ -2577,6 +2641,50 @@ async def alerts_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard = [[InlineKeyboardButton(f"{'🔕 Disable' if new_state else '🔔 Enable'} Alerts", callback_data="alerts")]]
     await update.message.reply_text(msg, parse_mode='Markdown', reply_markup=InlineKeyboardMarkup(keyboard))
 
+async def portfolio_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /portfolio [token ...] - ETH and token balances of every wallet in one batched read"""
+    if is_group_chat(update):
+        await update.message.reply_text("⚠️ Use this command in DM with the bot.")
+        return
+
+    user = update.effective_user
+    wallets = [w['wallet_address'] for w in db.get_user_wallets(user.id)]
+    if not wallets:
+        await update.message.reply_text("👛 No wallets yet - create one from /menu → Wallets.")
+        return
+
+    # Quote tokens, the last token looked at and any addresses given as arguments
+    tokens = list(chain_registry['base'].quote_tokens.values())
+    tokens += [context.user_data.get('current_token')] + [a for a in (context.args or []) if Web3.is_address(a)]
+    tokens = [t for t in dict.fromkeys(Web3.to_checksum_address(t) for t in tokens if t)]
+
+    try:
+        portfolio, symbols = await asyncio.gather(
+            token_reads.aportfolio('base', wallets, tokens),
+            token_reads.ametadata('base', tokens, fields=('symbol',)),
+        )
+    except Exception as e:
+        logger.error(f"Portfolio sweep failed: {e}")
+        await update.message.reply_text("❌ Could not load balances right now. Try again shortly.")
+        return
+
+    # HTML: token symbols are set by whoever deployed the token and may contain markup characters
+    msg = "💼 <b>PORTFOLIO</b>\n\n"
+    for wallet, balances in portfolio.items():
+        msg += f"<code>{wallet}</code>\n"
+        for balance in balances:
+            if balance.token == MULTICALL3_ADDRESS:
+                label = 'ETH'
+            else:
+                label = html.escape(symbols[balance.token].symbol or balance.token[:10])
+            if balance.formatted is None:
+                msg += f"   ▸ {label}: unavailable\n"
+            elif balance.balance or balance.token == MULTICALL3_ADDRESS:
+                msg += f"   ▸ {label}: {balance.formatted:,.6f}\n"
+        msg += "\n"
+    msg += "💡 <code>/portfolio &lt;token&gt;</code> adds tokens to the sweep."
+    await update.message.reply_text(msg, parse_mode='HTML')
+
 async def upgrade_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show upgrade info with payment instructions"""
     query = update.callback_query
@@ -2992,33 +3100,24 @@ async def handle_snipe_input(update: Update, context: ContextTypes.DEFAULT_TYPE,
     )
 
     try:
-        # Get token contract
+        # Get token info (one batched read)
         token_address_checksum = w3.to_checksum_address(token_address)
-        token_contract = w3.eth.contract(address=token_address_checksum, abi=ERC20_ABI)
-
-        # Get token info
-        try:
-            name = token_contract.functions.name().call()
-            symbol = token_contract.functions.symbol().call()
-            decimals = token_contract.functions.decimals().call()
-        except Exception as e:
+        token = (await token_reads.ametadata('base', [token_address_checksum],
+                                             fields=('name', 'symbol', 'decimals', 'owner')))[token_address_checksum]
+        name, symbol, decimals = token.name, token.symbol, token.decimals
+        if name is None or symbol is None or decimals is None:
             await snipe_msg.edit_text(
                 "❌ *Error: Not a valid ERC20 token*\n\n"
                 "This contract doesn't appear to be a standard token.\n\n"
-                f"Error: `{str(e)[:100]}`",
+                "Error: `name()/symbol()/decimals() call failed`",
                 parse_mode='Markdown'
             )
             return
 
         # Check ownership
-        try:
-            owner = token_contract.functions.owner().call()
-            is_renounced = owner == '0x0000000000000000000000000000000000000000'
-        except:
-            is_renounced = False
+        is_renounced = token.owner == '0x0000000000000000000000000000000000000000'
 
-        # Get current block for gas estimation
-        current_block = w3.eth.block_number
+        # Gas price for cost estimation
         gas_price = w3.eth.gas_price
         gas_price_gwei = w3.from_wei(gas_price, 'gwei')
 
@@ -3033,7 +3132,7 @@ async def handle_snipe_input(update: Update, context: ContextTypes.DEFAULT_TYPE,
             parse_mode='Markdown'
         )
 
-        security_results = security_scanner.scan_token(token_address_checksum)
+        security_results = await interactive_executor.run(security_scanner.scan_token, token_address_checksum)
         security_report = security_scanner.format_security_report(security_results)
 
         # Get wallet balance
@@ -3181,38 +3280,31 @@ async def handle_token_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         is_premium = user_data and user_data['tier'] == 'premium'
         premium_badge = " 💎" if is_premium else ""
 
-        # Get token contract
+        # Get basic token info + owner (one batched read)
         token_address = w3.to_checksum_address(text)
-        token_contract = w3.eth.contract(address=token_address, abi=ERC20_ABI)
-
-        # Get basic token info
-        try:
-            name = token_contract.functions.name().call()
-            symbol = token_contract.functions.symbol().call()
-            total_supply = token_contract.functions.totalSupply().call()
-            decimals = token_contract.functions.decimals().call()
-        except Exception as e:
+        token = (await token_reads.ametadata('base', [token_address]))[token_address]
+        name, symbol, total_supply, decimals = token.name, token.symbol, token.total_supply, token.decimals
+        if not token.is_erc20:
             await analyzing_msg.edit_text(
                 "❌ *Error: Not a valid ERC20 token*\n\n"
                 "This contract doesn't appear to be a standard token.\n\n"
-                f"Error: `{str(e)[:100]}`",
+                "Error: `name()/symbol()/totalSupply()/decimals() call failed`",
                 parse_mode='Markdown'
             )
             return
 
         # Check ownership
         owner = "Unknown"
-        renounced = False
-        try:
-            owner = token_contract.functions.owner().call()
+        if token.owner is None:
+            renounced = True  # No owner function = likely renounced
+        else:
+            owner = token.owner
             burn_addresses = [
                 "0x0000000000000000000000000000000000000000",
                 "0x0000000000000000000000000000000000000001",
                 "0x000000000000000000000000000000000000dEaD"
             ]
             renounced = owner.lower() in [a.lower() for a in burn_addresses]
-        except:
-            renounced = True  # No owner function = likely renounced
 
         # Format supply
         supply_formatted = total_supply / (10 ** decimals)
@@ -3737,12 +3829,12 @@ def _build_admin_panel_message():
     base_block = "N/A"
     monad_block = "N/A"
     try:
-        base_block = f"{w3.eth.block_number:,}"
+        base_block = f"{chain_registry['base'].head_tracker.block_number():,}"
     except Exception:
         pass
     if w3_monad:
         try:
-            monad_block = f"{w3_monad.eth.block_number:,}"
+            monad_block = f"{chain_registry['monad'].head_tracker.block_number():,}"
         except Exception:
             pass
     
@@ -4108,12 +4200,12 @@ async def chains_info_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     base_block = "N/A"
     monad_block = "N/A"
     try:
-        base_block = f"{w3.eth.block_number:,}"
+        base_block = f"{chain_registry['base'].head_tracker.block_number():,}"
     except:
         pass
     if w3_monad:
         try:
-            monad_block = f"{w3_monad.eth.block_number:,}"
+            monad_block = f"{chain_registry['monad'].head_tracker.block_number():,}"
         except:
             pass
     
@@ -4137,137 +4229,443 @@ async def chains_info_callback(update: Update, context: ContextTypes.DEFAULT_TYP
 
 # ===== SCANNING LOOP =====
 
-async def scan_loop(app: Application):
-    """Continuous scanning for new launches on Base + Monad"""
-    logger.info("🔍 Starting scan loop...")
-    
-    # Check how many users have alerts enabled
-    users_with_alerts = db.get_users_with_alerts()
-    logger.info(f"📊 Users with alerts enabled: {len(users_with_alerts)}")
-    if len(users_with_alerts) == 0:
-        logger.warning("⚠️  No users have alerts enabled! Alerts will not be sent.")
+def _chain_w3(chain: str):
+    """Current Web3 instance for a chain (may be swapped by _switch_rpc)"""
+    return chain_registry.w3(chain)
+
+async def process_pair(app: Application, pair: dict, scanned_pairs: SeenPairIndex, path: str) -> bool:
+    """Dedupe one discovered pair and queue it for analysis; returns False if it was already scanned"""
+    pair_address = pair['address']
+    chain = pair.get('chain', 'base')
+
+    # Skip if already scanned (prefix with chain to avoid collision)
+    pair_key = f"{chain}:{pair_address}"
+    if pair_key in scanned_pairs:
+        return False
+
+    scanned_pairs.add(pair_key, pair.get('block'))
+    await analysis_pool.submit(pair_key, lambda: analyze_and_alert(app, pair, scanned_pairs, path))
+    return True
+
+async def analyze_and_alert(app: Application, pair: dict, scanned_pairs: SeenPairIndex, path: str):
+    """Analysis worker job: analyze one pair off the event loop, then alert"""
+    pair_address = pair['address']
+    chain = pair.get('chain', 'base')
+    chain_label = chain_registry[chain].label
+
+    # Pace analyses against the shared RPC budget (replaces the fixed 1s sleep between pairs)
+    await rpc_budget.acquire(ANALYSIS_RPC_COST)
+
+    # Latency from log arrival (push) or poll return to analysis start
+    if pair.get('detected_at') is not None:
+        ingest_latency.record(f"{chain}/{path}", time.monotonic() - pair['detected_at'])
+
+    # Every check of this launch reads the chain through one context (each value fetched once, calls counted)
+    launch = TokenAnalysisContext(chain, _chain_w3(chain), pair_address, pair['token0'], pair['token1'], token_reads, read_cache)
+    with launch.counting():
+        enriching = await _analyze_and_alert(app, pair, scanned_pairs, launch)
+
+    def record_cost(_=None):
+        if launch.total_calls:
+            launch_costs.record(launch)
+            logger.info(f"🧾 {chain_label} launch {pair_address}: {launch.format_stats()}")
+
+    # The launch's cost includes its enrichment, which outlives this worker job
+    if enriching is None:
+        record_cost()
     else:
-        # Count premium vs free
-        premium_count = sum(1 for u in users_with_alerts if db.get_user(u['user_id'])['tier'] == 'premium')
-        free_count = len(users_with_alerts) - premium_count
-        logger.info(f"   👑 Premium users: {premium_count}")
-        logger.info(f"   🆓 Free users: {free_count}")
+        enriching.add_done_callback(record_cost)
+
+async def _analyze_and_alert(app: Application, pair: dict, scanned_pairs: SeenPairIndex, launch: TokenAnalysisContext):
+    """Analyze one pair through its launch context, then alert; returns the alert's enrichment task (or None)"""
+    pair_address = pair['address']
+    chain = launch.chain
+    chain_label = chain_registry[chain].label
+
+    # Analyze the token with premium analytics enabled (alert-path reads go first on rate-limited endpoints)
+    with rpc_context('analysis', HIGH):
+        analysis = await analysis_executor.run(
+            analyze_token,
+            pair_address,
+            pair['token0'],
+            pair['token1'],
+            premium_analytics=True,
+            dex_name=pair.get('dex_name', 'Unknown'),
+            dex_emoji=pair.get('dex_emoji', '🔷'),
+            dex_id=pair.get('dex_id', 'unknown'),
+            chain=chain,
+            context=launch
+        )
 
-    # Start from current block — Base
-    last_block = w3.eth.block_number
-    scanned_pairs = set()
-    scan_count = 0
-    
-    # Monad block tracking
-    last_block_monad = None
-    if w3_monad:
+    if analysis:
+        # Tag with chain info
+        analysis['chain'] = chain
+        analysis['chain_emoji'] = pair.get('chain_emoji', '🔵')
+        analysis['block'] = pair.get('block')
+        analysis['preconfirmed'] = pair.get('preconfirmed', False)
+        preconf_label = ' ⚡ (preconfirmed)' if analysis['preconfirmed'] else ''
+        logger.info(f"🚀 New launch on {chain_label}{preconf_label}: ${analysis['symbol']} ({analysis['name']}) on {analysis.get('dex_name', 'Unknown')}")
+
+        # Send alert to all users
+        chain_registry[chain].metrics.record_alert()
+        with rpc_context('enrichment', NORMAL):
+            return await send_launch_alert(app, analysis, context=launch)
+    elif pair.get('preconfirmed'):
+        # Token state may not be readable until the block seals - retry once as a sealed pair.
+        # (The sealed scan may already have run and deduped it while this job was in flight.)
+        logger.info(f"⏳ Preconfirmed pair {pair_address} not analyzable yet - will retry once sealed")
+        sealed_pair = {**pair, 'preconfirmed': False, 'detected_at': None}
+        task = asyncio.create_task(_retry_after_seal(app, sealed_pair, scanned_pairs))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    else:
+        logger.warning(f"⚠️  Failed to analyze pair {pair_address} on {chain}")
+
+async def _retry_after_seal(app: Application, pair: dict, scanned_pairs: SeenPairIndex):
+    """Re-queue a preconfirmed pair after its block has had time to seal (Base 2s blocks)"""
+    await asyncio.sleep(2)
+    pair_key = f"{pair.get('chain', 'base')}:{pair['address']}"
+    await analysis_pool.submit(pair_key, lambda: analyze_and_alert(app, pair, scanned_pairs, 'poll'))
+
+async def handle_reorg(app: Application, chain: str, from_block: int, to_block: int,
+                       scanned_pairs: SeenPairIndex, executor: ChainExecutor):
+    """Re-scan a reorged range: retract alerts for pairs that vanished, process pairs that appeared"""
+    chain_label = chain_registry[chain].label
+    try:
+        pairs = await executor.run(scan_pairs_range, chain, from_block, to_block)
+    except Exception as e:
+        logger.error(f"❌ {chain_label} re-scan of reorged blocks {from_block:,}-{to_block:,} failed: {e}")
+        return
+
+    canonical = {f"{chain}:{p['address']}".lower() for p in pairs}
+    vanished = [key for key in scanned_pairs.keys_in_range(chain, from_block, to_block) if key not in canonical]
+    for pair_key in vanished:
+        scanned_pairs.discard(pair_key)
+        await retract_pair_alerts(app, chain, pair_key.split(':', 1)[1])
+
+    for pair in pairs:
+        await process_pair(app, pair, scanned_pairs, 'reorg')
+    logger.info(f"🔀 {chain_label} reorg {from_block:,}-{to_block:,} re-scanned: {len(pairs)} pair(s) canonical, {len(vanished)} retracted")
+
+def prune_alert_messages(chain: str, reorg_detector: ReorgDetector) -> int:
+    """
+    Forget alert messages for pairs older than the reorg horizon (the oldest block the hash ring still
+    checks): a reorg or a dropped Flashblock can no longer retract them
+    """
+    horizon = reorg_detector.ring.oldest()
+    if horizon is None:
+        return 0
+    removed = db.prune_alert_messages(chain, horizon)
+    if removed:
+        logger.info(f"🧹 Pruned {removed} {chain} alert message record(s) below block {horizon:,}")
+    return removed
+
+async def merge_preconfirmations(app, chain: str, consumer: FlashblocksConsumer, ledger: PreconfirmationLedger,
+                                 sealed_pairs: list, sealed_through, scanned_pairs: SeenPairIndex) -> list:
+    """
+    Queue the Flashblock pairs seen since the last drain ahead of this scan's sealed pairs, and retract
+    earlier preconfirmations the sealed blocks (up to sealed_through, None if nothing was scanned) dropped
+    """
+    preconf_pairs = drain_flashblocks(consumer)
+    for p in preconf_pairs:
+        if f"{chain}:{p['address']}" not in scanned_pairs:
+            ledger.add(f"{chain}:{p['address']}", p['block'])
+    # Reconcile only after adding: a Flashblock drained after its block was already polled is confirmed
+    # by this very scan, not reported missing by the next one
+    reconciled = ledger.reconcile({f"{chain}:{p['address']}" for p in sealed_pairs}, sealed_through)
+    await retract_dropped_preconfirmations(app, chain, reconciled['dropped'], scanned_pairs)
+    return preconf_pairs + sealed_pairs
+
+async def retract_dropped_preconfirmations(app: Application, chain: str, dropped: list, scanned_pairs: SeenPairIndex):
+    """
+    Preconfirmed (Flashblocks) pairs that never reached a sealed block were already alerted: retract
+    those alerts like handle_reorg does, and forget the pairs so they are processed again if they land later
+    """
+    for pair_key in dropped:
+        logger.warning(f"⚠️ Preconfirmed pair {pair_key} not found in sealed blocks (dropped from Flashblock)")
+        scanned_pairs.discard(pair_key)
+        await retract_pair_alerts(app, chain, pair_key.split(':', 1)[1],
+                                  reason="was preconfirmed but never made it into a sealed block")
+
+async def retract_pair_alerts(app: Application, chain: str, pair_address: str, reason: str = None):
+    """Delete group posts / edit DMs for a pair whose creation was reorged out (or never sealed)"""
+    messages = db.get_alert_messages(chain, pair_address)
+    reason = reason or f"was removed by a chain reorg on {chain.title()}"
+    notice = (
+        f"⚠️ *ALERT RETRACTED*\n\n"
+        f"The pair `{pair_address}` {reason} and no longer exists.\n"
+        f"Please ignore the previous alert."
+    )
+    for msg in messages:
+        alert_editor.close(msg['chat_id'], msg['message_id'])  # No enrichment edit may overwrite the retraction
+        try:
+            if msg['recipient_type'] == 'group':
+                await app.bot.delete_message(chat_id=msg['chat_id'], message_id=msg['message_id'])
+            else:
+                await app.bot.edit_message_text(chat_id=msg['chat_id'], message_id=msg['message_id'], text=notice, parse_mode='Markdown')
+        except Exception as e:
+            # Already auto-deleted / too old to delete: fall back to editing
+            try:
+                await app.bot.edit_message_text(chat_id=msg['chat_id'], message_id=msg['message_id'], text=notice, parse_mode='Markdown')
+            except Exception:
+                logger.warning(f"Could not retract alert {msg['message_id']} in {msg['chat_id']}: {e}")
+        await asyncio.sleep(0.05)
+    db.remove_alert_messages(chain, pair_address)
+    logger.warning(f"🔀 Retracted {len(messages)} alert message(s) for {chain} pair {pair_address} ({reason})")
+
+async def backfill_chain(app: Application, chain: str, from_block: int, head: int, scanned_pairs: SeenPairIndex) -> int:
+    """Catch up from a saved cursor to head before live scanning; returns the block to resume live scanning from"""
+    config = chain_registry[chain]
+    chain_label = config.label
+    window = config.log_scanner.block_range.size(provider_key(config.w3))
+    max_depth = config.max_backfill_blocks
+
+    if head - from_block > max_depth:
+        logger.warning(f"⚠️ {chain_label} saved cursor {from_block:,} is {head - from_block:,} blocks behind - backfilling only the last {max_depth:,}")
+        from_block = head - max_depth
+
+    windows = [(start, min(start + window - 1, head)) for start in range(from_block, head + 1, window)]
+    logger.info(f"⏪ {chain_label} backfilling {head - from_block + 1:,} blocks ({from_block:,}-{head:,}) in {len(windows)} window(s), {BACKFILL_CONCURRENCY} at a time")
+
+    def scan_with_retry(a: int, b: int, attempts: int = 3) -> list:
+        for attempt in range(attempts):
+            try:
+                return scan_pairs_range(chain, a, b)
+            except Exception:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
+    executor = ChainExecutor(f"{chain}-backfill", max_workers=BACKFILL_CONCURRENCY)
+    max_age = BACKFILL_ALERT_MAX_AGE_MINUTES * 60
+    found = suppressed = 0
+    try:
+        for i in range(0, len(windows), BACKFILL_CONCURRENCY):
+            batch = windows[i:i + BACKFILL_CONCURRENCY]
+            results = await asyncio.gather(*(executor.run(scan_with_retry, a, b) for a, b in batch), return_exceptions=True)
+            for (a, b), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    # Stop here rather than leave a gap - the live loop continues from this block
+                    logger.warning(f"⚠️ {chain_label} backfill stopped at block {a:,}: {result}")
+                    db.save_scan_cursor(chain, a)
+                    return a
+                for pair in sorted(result, key=lambda p: p['block']):
+                    found += 1
+                    block_time = await executor.run(config.head_tracker.block_timestamp, pair['block'])
+                    if time.time() - block_time > max_age:
+                        # Too old to be actionable: remember it, but don't alert
+                        scanned_pairs.add(f"{chain}:{pair['address']}", pair['block'])
+                        suppressed += 1
+                        continue
+                    await process_pair(app, pair, scanned_pairs, 'backfill')
+            db.save_scan_cursor(chain, batch[-1][1] + 1)
+    finally:
+        executor.shutdown()
+
+    logger.info(f"✅ {chain_label} backfill complete: {found} pair(s) found, {suppressed} too old to alert")
+    return head
+
+async def scan_chain(app: Application, chain: str, scanned_pairs: SeenPairIndex, executor: ChainExecutor):
+    """Independent scan loop for one chain: own cursor, window, interval, ingestion and failure handling"""
+    config = chain_registry[chain]
+    scanner = config.log_scanner
+    get_pairs = functools.partial(get_new_pairs, chain=chain)
+    window = scanner.block_range.size(provider_key(config.w3))
+    interval = config.scan_interval
+    ws_url = config.ws_url
+    chain_label = config.label
+    confirmations = config.confirmations
+    head_tracker = config.head_tracker
+    reorg_detector = config.reorg_detector
+
+    # Start from current block (less the confirmation depth)
+    last_block = None
+    while last_block is None:
         try:
-            last_block_monad = w3_monad.eth.block_number
-            logger.info(f"🟣 Monad starting block: {last_block_monad:,}")
+            last_block = await executor.run(head_tracker.refresh) - confirmations
         except Exception as e:
-            logger.warning(f"⚠️ Could not get Monad block: {e}")
+            logger.warning(f"⚠️ Could not get {chain_label} block: {e}")
+            await asyncio.sleep(30)
 
+    # Catch up on anything launched while we were down, then go live from head
+    saved_cursor = db.get_scan_cursor(chain)
+    if saved_cursor is not None and saved_cursor < last_block:
+        with rpc_context('backfill', NORMAL):
+            last_block = await backfill_chain(app, chain, saved_cursor, last_block, scanned_pairs)
+    db.save_scan_cursor(chain, last_block)
+    logger.info(f"{chain_label} starting block: {last_block:,} (window {window} blocks, every {interval:g}s, {confirmations} confirmation(s))")
+
+    # Push-based ingestion: eth_subscribe("logs") when a WebSocket RPC is configured.
+    # While the socket is down (or still being backfilled) the polling path below is used.
+    new_logs_event = asyncio.Event()
+    subscriber = None
+    if INGEST_MODE == 'websocket' and ws_url:
+        subscriber = LogSubscriber(ws_url, scanner.log_filter(), chain=chain, notify=new_logs_event,
+                                   on_head=head_tracker.observe_header)
+        task = asyncio.create_task(subscriber.run())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        logger.info(f"⚡ WebSocket log ingestion enabled for {chain}")
+
+    # Flashblocks: pairs from preconfirmed transactions (Base), reconciled against sealed scans
+    flashblocks_consumer = None
+    preconf_ledger = PreconfirmationLedger()
+    if config.flashblocks_ws_url:
+        flashblocks_consumer = FlashblocksConsumer(config.flashblocks_ws_url, scanner, notify=new_logs_event)
+        task = asyncio.create_task(flashblocks_consumer.run())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        logger.info(f"⚡ Flashblocks preconfirmation ingestion enabled for {chain}")
+
+    scan_count = 0
     while True:
         try:
             scan_count += 1
-            
-            # ===== SCAN BASE =====
-            pairs = get_new_pairs(last_block)
-            
-            # ===== SCAN MONAD =====
-            monad_pairs = []
-            if w3_monad and last_block_monad is not None:
-                try:
-                    monad_pairs = get_new_pairs_monad(last_block_monad)
-                except Exception as e:
-                    logger.warning(f"🟣 Monad scan error: {e}")
-            
-            # Combine all pairs
-            all_pairs = pairs + monad_pairs
-            
-            # Log scanning activity every 10 scans (~100 seconds)
-            if scan_count % 10 == 0:
-                current_block = w3.eth.block_number
-                monad_info = ""
-                if w3_monad and last_block_monad:
-                    monad_block = w3_monad.eth.block_number
-                    monad_info = f" | 🟣 Monad: {last_block_monad:,}-{monad_block:,}"
-                logger.info(f"🔍 Scan #{scan_count}: 🔵 Base {last_block:,}-{current_block:,}{monad_info} | Pairs: {len(all_pairs)} | Total scanned: {len(scanned_pairs)}")
-
-            if len(all_pairs) > 0:
-                logger.info(f"✨ Found {len(all_pairs)} new pair(s) in this scan! (Base: {len(pairs)}, Monad: {len(monad_pairs)})")
-
-            for pair in all_pairs:
-                pair_address = pair['address']
-                chain = pair.get('chain', 'base')
-
-                # Skip if already scanned (prefix with chain to avoid collision)
-                pair_key = f"{chain}:{pair_address}"
-                if pair_key in scanned_pairs:
-                    continue
-
-                scanned_pairs.add(pair_key)
-
-                # Analyze the token with premium analytics enabled
-                analysis = analyze_token(
-                    pair_address, 
-                    pair['token0'], 
-                    pair['token1'], 
-                    premium_analytics=True,
-                    dex_name=pair.get('dex_name', 'Unknown'),
-                    dex_emoji=pair.get('dex_emoji', '🔷'),
-                    dex_id=pair.get('dex_id', 'unknown'),
-                    chain=chain
-                )
 
-                if analysis:
-                    # Tag with chain info
-                    analysis['chain'] = chain
-                    analysis['chain_emoji'] = pair.get('chain_emoji', '🔵')
-                    chain_label = '🔵 Base' if chain == 'base' else '🟣 Monad'
-                    logger.info(f"🚀 New launch on {chain_label}: ${analysis['symbol']} ({analysis['name']}) on {analysis.get('dex_name', 'Unknown')}")
-
-                    # Send alert to all users
-                    await send_launch_alert(app, analysis)
-                else:
-                    logger.warning(f"⚠️  Failed to analyze pair {pair_address} on {chain}")
+            # Reorg check: if the newest scanned block was replaced, re-scan only the replaced range
+            try:
+                reorged = await executor.run(reorg_detector.check)
+            except Exception as e:
+                logger.warning(f"⚠️ {chain_label} reorg check failed: {e}")
+                reorged = None
+            if reorged:
+                await handle_reorg(app, chain, reorged[0], reorged[1], scanned_pairs, executor)
+
+            live = subscriber is not None and subscriber.is_live(last_block)
+            window = scanner.block_range.size(provider_key(config.w3))
+            if live:
+                pairs = drain_log_subscriber(subscriber, scanner, chain)
+                sealed_through = (subscriber.last_block or 1) - 1
+            else:
+                pairs = await executor.run(get_pairs, last_block, window)
+                sealed_through = scanner.last_window.get('to_block') if scanner.last_window.get('mode') else None
 
-                # Small delay between analyses
-                await asyncio.sleep(1)
+            if flashblocks_consumer:
+                pairs = await merge_preconfirmations(app, chain, flashblocks_consumer, preconf_ledger, pairs,
+                                                     sealed_through, scanned_pairs)
 
-            # Update last block — Base
-            current_block = w3.eth.block_number
-            if current_block > last_block + 10:
-                last_block = last_block + 10
+            # Log scanning activity every 10 scans
+            if scan_count % 10 == 0:
+                current_block = await executor.run(head_tracker.block_number)
+                logger.info(f"🔍 {chain_label} scan #{scan_count}: {last_block:,}-{current_block:,} | Pairs: {len(pairs)} | Total scanned: {len(scanned_pairs)}")
+                logger.info(f"📡 {chain_label} {scanner.format_stats()} | last window: {scanner.last_window['calls']} call(s) ({scanner.last_window['mode']})")
+                logger.info(f"🧩 {chain_label} {config.pair_decoder.format_stats()}")
+                logger.info(f"⏱️ {chain_label} detection → analysis latency: {ingest_latency.format(prefix=chain)}")
+                logger.info(f"🗂️ {scanned_pairs.format_stats()}")
+                logger.info(f"⛓️ {chain_label} {head_tracker.format_stats()} | {reorg_detector.format_stats()}")
+                logger.info(f"📈 {chain_label} {config.metrics.format()}")
+                logger.info(f"🌐 {chain_label} {config.router.format_stats()}")
+                logger.info(f"🧪 {analysis_pool.format_stats()} | RPC budget wait {rpc_budget.waited:.0f}s total")
+                logger.info(f"{token_reads.format_stats()} | {read_cache.format_stats()}")
+                logger.info(rpc_ledger.format_stats())
+                logger.info(launch_costs.format_stats())
+                logger.info(f"{loop_lag.format_stats()} | {heavy_analysis.format_stats()}")
+                logger.info(alert_editor.format_stats())
+                if flashblocks_consumer:
+                    logger.info(f"⚡ Flashblocks: {flashblocks_consumer.flashblocks_seen} seen | preconfirmed pairs confirmed: {preconf_ledger.confirmed}, dropped: {preconf_ledger.dropped}, pending: {len(preconf_ledger.pending)}")
+
+            # Keep the on-disk dedupe table bounded by block height
+            if scan_count % 500 == 0:
+                scanned_pairs.prune(chain, last_block - config.dedupe_retention_blocks)
+                prune_alert_messages(chain, reorg_detector)
+
+            if len(pairs) > 0:
+                logger.info(f"✨ Found {len(pairs)} new {chain_label} pair(s) in this scan!")
+
+            for pair in pairs:
+                if pair.get('preconfirmed'):
+                    path = 'flashblocks'
+                else:
+                    path = 'ws' if live else 'poll'
+                await process_pair(app, pair, scanned_pairs, path)
+
+            # Update last block (push mode follows the socket's head so a drop backfills from there).
+            # Polling only advances past blocks that were actually scanned - a failed window is retried.
+            catching_up = False
+            if live:
+                last_block = max(last_block, subscriber.last_block or last_block)
             else:
-                last_block = current_block
-            
-            # Update last block — Monad
-            if w3_monad and last_block_monad is not None:
+                if scanner.last_window.get('mode'):
+                    last_block = max(last_block, scanner.last_window['to_block'] + 1)
+                current_block = await executor.run(head_tracker.block_number)
+                catching_up = current_block - last_block >= window
+            db.save_scan_cursor(chain, last_block)
+
+            # Remember the hash of the newest sealed block we scanned, for the next reorg check
+            if sealed_through:
                 try:
-                    monad_current = w3_monad.eth.block_number
-                    if monad_current > last_block_monad + 50:
-                        last_block_monad = last_block_monad + 50
-                    else:
-                        last_block_monad = monad_current
-                except:
-                    pass
+                    await executor.run(reorg_detector.record, sealed_through)
+                except Exception as e:
+                    logger.debug(f"{chain_label} could not record block hash {sealed_through}: {e}")
 
-            # Wait before next scan
-            await asyncio.sleep(10)
+            # Wait before next scan (wake early when a subscription pushes a log; no wait while behind)
+            if catching_up:
+                await asyncio.sleep(0)
+            elif live or flashblocks_consumer:
+                try:
+                    await asyncio.wait_for(new_logs_event.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+                new_logs_event.clear()
+            else:
+                await asyncio.sleep(interval)
 
         except Exception as e:
-            logger.error(f"Error in scan loop: {e}")
+            logger.error(f"Error in {chain_label} scan loop: {e}")
             import traceback
             traceback.print_exc()
             
             # Auto-failover: if RPC error (503/429), try next fallback
             error_str = str(e).lower()
             if '503' in error_str or '429' in error_str or 'service unavailable' in error_str or 'too many requests' in error_str:
-                _switch_base_rpc()
+                _switch_rpc(chain)
             
             await asyncio.sleep(30)
 
+async def scan_loop(app: Application):
+    """Continuous scanning for new launches - one concurrent task per connected chain"""
+    logger.info("🔍 Starting scan loop...")
+    
+    # Check how many users have alerts enabled
+    users_with_alerts = db.get_users_with_alerts()
+    logger.info(f"📊 Users with alerts enabled: {len(users_with_alerts)}")
+    if len(users_with_alerts) == 0:
+        logger.warning("⚠️  No users have alerts enabled! Alerts will not be sent.")
+    else:
+        # Count premium vs free
+        premium_count = sum(1 for u in users_with_alerts if db.get_user(u['user_id'])['tier'] == 'premium')
+        free_count = len(users_with_alerts) - premium_count
+        logger.info(f"   👑 Premium users: {premium_count}")
+        logger.info(f"   🆓 Free users: {free_count}")
+
+    # Dedupe index shared by every chain (keys are chain-prefixed), persisted so restarts/backfills don't re-alert
+    scanned_pairs = SeenPairIndex(db, max_size=DEDUPE_CACHE_SIZE)
+
+    # Analysis workers shared by every chain
+    analysis_pool.start()
+    loop_lag.start()
+    alert_editor.start(app.bot)
+    logger.info(f"🧪 Analysis pool: {ANALYSIS_WORKERS} worker(s), RPC budget {RPC_BUDGET_PER_SECOND:g} req/s (burst {RPC_BUDGET_BURST:g})")
+
+    chains = [config.chain for config in chain_registry.connected()]
+    logger.info(f"⛓️ Scanning {len(chains)} chain(s): {', '.join(chain_registry[chain].label for chain in chains)}")
+
+    # Each chain runs on its own task + RPC thread pool, so a slow Monad RPC can't delay Base
+    # Tasks keep the rpc_context they were created in (feature + priority on rate-limited endpoints)
+    executors = {chain: ChainExecutor(chain) for chain in chains}
+    with rpc_context('head', HIGH):
+        tasks = [asyncio.create_task(chain_registry[chain].head_tracker.run(executors[chain])) for chain in chains]
+    tasks += [asyncio.create_task(chain_registry[chain].router.run(executors[chain])) for chain in chains]
+    with rpc_context('scan', HIGH):
+        tasks += [asyncio.create_task(scan_chain(app, chain, scanned_pairs, executors[chain])) for chain in chains]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        for executor in executors.values():
+            executor.shutdown()
+
 # ===== AUTO GROUP DETECTION HANDLERS =====
 
 async def on_bot_added_to_group(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -4373,10 +4771,31 @@ async def on_bot_removed_from_group(update: Update, context: ContextTypes.DEFAUL
 
 async def main():
     """Start the bot"""
+    global w3_monad
     if not TELEGRAM_TOKEN:
         logger.error("❌ Missing TELEGRAM_BOT_TOKEN in .env!")
         return
 
+    logger.info("🚀 Initializing Base Fair Launch Sniper Bot...")
+    # DEBUG: List files to diagnose Railway volume/mount issues
+    try:
+        logger.info(f"📂 Current Working Directory: {os.getcwd()}")
+        logger.info(f"📂 Files in CWD: {os.listdir('.')}")
+        logger.info(f"📂 Sys Path: {sys.path}")
+    except Exception as e:
+        logger.error(f"Failed to list directory: {e}")
+
+    db.ensure_ready()
+    logger.info(f"✅ Database connected: {db.db_path}")
+
+    # Probe every chain's RPC pool at once: startup waits for the fastest healthy endpoint per chain
+    probe_started = time.monotonic()
+    await asyncio.get_running_loop().run_in_executor(None, chain_registry.probe_all, RPC_PROBE_DEADLINE)
+    w3_monad = chain_registry.w3('monad')
+    logger.info(f"⛓️ RPC pools probed in {time.monotonic() - probe_started:.1f}s")
+    if not MONAD_ENABLED:
+        logger.info("ℹ️ Monad chain scanning disabled")
+
     if not ALCHEMY_KEY:
         logger.warning("⚠️ ALCHEMY_BASE_KEY not set - using public RPC (some premium features may be limited)")
 
@@ -4403,6 +4822,7 @@ async def main():
             BotCommand("start", "Show main menu"),
             BotCommand("menu", "Open menu"),
             BotCommand("alerts", "Toggle alerts on/off"),
+            BotCommand("portfolio", "Wallet balances"),
             BotCommand("buy", "Buy token"),
             BotCommand("checktoken", "Check a token"),
             BotCommand("advertise", "Advertise your project"),
@@ -4452,6 +4872,7 @@ async def main():
     app.add_handler(CommandHandler("register_commands", register_commands_admin))
     app.add_handler(CommandHandler("buy", buy_command))
     app.add_handler(CommandHandler("alerts", alerts_command))
+    app.add_handler(CommandHandler("portfolio", portfolio_command))
     app.add_handler(CommandHandler("earnings", earnings_command))
     app.add_handler(CommandHandler("advertise", advertise_command))
     app.add_handler(CommandHandler("admin", admin_panel))
@@ -4511,7 +4932,7 @@ async def main():
     payment_monitor_task = None
     if payment_wallet:
         try:
-            payment_monitor = PaymentMonitor(w3, db, payment_wallet, app)
+            payment_monitor = PaymentMonitor(w3, db, payment_wallet, app, head_tracker=chain_registry['base'].head_tracker)
             
             # Connect payment monitor to sponsorship processor
             if auto_sponsor:
@@ -4521,7 +4942,8 @@ async def main():
                 
                 payment_monitor.on_payment_received = on_payment_detected
             
-            payment_monitor_task = asyncio.create_task(payment_monitor.start_monitoring())
+            with rpc_context('payments', LOW):
+                payment_monitor_task = asyncio.create_task(payment_monitor.start_monitoring())
             logger.info("💰 Payment monitor started - auto-upgrades & sponsorships enabled!")
         except Exception as e:
             logger.error(f"Failed to start payment monitor: {e}")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Offline test for two-phase alerts: the paced edit queue and send_launch_alert's send-then-enrich flow
+(fake Telegram bot, temporary SQLite file, local DexScreener stand-in, fixture chain, no network)
+"""
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from telegram.error import BadRequest, RetryAfter
+import sniper_bot as bot
+from alert_editor import AlertEditor
+from database import UserDatabase
+from test_alert_metrics import start_dexscreener
+from test_analysis_context import make_context
+from test_multicall import PAIR, TOKEN, WALLET
+
+GROUP = -100123
+
+
+class FakeBot:
+    """
+    Records sends and edits; `fail` maps a call number to the exception that edit raises, `send_delay`
+    is how long each send_message takes
+    """
+
+    def __init__(self, fail=None, send_delay=0):
+        self.sent = []
+        self.edits = []
+        self.fail = fail or {}
+        self.send_delay = send_delay
+        self._next_id = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await asyncio.sleep(self.send_delay)
+        self._next_id += 1
+        self.sent.append((time.monotonic(), chat_id, text))
+        return SimpleNamespace(message_id=self._next_id)
+
+    async def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        error = self.fail.pop(len(self.edits), None)
+        self.edits.append((time.monotonic(), chat_id, message_id, text))
+        if error is not None:
+            raise error
+
+
+async def _run_pacing():
+    fake = FakeBot()
+    editor = AlertEditor(rate=100, dm_interval=0.2, group_interval=0.5)
+    editor.start(fake)
+    editor.track(1, 10, 'basic')
+    editor.submit(1, 10, 'basic')  # Already showing: nothing to do
+    for step in ('security', 'metrics', 'onchain'):
+        editor.submit(1, 10, step)
+        editor.submit(GROUP, 20, step)
+    await editor.flush()
+    # Both chats were free at once; the queued security/metrics texts were replaced by the newest
+    assert [(chat, text) for _, chat, _, text in fake.edits] == [(1, 'onchain'), (GROUP, 'onchain')]
+    assert editor.stats['coalesced'] == 4 and editor.stats['unchanged'] == 1
+
+    editor.submit(GROUP, 20, 'final')
+    editor.submit(1, 10, 'final')
+    await editor.flush()
+    times = {chat: at for at, chat, _, text in fake.edits if text == 'final'}
+    first = {chat: at for at, chat, _, text in fake.edits if text == 'onchain'}
+    assert times[GROUP] - first[GROUP] >= 0.45  # Group chats get the slower per-chat pace
+    assert times[1] < times[GROUP]  # The DM wasn't held back by the waiting group edit
+    editor.stop()
+
+
+def test_edits_are_coalesced_and_paced_per_chat():
+    asyncio.run(_run_pacing())
+
+
+async def _run_errors():
+    fake = FakeBot(fail={0: RetryAfter(1), 2: BadRequest('Message to edit not found')})
+    editor = AlertEditor(rate=100, dm_interval=0)
+    editor.start(fake)
+    started = time.monotonic()
+    editor.submit(1, 10, 'enriched')
+    editor.submit(2, 11, 'enriched')
+    await editor.flush()
+    assert time.monotonic() - started >= 0.95  # Flood wait paused the queue
+    assert [(chat, text) for _, chat, _, text in fake.edits] == [(1, 'enriched'), (1, 'enriched'), (2, 'enriched')]
+    assert editor.stats['rate_limited'] == 1 and editor.stats['failed'] == 1
+    editor.submit(2, 11, 'again')  # Gone: never retried
+    editor.close(1, 10)
+    editor.submit(1, 10, 'retracted alerts stay retracted')
+    await editor.flush()
+    assert len(fake.edits) == 3 and 'edits: 1 done' in editor.format_stats()
+    editor.stop()
+
+
+def test_flood_waits_and_dead_messages():
+    asyncio.run(_run_errors())
+
+
+async def _run_two_phase(path, send_delay=0, dexscreener_delay=0.5, users=1):
+    fake = FakeBot(send_delay=send_delay)
+    context, _ = make_context()
+    runner, url = await start_dexscreener(delay=dexscreener_delay)
+    saved = (bot.db, bot.security_scanner, bot.onchain_analyzer, bot.alert_editor, bot.DEXSCREENER_API,
+             bot.chain_registry['base'].w3)
+    db = UserDatabase(path)
+    for user_id in range(1, users + 1):
+        db.add_user(user_id, f'trader{user_id}', 'Trader')
+    db.add_group(GROUP, 'launches', 'Launches')
+    bot.db, bot.security_scanner, bot.onchain_analyzer = db, None, None
+    bot.alert_editor = AlertEditor(rate=100, dm_interval=0, group_interval=0)
+    bot.DEXSCREENER_API, bot.chain_registry['base'].w3 = url, context.w3
+    bot.alert_editor.start(fake)
+    analysis = {'token_address': TOKEN, 'pair_address': PAIR, 'name': 'Maker', 'symbol': 'mkr', 'decimals': 18,
+                'total_supply': 10 ** 24, 'chain': 'base', 'base_token': 'WETH', 'renounced': False,
+                'dex_name': 'Uniswap V2', 'dex_emoji': '🦄'}
+    try:
+        started = time.monotonic()
+        enriching = await bot.send_launch_alert(SimpleNamespace(bot=fake), analysis, context=context)
+        returned_after = time.monotonic() - started
+        await enriching
+        await bot.alert_editor.flush()
+        return fake, db.get_alert_messages('base', PAIR), started, returned_after
+    finally:
+        bot.alert_editor.stop()
+        await runner.cleanup()
+        (bot.db, bot.security_scanner, bot.onchain_analyzer, bot.alert_editor, bot.DEXSCREENER_API,
+         bot.chain_registry['base'].w3) = saved
+
+
+def run_two_phase(**kwargs):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        return asyncio.run(_run_two_phase(path, **kwargs))
+    finally:
+        for task in list(bot._background_tasks):  # Auto-delete timers of the group post
+            task.cancel()
+        os.remove(path)
+
+
+def test_basic_alert_first_then_enriched_in_place():
+    fake, tracked, started, returned_after = run_two_phase()
+    assert returned_after < 0.4  # The caller (an analysis worker) is released before DexScreener answers
+    # The basic alert went out before DexScreener answered
+    assert {chat for _, chat, _ in fake.sent} == {1, GROUP}
+    assert all(at - started < 0.4 for at, _, _ in fake.sent)
+    assert all('Loading' in text and PAIR in text for _, _, text in fake.sent)
+    final = {chat: text for _, chat, _, text in fake.edits}
+    assert '$0.50000000' in final[1] and '25.0K' in final[GROUP]
+    assert not any('Loading' in text for text in final.values())
+    assert {(m['chat_id'], m['recipient_type']) for m in tracked} == {(1, 'user'), (GROUP, 'group')}
+
+
+def test_enrichment_does_not_wait_for_the_fan_out():
+    fake, _, _, _ = run_two_phase(send_delay=0.15, dexscreener_delay=0.25, users=4)
+    last_send = max(at for at, _, _ in fake.sent)
+    first_edit = {chat: at for at, chat, _, _ in reversed(fake.edits)}
+    assert first_edit[1] < last_send  # Early recipients were enriched mid fan-out
+    assert all(first_edit[chat] - at < 0.1 for at, chat, _ in fake.sent)  # Later ones right after their send
+    final = {chat: text for _, chat, _, text in fake.edits}
+    assert set(final) == {1, 2, 3, 4, GROUP}  # Late recipients caught up too
+    assert all('$0.50000000' in final[chat] for chat in (1, 2, 3, 4)) and '25.0K' in final[GROUP]
+    assert not any('Loading' in text for text in final.values())
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TWO-PHASE ALERTS - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_edits_are_coalesced_and_paced_per_chat, test_flood_waits_and_dead_messages,
+                 test_basic_alert_first_then_enriched_in_place, test_enrichment_does_not_wait_for_the_fan_out):
+        test()
+        print(f"✅ {test.__name__}")
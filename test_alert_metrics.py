@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Offline test for the concurrent alert metrics (local DexScreener stand-in, fixture chain, no network)
+"""
+import asyncio
+import time
+from aiohttp import web
+import sniper_bot as bot
+from test_analysis_context import make_context
+from test_multicall import PAIR, TOKEN, WALLET
+
+DEX_PAIR = {'pairAddress': PAIR, 'priceUsd': '0.5', 'fdv': '500000', 'liquidity': {'usd': '25000'},
+            'volume': {'h24': '1200'}, 'priceChange': {'h24': '3.5'}}
+
+
+async def start_dexscreener(delay: float):
+    """aiohttp server answering /tokens/<address> after `delay` seconds"""
+    async def tokens(request):
+        await asyncio.sleep(delay)
+        return web.json_response({'pairs': [DEX_PAIR]})
+
+    app = web.Application()
+    app.router.add_get('/tokens/{address}', tokens)
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = site._server.sockets[0].getsockname()[:2]
+    return runner, f"http://{host}:{port}"
+
+
+async def run_metrics(delay: float, timeout: float):
+    context, _ = make_context()
+    runner, url = await start_dexscreener(delay)
+    saved = bot.DEXSCREENER_API, bot.METRICS_SOURCE_TIMEOUT, bot.chain_registry['base'].w3
+    bot.DEXSCREENER_API, bot.METRICS_SOURCE_TIMEOUT, bot.chain_registry['base'].w3 = url, timeout, context.w3
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    started = time.monotonic()
+    try:
+        metrics = await bot.get_comprehensive_metrics(TOKEN, PAIR, WALLET, 10 ** 24, 18, chain='base', context=context)
+        return metrics, time.monotonic() - started, ticks
+    finally:
+        ticking.cancel()
+        await runner.cleanup()
+        bot.DEXSCREENER_API, bot.METRICS_SOURCE_TIMEOUT, bot.chain_registry['base'].w3 = saved
+
+
+def test_sources_do_not_block_the_event_loop():
+    metrics, elapsed, ticks = asyncio.run(run_metrics(delay=0.3, timeout=5))
+    assert metrics['price_usd'] == 0.5 and metrics['liquidity_usd'] == 25000
+    assert metrics['partial'] == []
+    assert ticks >= 5  # Other tasks (Telegram polling) kept running while DexScreener answered
+
+
+def test_slow_source_yields_partial_metrics():
+    metrics, elapsed, _ = asyncio.run(run_metrics(delay=3, timeout=0.3))
+    assert elapsed < 1.5  # Bounded by the per-source timeout, not DexScreener's 3s
+    assert metrics['partial'] == ['dexscreener']
+    assert metrics['liquidity_usd'] == 0 and metrics['limit_details'] == 'No limits'
+
+
+def test_pool_price_is_only_a_fallback():
+    saved = bot.calculate_pool_price
+    calls = []
+
+    async def counting_pool_price(*args, **kwargs):
+        calls.append(args)
+        return await saved(*args, **kwargs)
+
+    bot.calculate_pool_price = counting_pool_price
+    try:
+        asyncio.run(run_metrics(delay=0, timeout=5))
+        assert calls == []  # DexScreener had a price: no pool reads
+        asyncio.run(run_metrics(delay=3, timeout=0.3))
+        assert len(calls) == 1
+    finally:
+        bot.calculate_pool_price = saved
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("ALERT METRICS - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_sources_do_not_block_the_event_loop, test_slow_source_yields_partial_metrics,
+                 test_pool_price_is_only_a_fallback):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test for the per-launch analysis context (fixture provider and fake endpoints, no network)
+"""
+import contextvars
+import threading
+from web3 import Web3
+from analysis_context import LaunchCostTracker, TokenAnalysisContext
+from multicall import TokenReadService
+from onchain_analyzer import OnChainAnalyzer
+from replay import FixtureProvider
+from security_scanner import SecurityScanner
+from test_multicall import PAIR, TOKEN, WALLET, make_fixture
+from test_rpc_router import make_router
+
+MINT_SELECTOR_CODE = '0x6080604052' + '40c10f19'  # Bytecode containing mint(address,uint256)
+
+
+def make_context():
+    fixture = make_fixture()
+    fixture['calls'].append({'method': 'eth_getCode', 'params': [Web3.to_checksum_address(TOKEN), 'latest'],
+                             'result': MINT_SELECTOR_CODE})
+    provider = FixtureProvider(fixture)
+    w3 = Web3(provider)
+    reads = TokenReadService(lambda chain: w3, window=0)
+    return TokenAnalysisContext('base', w3, PAIR, TOKEN, WALLET, token_reads=reads), provider
+
+
+def test_reads_are_fetched_once_per_launch():
+    context, provider = make_context()
+    assert context.read([(TOKEN, 'name'), (TOKEN, 'decimals')]) == ['Maker', 18]
+    assert context.read([(TOKEN.lower(), 'decimals'), (TOKEN, 'balanceOf', PAIR)]) == [18, 5 * 10 ** 18]
+    assert provider.counts['eth_call'] == 2  # Second batch only carried balanceOf
+    assert context.read([(TOKEN, 'name'), (TOKEN, 'balanceOf', PAIR.lower())]) == ['Maker', 5 * 10 ** 18]
+    assert provider.counts['eth_call'] == 2 and context.memo_hits == 3
+
+
+def test_security_scan_reuses_launch_reads():
+    context, provider = make_context()
+    context.read([(TOKEN, 'owner')])  # analyze_token already asked for owner()
+    scanner = SecurityScanner(context.w3)
+    for _ in range(2):
+        rug = scanner.check_rug_indicators(TOKEN, context=context)
+        assert rug['has_mint_function'] and rug['ownership_renounced']  # owner() reverts in the fixture
+    assert provider.counts['eth_getCode'] == 1 and provider.counts['eth_call'] == 1
+
+
+def test_onchain_analysis_runs_once_per_launch():
+    context, provider = make_context()
+    analyzer = OnChainAnalyzer(context.w3)
+    first = analyzer.analyze_token_onchain(TOKEN, pair_address=PAIR, context=context)
+    assert analyzer.analyze_token_onchain(TOKEN, pair_address=PAIR, context=context) is first  # Group post reuses the DM analysis
+    assert provider.counts['eth_getLogs'] == 1
+
+    transfers = [{'from': WALLET.lower(), 'to': PAIR.lower(), 'amount': 1, 'block': 12, 'log_index': 0},
+                 {'from': '0x' + '00' * 20, 'to': WALLET.lower(), 'amount': 10, 'block': 10, 'log_index': 3}]
+    assert OnChainAnalyzer(None)._get_deployer(TOKEN, transfers) == WALLET.lower()  # No extra getLogs for the mint
+
+
+def test_counts_rpc_calls_across_threads():
+    router = make_router('ok')
+    context = TokenAnalysisContext('base', Web3(router), PAIR, TOKEN, WALLET)
+    with context.counting():
+        router.make_request('eth_blockNumber', [])
+        worker_context = contextvars.copy_context()  # What ChainExecutor / TokenReadService do for worker threads
+        thread = threading.Thread(target=worker_context.run, args=(router.make_request, 'eth_getLogs', [{}]))
+        thread.start()
+        thread.join()
+    router.make_request('eth_blockNumber', [])  # Outside the launch
+    assert dict(context.rpc_calls) == {'eth_blockNumber': 1, 'eth_getLogs': 1}
+    assert context.format_stats().startswith('2 RPC call(s)')
+
+    costs = LaunchCostTracker()
+    costs.record(context)
+    assert '2.0 RPC call(s)/launch' in costs.format_stats()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("ANALYSIS CONTEXT - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_reads_are_fetched_once_per_launch, test_security_scan_reuses_launch_reads,
+                 test_onchain_analysis_runs_once_per_launch, test_counts_rpc_calls_across_threads):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline test for adaptive (AIMD) eth_getLogs range sizing
+"""
+from block_range import AdaptiveBlockRange, PROVIDER_RANGE_LIMITS, classify_range_error
+from onchain_analyzer import OnChainAnalyzer
+
+
+class RangeLimitedEth:
+    """Fake node that rejects spans wider than `limit` and can rate-limit the first few calls"""
+
+    def __init__(self, limit: int, head: int = 10_000, rate_limited: int = 0):
+        self.limit = limit
+        self.head = head
+        self.rate_limited = rate_limited
+        self.ranges = []
+
+    @property
+    def block_number(self):
+        return self.head
+
+    def get_logs(self, params):
+        start, end = int(params['fromBlock'], 16), int(params['toBlock'], 16)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise ValueError('429 Client Error: Too Many Requests')
+        if end - start + 1 > self.limit:
+            raise ValueError({'code': -32600, 'message': f'You can make eth_getLogs requests with up to a {self.limit} block range.'})
+        self.ranges.append((start, end))
+        return [{'blockNumber': start}]
+
+
+class FakeW3:
+    def __init__(self, eth, uri):
+        self.eth = eth
+        self.provider = type('P', (), {'endpoint_uri': uri})()
+
+
+def _assert_contiguous(ranges, from_block, to_block):
+    assert ranges[0][0] == from_block and ranges[-1][1] == to_block
+    for (_, prev_end), (start, _) in zip(ranges, ranges[1:]):
+        assert start == prev_end + 1
+
+
+def test_grows_additively_and_learns_limit():
+    PROVIDER_RANGE_LIMITS.clear()
+    eth = RangeLimitedEth(limit=100)
+    w3 = FakeW3(eth, 'http://limited')
+    controller = AdaptiveBlockRange(initial=10, maximum=1000, step=10)
+    fetch = lambda a, b: w3.eth.get_logs({'fromBlock': hex(a), 'toBlock': hex(b)})
+
+    controller.fetch(w3, 0, 1999, fetch)
+    _assert_contiguous(eth.ranges, 0, 1999)  # Nothing skipped despite the rejections
+    assert PROVIDER_RANGE_LIMITS['http://limited'] == 100  # Advertised limit parsed from the error
+    assert controller.size('http://limited') == 100
+    assert max(end - start + 1 for start, end in eth.ranges) == 100
+
+
+def test_halves_on_rate_limit_and_raises_other_errors():
+    PROVIDER_RANGE_LIMITS.clear()
+    eth = RangeLimitedEth(limit=10_000, rate_limited=2)
+    w3 = FakeW3(eth, 'http://busy')
+    controller = AdaptiveBlockRange(initial=400, minimum=10, step=100, backoff=0)
+    controller.fetch(w3, 0, 999, lambda a, b: w3.eth.get_logs({'fromBlock': hex(a), 'toBlock': hex(b)}))
+    assert eth.ranges[0] == (0, 99)  # 400 -> 200 -> 100 after two 429s
+    _assert_contiguous(eth.ranges, 0, 999)
+    assert 'http://busy' not in PROVIDER_RANGE_LIMITS  # Rate limits don't pin a permanent limit
+
+    def broken(a, b):
+        raise ValueError('execution reverted')
+    try:
+        controller.fetch(w3, 0, 10, broken)
+        assert False, "unrecoverable errors must propagate"
+    except ValueError:
+        pass
+    assert classify_range_error(ValueError('Read timed out.')) == 'timeout'
+    assert classify_range_error(ValueError('execution reverted')) is None
+
+
+def test_transfer_logs_cover_every_block():
+    PROVIDER_RANGE_LIMITS.clear()
+    eth = RangeLimitedEth(limit=500, head=20_000)
+    analyzer = OnChainAnalyzer(FakeW3(eth, 'http://transfers'))
+    logs = analyzer._get_transfer_logs('0x' + '11' * 20, max_blocks=5000)
+    _assert_contiguous(eth.ranges, 15_000, 20_000)
+    assert len(logs) == len(eth.ranges)
+
+
+def test_analyzer_shares_the_scanner_controller():
+    PROVIDER_RANGE_LIMITS.clear()
+    eth = RangeLimitedEth(limit=10_000, head=20_000, rate_limited=2)
+    w3 = FakeW3(eth, 'http://shared')
+    scanner_range = AdaptiveBlockRange(initial=400, minimum=10, step=100, backoff=0)
+    scanner_range.fetch(w3, 0, 99, lambda a, b: w3.eth.get_logs({'fromBlock': hex(a), 'toBlock': hex(b)}))
+    learned = scanner_range.size('http://shared')  # Shrunk by the 429s the factory scan hit
+    assert learned < 400
+
+    eth.ranges.clear()
+    OnChainAnalyzer(w3, block_range=scanner_range)._get_transfer_logs('0x' + '11' * 20, max_blocks=5000)
+    start, end = eth.ranges[0]
+    assert end - start + 1 == learned  # Not a fresh 2000-block probe of the same provider
+
+    import sniper_bot as bot
+    if bot.onchain_analyzer is not None:
+        assert bot.onchain_analyzer.block_range is bot.chain_registry['base'].log_scanner.block_range
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("ADAPTIVE BLOCK RANGE - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_grows_additively_and_learns_limit, test_halves_on_rate_limit_and_raises_other_errors, test_transfer_logs_cover_every_block,
+                 test_analyzer_shares_the_scanner_controller):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Offline test for the chain registry (declarations, explorer links, per-chain components)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from chains import ChainConfig, ChainRegistry, chains_from_json
+from test_rpc_router import FakeEndpointProvider
+
+WETH = '0x4200000000000000000000000000000000000006'
+FACTORIES = {'uniswap_v2': {'address': '0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6', 'name': 'Uniswap V2', 'type': 'v2'}}
+
+
+def test_declaration_and_links():
+    config = ChainConfig('base', 'Base', '🔵', ['https://a', 'https://b', 'https://a'], FACTORIES,
+                         quote_tokens={'WETH': WETH}, explorer_url='https://basescan.org/')
+    assert config.rpc_urls == ['https://a', 'https://b']
+    assert config.label == '🔵 Base'
+    assert config.is_quote_token(WETH.upper().replace('0X', '0x'))
+    assert config.quote_address('USDC') == WETH.lower()  # Unknown symbol falls back to WETH
+    assert config.token_url('0xabc') == 'https://basescan.org/token/0xabc'
+    assert config.dexscreener_url('0xabc') == 'https://dexscreener.com/base/0xabc'
+    assert config.swap_link('0xabc') == 'https://app.uniswap.org/#/tokens/base/0xabc'
+    assert config.log_scanner.chain == 'base' and config.head_tracker.chain == 'base'
+
+
+def test_extra_chains_from_json():
+    text = (
+        '[{"chain": "unichain", "name": "Unichain", "emoji": "🦄", "rpc_urls": ["https://rpc.unichain.org"], '
+        '"factories": {}, "quote_tokens": {"WETH": "0x4200000000000000000000000000000000000006"}, '
+        '"explorer_url": "https://uniscan.xyz", "scan_interval": 2}]'
+    )
+    extra = chains_from_json(text, combined_logs=True)
+    assert len(extra) == 1 and extra[0].scan_interval == 2
+    assert chains_from_json('') == []
+
+
+def test_registry_only_scans_connected_chains():
+    registry = ChainRegistry()
+    base = registry.register(ChainConfig('base', 'Base', '🔵', [], FACTORIES, {'WETH': WETH}, 'https://basescan.org'))
+    registry.register(ChainConfig('monad', 'Monad', '🟣', [], {}, {}, 'https://monadscan.com'))
+    base.w3 = object()
+    assert 'monad' in registry and registry.w3('monad') is None and registry.w3('unknown') is None
+    assert [c.chain for c in registry.connected()] == ['base']
+
+
+
+def test_connect_is_offline_and_probe_disables_unreachable_chains():
+    registry = ChainRegistry()
+    base = registry.register(ChainConfig('base', 'Base', '🔵', ['https://a'], FACTORIES, {'WETH': WETH},
+                                         'https://basescan.org', required=True))
+    monad = registry.register(ChainConfig('monad', 'Monad', '🟣', ['https://b'], {}, {}, 'https://monadscan.com'))
+    registry.connect_all()
+    assert base.w3 is not None and monad.w3 is not None and not base.router.probed
+    for config in registry:
+        config.router.endpoints[0].provider = FakeEndpointProvider('down')
+    assert registry.probe_all(deadline=1) == {'base': 0, 'monad': 0}
+    assert [c.chain for c in registry.connected()] == ['base']  # Required chains keep routing
+
+
+def test_import_has_no_side_effects():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'data', 'users.db')
+        script = (
+            "import socket\n"
+            "def deny(*args, **kwargs):\n"
+            "    raise AssertionError('network access at import')\n"
+            "socket.socket.connect = socket.create_connection = socket.getaddrinfo = deny\n"
+            "import sniper_bot\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                env={**os.environ, 'DATABASE_PATH': db_path}, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr[-2000:]
+        assert not os.path.exists(os.path.dirname(db_path))
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("CHAIN REGISTRY - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_declaration_and_links, test_extra_chains_from_json, test_registry_only_scans_connected_chains,
+                 test_connect_is_offline_and_probe_disables_unreachable_chains, test_import_has_no_side_effects):
+        test()
+        print(f"✅ {test.__name__}")
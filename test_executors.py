@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Offline test for the analysis worker pool and RPC budget
+"""
+import asyncio
+import time
+from executors import AnalysisPool, AnalysisTier, ChainExecutor, LoopLagMonitor, RpcBudget, TierFull, raise_if_cancelled
+
+
+async def _run_pool():
+    pool = AnalysisPool(workers=4)
+    pool.start()
+    executor = ChainExecutor('test', max_workers=4)
+    order = []
+
+    def blocking_analysis(key, seq):
+        time.sleep(0.2)  # Stand-in for blocking Web3 calls
+        return key, seq
+
+    def job(key, seq):
+        async def run():
+            order.append(await executor.run(blocking_analysis, key, seq))
+        return run
+
+    started = time.monotonic()
+    for seq in range(3):
+        await pool.submit('base:0xsame', job('base:0xsame', seq))
+    for i in range(3):
+        await pool.submit(f'base:0xother{i}', job(f'base:0xother{i}', 0))
+    await pool.join()
+    elapsed = time.monotonic() - started
+    executor.shutdown()
+
+    # Same pair: strictly in submission order; different pairs overlap with the same-pair chain
+    assert [seq for key, seq in order if key == 'base:0xsame'] == [0, 1, 2]
+    assert elapsed < 1.0  # 6 jobs x 0.2s serially would be 1.2s
+    assert pool.stats['completed'] == 6 and pool.stats['max_depth'] >= 1
+    assert 'depth 0' in pool.format_stats()
+
+
+def test_pool_concurrency_and_per_pair_order():
+    asyncio.run(_run_pool())
+
+
+async def _run_budget():
+    budget = RpcBudget(rate=100, burst=10)
+    started = time.monotonic()
+    for _ in range(3):
+        await budget.acquire(10)  # Burst covers the first; the next two wait ~0.1s each
+    elapsed = time.monotonic() - started
+    assert 0.15 < elapsed < 0.5
+    assert budget.waited > 0
+
+
+def test_rpc_budget_paces_calls():
+    asyncio.run(_run_budget())
+
+
+async def _run_tier():
+    tier = AnalysisTier('test', max_workers=1, max_pending=2, deadline=5)
+    lag = LoopLagMonitor(interval=0.02)
+    lag.start()
+    chunks = []
+
+    def log_sweep(n):
+        for chunk in range(n):
+            raise_if_cancelled()  # As OnChainAnalyzer does between getLogs chunks
+            chunks.append(chunk)
+            time.sleep(0.05)
+        return n
+
+    sweep = asyncio.create_task(tier.run(log_sweep, 40, deadline=0.3))
+    queued = asyncio.create_task(tier.run(log_sweep, 1, deadline=0.1))  # Waits behind the sweep on 1 worker
+    await asyncio.sleep(0.01)
+    try:
+        await tier.run(log_sweep, 1)
+        assert False, "a third task must be rejected"
+    except TierFull:
+        pass
+    for task in (sweep, queued):
+        try:
+            await task
+            assert False, "both tasks outlive their deadlines"
+        except asyncio.TimeoutError:
+            pass
+    await asyncio.sleep(0.1)
+    assert 4 <= len(chunks) <= 9  # The sweep stopped at its next checkpoint; the queued task never started
+    assert tier.pending == 0 and tier.stats == {'completed': 0, 'failed': 0, 'expired': 2, 'rejected': 1}
+    assert await tier.run(log_sweep, 2) == 2 and tier.stats['completed'] == 1
+    lag.stop()
+    tier.shutdown()
+    assert lag.samples and lag.max_lag < 0.2  # The loop kept ticking while the sweep blocked a worker thread
+    assert 'event loop lag' in lag.format_stats() and 'expired 2' in tier.format_stats()
+
+
+def test_analysis_tier_bounds_and_deadlines():
+    asyncio.run(_run_tier())
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("EXECUTORS - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_pool_concurrency_and_per_pair_order, test_rpc_budget_paces_calls, test_analysis_tier_bounds_and_deadlines):
+        test()
+        print(f"✅ {test.__name__}")
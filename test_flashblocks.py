@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Offline test for Flashblocks preconfirmation ingestion against a local stand-in stream
+"""
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+import websockets
+import sniper_bot as bot
+from database import UserDatabase
+from flashblocks import FlashblocksConsumer, PreconfirmationLedger, extract_logs
+from log_scanner import FactoryLogScanner
+from pair_index import SeenPairIndex
+
+V2_TOPIC = '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9'
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+FACTORY = '0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6'
+WETH_TOPIC = '0x0000000000000000000000004200000000000000000000000000000000000006'
+TOKEN_TOPIC = '0x000000000000000000000000' + '1234567890abcdef1234567890abcdef12345678'
+FACTORIES = {'uniswap_v2': {'address': FACTORY, 'type': 'v2', 'name': 'Uniswap V2', 'emoji': '🦄', 'event_topic': V2_TOPIC, 'enabled': True}}
+
+# Recorded-shape frames: index 0 carries `base`, later indexes only `diff`; receipts live in metadata
+FRAMES = [
+    {
+        'payload_id': '0x01', 'index': 0,
+        'base': {'block_number': hex(30_000_001)},
+        'diff': {'transactions': []},
+        'metadata': {'block_number': 30_000_001, 'receipts': {}},
+    },
+    {
+        'payload_id': '0x01', 'index': 1,
+        'diff': {'transactions': ['0x02f8']},
+        'metadata': {'block_number': 30_000_001, 'receipts': {
+            '0x' + 'aa' * 32: {'Eip1559': {'status': '0x1', 'logs': [
+                {'address': FACTORY, 'topics': [V2_TOPIC, TOKEN_TOPIC, WETH_TOPIC],
+                 'data': '0x' + '00' * 12 + 'cc' * 20 + '00' * 31 + '01'},
+            ]}},
+            '0x' + 'bb' * 32: {'Eip1559': {'status': '0x1', 'logs': [
+                {'address': '0x4200000000000000000000000000000000000006', 'topics': [TRANSFER_TOPIC], 'data': '0x'},
+            ]}},
+        }},
+    },
+]
+
+
+def test_extract_logs():
+    logs = extract_logs(FRAMES[1])
+    assert len(logs) == 2
+    assert logs[0]['blockNumber'] == 30_000_001
+    assert logs[0]['topics'][0].hex().endswith(V2_TOPIC[2:])
+
+
+def test_consumer_dedupes_and_routes():
+    consumer = FlashblocksConsumer('ws://unused', FactoryLogScanner(FACTORIES))
+    for frame in FRAMES + [FRAMES[1]]:  # Same receipt replayed in a later flashblock
+        consumer.handle_message(json.dumps(frame))
+    items = consumer.drain()
+    assert len(items) == 1
+    assert items[0][2] == 'uniswap_v2'
+    assert consumer.flashblocks_seen == 3
+
+
+async def _run_stream():
+    async def serve(ws):
+        for frame in FRAMES:
+            await ws.send(json.dumps(frame).encode())  # Bytes frames, like the public endpoint
+        await asyncio.sleep(1)
+
+    server = await websockets.serve(serve, '127.0.0.1', 0)
+    url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    event = asyncio.Event()
+    consumer = FlashblocksConsumer(url, FactoryLogScanner(FACTORIES), notify=event)
+    task = asyncio.create_task(consumer.run())
+    try:
+        await asyncio.wait_for(event.wait(), timeout=3)
+        assert len(consumer.drain()) == 1
+    finally:
+        task.cancel()
+        server.close()
+        await server.wait_closed()
+
+
+def test_consumer_against_local_stream():
+    asyncio.run(_run_stream())
+
+
+def test_ledger_reconciliation():
+    ledger = PreconfirmationLedger()
+    ledger.add('base:0xaaa', 100)
+    ledger.add('base:0xbbb', 100)
+    ledger.add('base:0xccc', 105)
+    result = ledger.reconcile({'base:0xaaa'}, sealed_through=101)
+    assert result == {'confirmed': ['base:0xaaa'], 'dropped': ['base:0xbbb']}
+    assert list(ledger.pending) == ['base:0xccc']  # Block 105 not sealed yet
+
+
+class RetractingBot:
+    def __init__(self):
+        self.deleted, self.edited = [], []
+
+    async def delete_message(self, chat_id, message_id):
+        self.deleted.append((chat_id, message_id))
+
+    async def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        self.edited.append((chat_id, message_id, text))
+
+
+def test_dropped_preconfirmation_is_retracted():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    saved = bot.db
+    try:
+        bot.db = db = UserDatabase(path)
+        scanned = SeenPairIndex(db)
+        dropped_pair, sealed_pair = '0x' + 'Dd' * 20, '0x' + 'ee' * 20
+        ledger = PreconfirmationLedger()
+        for message_id, pair in ((1, dropped_pair), (3, sealed_pair)):
+            scanned.add(f"base:{pair}", 100)  # Alerted from the Flashblock
+            ledger.add(f"base:{pair}", 100)
+            db.add_alert_message('base', pair, 7, message_id, 'user')
+            db.add_alert_message('base', pair, -100, message_id + 1, 'group')
+        reconciled = ledger.reconcile({f"base:{sealed_pair}"}, sealed_through=101)
+
+        telegram = RetractingBot()
+        asyncio.run(bot.retract_dropped_preconfirmations(SimpleNamespace(bot=telegram), 'base', reconciled['dropped'], scanned))
+        assert telegram.deleted == [(-100, 2)]
+        assert len(telegram.edited) == 1 and 'never made it into a sealed block' in telegram.edited[0][2]
+        assert f"base:{dropped_pair}" not in scanned  # Processed again if it lands later
+        assert f"base:{sealed_pair}" in scanned and len(db.get_alert_messages('base', sealed_pair)) == 2
+        assert db.get_alert_messages('base', dropped_pair) == []
+    finally:
+        bot.db = saved
+        os.remove(path)
+
+
+def test_flashblock_drained_after_its_block_was_polled_is_confirmed():
+    consumer = FlashblocksConsumer('ws://unused', FactoryLogScanner(FACTORIES))
+    for frame in FRAMES:
+        consumer.handle_message(json.dumps(frame))
+    ledger = PreconfirmationLedger()
+    # The poll already returned the sealed block when the queued Flashblock is drained
+    sealed = [{'address': '0x' + 'cc' * 20, 'block': 30_000_001}]
+    pairs = asyncio.run(bot.merge_preconfirmations(None, 'base', consumer, ledger, sealed, 30_000_001, set()))
+    assert [p.get('preconfirmed', False) for p in pairs] == [True, False]
+    assert ledger.confirmed == 1 and ledger.pending == {}
+    asyncio.run(bot.merge_preconfirmations(None, 'base', consumer, ledger, [], 30_000_002, set()))
+    assert ledger.dropped == 0  # Not reported missing by the next scan
+
+
+def test_early_return_clears_the_last_window():
+    config = bot.chain_registry['base']
+    saved = config.log_scanner.last_window, config.w3
+    config.log_scanner.last_window = {'mode': 'combined', 'calls': 1, 'logs': 0, 'saved_calls': 0, 'to_block': 99}
+    config.w3 = SimpleNamespace()  # Never touched: the cursor is past head
+    head_tracker = config.head_tracker
+    config.head_tracker = SimpleNamespace(block_number=lambda: 50)
+    try:
+        assert bot.get_new_pairs(100, 10, chain='base') == []
+        assert config.log_scanner.last_window.get('mode') is None  # scan_chain sees no sealed window
+    finally:
+        config.log_scanner.last_window, config.w3 = saved
+        config.head_tracker = head_tracker
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("FLASHBLOCKS - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_extract_logs, test_consumer_dedupes_and_routes, test_consumer_against_local_stream, test_ledger_reconciliation,
+                 test_dropped_preconfirmation_is_retracted, test_flashblock_drained_after_its_block_was_polled_is_confirmed,
+                 test_early_return_clears_the_last_window):
+        test()
+        print(f"✅ {test.__name__}")
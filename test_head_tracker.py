@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test for the shared chain-head tracker
+"""
+import asyncio
+from head_tracker import HeadTracker
+from executors import ChainExecutor
+
+
+class CountingEth:
+    def __init__(self, head=1000):
+        self.head = head
+        self.head_calls = 0
+        self.block_calls = 0
+
+    @property
+    def block_number(self):
+        self.head_calls += 1
+        return self.head
+
+    def get_block(self, number):
+        self.block_calls += 1
+        return {'number': number, 'hash': b'\xaa' * 32, 'parentHash': b'\xbb' * 32, 'timestamp': 1_700_000_000 + number * 2}
+
+
+class FakeW3:
+    def __init__(self):
+        self.eth = CountingEth()
+
+
+def test_cached_head_and_headers():
+    w3 = FakeW3()
+    tracker = HeadTracker(lambda: w3, 'base', interval=60, header_cache_size=2)
+    assert [tracker.block_number() for _ in range(5)] == [1000] * 5
+    assert w3.eth.head_calls == 1  # Every caller within max_age shares one eth_blockNumber
+
+    assert tracker.block_timestamp(990) == 1_700_001_980
+    assert tracker.block_timestamp(990) == 1_700_001_980
+    assert w3.eth.block_calls == 1
+    assert tracker.get_header(990)['hash'] == '0x' + 'aa' * 32
+
+    # newHeads push: head advances and the header is cached without an RPC call
+    tracker.observe_header({'number': hex(1001), 'hash': '0x' + 'cc' * 32, 'parentHash': '0x' + 'dd' * 32, 'timestamp': hex(1_700_002_002)})
+    assert tracker.block_number() == 1001
+    assert tracker.block_timestamp(1001) == 1_700_002_002
+    tracker.get_header(1000)
+    assert 990 not in tracker.headers  # LRU keeps only the 2 most recent headers
+    assert w3.eth.head_calls == 1
+
+
+def test_stale_read_refreshes():
+    w3 = FakeW3()
+    tracker = HeadTracker(lambda: w3, 'base', interval=0, max_age=0)
+    tracker.block_number()
+    w3.eth.head = 1005
+    assert tracker.block_number() == 1005
+    assert w3.eth.head_calls == 2
+
+
+async def _run_refresher():
+    w3 = FakeW3()
+    tracker = HeadTracker(lambda: w3, 'base', interval=0.05)
+    executor = ChainExecutor('test')
+    task = asyncio.create_task(tracker.run(executor))
+    try:
+        await asyncio.sleep(0.02)
+        w3.eth.head = 1010
+        await asyncio.sleep(0.1)
+        assert tracker.head == 1010
+    finally:
+        task.cancel()
+        executor.shutdown()
+
+
+def test_background_refresh():
+    asyncio.run(_run_refresher())
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("HEAD TRACKER - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_cached_head_and_headers, test_stale_read_refreshes, test_background_refresh):
+        test()
+        print(f"✅ {test.__name__}")
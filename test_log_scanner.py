@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test for the combined multi-factory log scanner (no RPC needed)
+"""
+from hexbytes import HexBytes
+from log_scanner import FactoryLogScanner, is_multi_address_rejection
+
+V2_TOPIC = '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9'
+V3_TOPIC = '0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118'
+
+FACTORIES = {
+    'uni_v3': {'address': '0x33128a8fC17869897dcE68Ed026d694621f6FDfD', 'type': 'v3', 'name': 'Uniswap V3', 'emoji': '🦄', 'event_topic': V3_TOPIC, 'enabled': True},
+    'uni_v2': {'address': '0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6', 'type': 'v2', 'name': 'Uniswap V2', 'emoji': '🦄', 'event_topic': V2_TOPIC, 'enabled': True},
+    'sushi': {'address': '0x71524B4f93c58fcbF659783284E38825f0622859', 'type': 'v2', 'name': 'SushiSwap', 'emoji': '🍣', 'event_topic': V2_TOPIC, 'enabled': True},
+    'off': {'address': '0x04C9f118d21e8B767D2e50C946f0cC9F6C367300', 'type': 'v2', 'name': 'Disabled', 'emoji': '🔵', 'event_topic': V2_TOPIC, 'enabled': False},
+}
+
+
+def _log(address, topic, block=100):
+    return {'address': address, 'topics': [HexBytes(topic)], 'data': HexBytes(b''), 'blockNumber': block}
+
+
+class FakeEth:
+    def __init__(self, reject_lists=False):
+        self.reject_lists = reject_lists
+        self.calls = []
+        self.logs = [
+            _log(FACTORIES['uni_v3']['address'], V3_TOPIC),
+            _log(FACTORIES['uni_v2']['address'], V2_TOPIC),
+            _log(FACTORIES['sushi']['address'], V2_TOPIC),
+            _log(FACTORIES['off']['address'], V2_TOPIC),
+        ]
+
+    def get_logs(self, params):
+        self.calls.append(params)
+        addresses = params['address'] if isinstance(params['address'], list) else [params['address']]
+        if self.reject_lists and len(addresses) > 1:
+            raise ValueError({'code': -32602, 'message': 'invalid argument 0: json: cannot unmarshal array into Go struct field'})
+        topics = params['topics'][0] if isinstance(params['topics'][0], list) else [params['topics'][0]]
+        topics = {HexBytes(t) for t in topics}
+        wanted = {a.lower() for a in addresses}
+        return [l for l in self.logs if l['address'].lower() in wanted and l['topics'][0] in topics]
+
+
+class FakeW3:
+    def __init__(self, reject_lists=False):
+        self.eth = FakeEth(reject_lists)
+        self.provider = type('P', (), {'endpoint_uri': 'http://fake'})()
+
+
+def test_combined_single_call():
+    w3 = FakeW3()
+    scanner = FactoryLogScanner(FACTORIES, chain='base')
+    results = scanner.fetch_logs(w3, 100, 110)
+    assert len(w3.eth.calls) == 1
+    assert len(w3.eth.calls[0]['address']) == 3  # Disabled factory excluded
+    assert len(w3.eth.calls[0]['topics'][0]) == 2  # Distinct topics only
+    assert sorted(dex_id for _, dex_id, _ in results) == ['sushi', 'uni_v2', 'uni_v3']
+    assert scanner.last_window == {'mode': 'combined', 'calls': 1, 'logs': 3, 'saved_calls': 2, 'from_block': 100, 'to_block': 110}
+
+
+def test_fallback_on_rejection():
+    w3 = FakeW3(reject_lists=True)
+    scanner = FactoryLogScanner(FACTORIES, chain='base')
+    results = scanner.fetch_logs(w3, 100, 110)
+    assert len(results) == 3
+    assert scanner.last_window['mode'] == 'per_factory'
+    assert len(w3.eth.calls) == 4  # Rejected combined call + 3 per-factory calls
+    # Provider is remembered, so the next window skips the combined attempt
+    scanner.fetch_logs(w3, 111, 120)
+    assert len(w3.eth.calls) == 7
+
+
+def test_other_errors_do_not_fall_back():
+    assert is_multi_address_rejection(ValueError('json: cannot unmarshal array into Go value'))
+    assert not is_multi_address_rejection(ValueError('429 Too Many Requests'))
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("LOG SCANNER - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_combined_single_call, test_fallback_on_rejection, test_other_errors_do_not_fall_back):
+        test()
+        print(f"✅ {test.__name__}")
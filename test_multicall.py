@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Offline test for Multicall3 batching and tolerant ERC20 decoding (fixture provider, no network)
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+from eth_abi import encode as abi_encode
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+import multicall
+from multicall import MULTICALL3_ADDRESS, TokenReadService, aggregate3, decode_string, erc20_calldata, read_erc20
+from replay import FixtureProvider
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+PAIR = '0x7777777777777777777777777777777777777777'
+WALLET = '0x2222222222222222222222222222222222222222'
+
+
+def recorded(to, data, result=None, error=None):
+    entry = {'method': 'eth_call', 'params': [{'to': Web3.to_checksum_address(to), 'data': '0x' + data.hex()}, 'latest']}
+    if error:
+        entry['error'] = {'code': 3, 'message': error}
+    else:
+        entry['result'] = '0x' + result.hex()
+    return entry
+
+
+def make_fixture():
+    return {'chain': 'base', 'from_block': 0, 'to_block': 1, 'logs': [], 'calls': [
+        recorded(TOKEN, erc20_calldata('name'), abi_encode(['string'], ['Maker'])),
+        recorded(TOKEN, erc20_calldata('symbol'), b'MKR'.ljust(32, b'\0')),  # bytes32 symbol
+        recorded(TOKEN, erc20_calldata('decimals'), abi_encode(['uint8'], [18])),
+        recorded(TOKEN, erc20_calldata('owner'), error='execution reverted'),
+        recorded(TOKEN, erc20_calldata('balanceOf', PAIR), abi_encode(['uint256'], [5 * 10 ** 18])),
+        recorded(TOKEN, erc20_calldata('balanceOf', WALLET), abi_encode(['uint256'], [25 * 10 ** 17])),
+        recorded(MULTICALL3_ADDRESS, erc20_calldata('getEthBalance', WALLET), abi_encode(['uint256'], [10 ** 17])),
+    ]}
+
+
+class CountingFixtureProvider(FixtureProvider):
+    """Fixture provider that treats Multicall3 as undeployed (eth_call to it returns no data)"""
+
+    def make_request(self, method, params):
+        if method == 'eth_call' and params[0]['to'].lower() == multicall.MULTICALL3_ADDRESS.lower():
+            self.counts['multicall'] += 1
+            return {'jsonrpc': '2.0', 'id': 1, 'result': '0x'}
+        return super().make_request(method, params)
+
+
+def test_tolerant_string_decoding():
+    assert decode_string(abi_encode(['string'], ['Token'])) == 'Token'
+    assert decode_string(b'MKR'.ljust(32, b'\0')) == 'MKR'
+    assert decode_string(abi_encode(['bytes'], [b'\xffbad'])) == '�bad'
+    assert decode_string(abi_encode(['string'], [''])) == ''
+    assert decode_string(b'') is None
+
+
+def test_read_erc20_is_one_round_trip():
+    provider = FixtureProvider(make_fixture())
+    w3 = Web3(provider)
+    values = read_erc20(w3, [(TOKEN, 'name'), (TOKEN, 'symbol'), (TOKEN, 'decimals'), (TOKEN, 'owner'),
+                             (TOKEN, 'totalSupply'), (TOKEN, 'balanceOf', PAIR)])
+    assert values == ['Maker', 'MKR', 18, None, None, 5 * 10 ** 18]
+    assert provider.counts['eth_call'] == 1
+    assert provider.misses['aggregate3'] == 1  # totalSupply was never recorded; owner's revert was
+
+
+def test_falls_back_without_multicall3():
+    provider = CountingFixtureProvider(make_fixture())
+    w3 = Web3(provider)
+    try:
+        calls = [(TOKEN, erc20_calldata('name')), (TOKEN, erc20_calldata('owner'))]
+        assert [r.success for r in aggregate3(w3, calls)] == [True, False]
+        assert read_erc20(w3, [(TOKEN, 'decimals')]) == [18]
+        assert provider.counts['multicall'] == 1  # Remembered per provider
+    finally:
+        multicall.UNSUPPORTED_PROVIDERS.discard(provider.endpoint_uri)
+
+
+def test_transport_errors_raise():
+    class DownProvider(JSONBaseProvider):
+        def make_request(self, method, params):
+            raise ConnectionError('503 Server Error')
+
+        def is_connected(self, show_traceback=False):
+            return False
+
+    try:
+        read_erc20(Web3(DownProvider()), [(TOKEN, 'name')])
+        assert False, 'expected the transport error'
+    except ConnectionError:
+        pass
+
+
+def test_service_coalesces_concurrent_callers():
+    provider = FixtureProvider(make_fixture())
+    service = TokenReadService(lambda chain: Web3(provider), window=0.05)
+    results = {}
+
+    def caller(name, requests):
+        results[name] = service.read('base', requests)
+
+    threads = [threading.Thread(target=caller, args=('a', [(TOKEN, 'name'), (TOKEN, 'decimals')])),
+               threading.Thread(target=caller, args=('b', [(TOKEN, 'decimals'), (TOKEN, 'balanceOf', PAIR)]))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {'a': ['Maker', 18], 'b': [18, 5 * 10 ** 18]}
+    assert provider.counts['eth_call'] == 1
+    assert service.stats['batches'] == 1 and service.stats['unique'] == 3 and service.stats['callers'] == 2
+
+
+def test_typed_metadata_balances_and_portfolio():
+    provider = FixtureProvider(make_fixture())
+    service = TokenReadService(lambda chain: Web3(provider), window=0, max_calls=2)
+    token = service.metadata('base', [TOKEN.lower()])[TOKEN]
+    assert (token.name, token.symbol, token.decimals, token.owner) == ('Maker', 'MKR', 18, None)
+    assert not token.is_erc20  # totalSupply missing
+
+    portfolio = service.portfolio('base', [WALLET], [TOKEN])
+    native, held = portfolio[WALLET]
+    assert native.token == MULTICALL3_ADDRESS and native.formatted == 0.1
+    assert held.formatted == 2.5 and held.decimals == 18
+    assert service.stats['rpc_calls'] == 3 + 2  # max_calls=2 splits each batch into several aggregate3 calls
+
+
+def test_portfolio_reply_escapes_token_symbols():
+    import sniper_bot as bot
+    fixture = make_fixture()
+    for call in fixture['calls']:
+        if call['params'][0]['data'] == '0x' + erc20_calldata('symbol').hex():
+            call['result'] = '0x' + abi_encode(['string'], ['<b>*MKR_']).hex()  # Deployer-chosen markup
+    replies = []
+
+    async def reply_text(text, **kwargs):
+        replies.append((text, kwargs))
+
+    update = SimpleNamespace(effective_chat=SimpleNamespace(type='private'), effective_user=SimpleNamespace(id=7),
+                             message=SimpleNamespace(reply_text=reply_text))
+    saved = bot.db, bot.token_reads
+    bot.db = SimpleNamespace(get_user_wallets=lambda user_id: [{'wallet_address': WALLET}])
+    bot.token_reads = TokenReadService(lambda chain: Web3(FixtureProvider(fixture)), window=0)
+    try:
+        asyncio.run(bot.portfolio_command(update, SimpleNamespace(user_data={}, args=[TOKEN])))
+    finally:
+        bot.db, bot.token_reads = saved
+    (text, kwargs), = replies
+    assert kwargs['parse_mode'] == 'HTML'
+    assert '▸ &lt;b&gt;*MKR_: 2.500000' in text and '<b>*MKR_' not in text
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("MULTICALL3 - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_tolerant_string_decoding, test_read_erc20_is_one_round_trip, test_falls_back_without_multicall3,
+                 test_transport_errors_raise, test_service_coalesces_concurrent_callers,
+                 test_typed_metadata_balances_and_portfolio, test_portfolio_reply_escapes_token_symbols):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Offline test for the bytes-level factory log decoder
+"""
+from eth_abi import encode
+from hexbytes import HexBytes
+from pair_decoder import FactoryLogDecoder
+
+WETH = '0x4200000000000000000000000000000000000006'
+USDC = '0x833589fcd6edb6e08f4c7c32d4f71b54bda02913'
+DAI = '0x50c5725949a6f0c72e6c4a641f24049a917db0cb'
+TOKEN = '0x' + 'ab' * 20
+POOL = '0x' + 'cd' * 20
+V2 = {'type': 'v2', 'name': 'Uniswap V2', 'emoji': '🦄'}
+V3 = {'type': 'v3', 'name': 'Uniswap V3', 'emoji': '🦄'}
+AERO = {'type': 'velodrome', 'name': 'Aerodrome', 'emoji': '✈️'}
+
+
+def word(value) -> HexBytes:
+    if isinstance(value, str):
+        return HexBytes(bytes(12) + bytes.fromhex(value[2:]))
+    return HexBytes(int(value).to_bytes(32, 'big'))
+
+
+def log(topics, data, block=100):
+    return {'topics': [HexBytes(b'\x00' * 32)] + topics, 'data': HexBytes(data), 'blockNumber': block}
+
+
+def decoder():
+    return FactoryLogDecoder({'WETH': WETH, 'USDC': USDC}, [DAI])
+
+
+def test_v2_pair_is_first_data_word():
+    # data = (address pair, uint allPairsLength) - the pair is NOT the trailing word
+    record = decoder().decode(log([word(TOKEN), word(WETH)], encode(['address', 'uint256'], [POOL, 123456])), 'v2', 'uniswap_v2', V2)
+    assert record.address == POOL and record.token0 == TOKEN and record.pair_type == 'WETH'
+    assert record.as_pool()['dex_name'] == 'Uniswap V2' and 'fee' not in record.as_pool()
+
+
+def test_v3_fee_and_tick_spacing():
+    data = encode(['int24', 'address'], [-10, POOL])
+    record = decoder().decode(log([word(USDC), word(TOKEN), word(500)], data), 'v3', 'uniswap_v3', V3)
+    assert (record.address, record.fee, record.tick_spacing, record.pair_type) == (POOL, 500, -10, 'USDC')
+
+
+def test_aerodrome_stable_flag():
+    indexed = log([word(WETH), word(TOKEN), word(1)], encode(['address', 'uint256'], [POOL, 7]))
+    unindexed = log([word(WETH), word(TOKEN)], encode(['bool', 'address', 'uint256'], [False, POOL, 7]))
+    records = decoder().decode_batch([(indexed, 'aerodrome', AERO), (unindexed, 'velodrome', AERO)])
+    assert [(r.address, r.stable) for r in records] == [(POOL, True), (POOL, False)]
+
+
+def test_skips_and_stats():
+    d = decoder()
+    routed = [
+        (log([word(TOKEN), word('0x' + '11' * 20)], encode(['address', 'uint256'], [POOL, 1])), 'v2', V2),  # no quote token
+        (log([word(DAI), word(WETH)], encode(['address', 'uint256'], [POOL, 1])), 'v2', V2),  # both known
+        (log([word(TOKEN), word(WETH)], encode(['address', 'uint256'], ['0x' + '00' * 11 + '2b' * 9, 1])), 'v2', V2),
+        (log([word(TOKEN), word(WETH)], b'\x01'), 'v2', V2),  # malformed data
+    ]
+    assert d.decode_batch(routed) == []
+    assert d.stats == {'logs': 4, 'pairs': 0, 'not_quoted': 1, 'known': 1, 'invalid': 1, 'errors': 1}
+
+
+def test_raw_hex_strings():
+    raw = {'topics': ['0x' + '00' * 32, '0x' + word(TOKEN).hex(), '0x' + word(WETH).hex()],
+           'data': '0x' + encode(['address', 'uint256'], [POOL, 1]).hex(), 'blockNumber': 5}
+    assert decoder().decode(raw, 'v2', 'uniswap_v2', V2).address == POOL
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("PAIR DECODER - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_v2_pair_is_first_data_word, test_v3_fee_and_tick_spacing, test_aerodrome_stable_flag,
+                 test_skips_and_stats, test_raw_hex_strings):
+        test()
+        print(f"✅ {test.__name__}")
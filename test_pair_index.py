@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Offline test for the bounded, persistent seen-pair index
+"""
+import os
+import tempfile
+from database import UserDatabase
+from pair_index import BloomFilter, SeenPairIndex
+
+
+def test_bounded_and_persistent():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = UserDatabase(os.path.join(tmp, 'users.db'))
+        index = SeenPairIndex(db, max_size=3)
+        for block in range(1, 6):
+            index.add(f"base:0xPAIR{block}", block)
+        assert len(index) == 3  # Memory stays bounded
+        assert 'base:0xpair5' in index  # Case-insensitive addresses
+        assert 'base:0xPAIR1' in index  # Evicted from memory, found on disk
+        assert index.stats['disk_hits'] == 1
+        assert 'monad:0xPAIR1' not in index  # Chain is part of the key
+
+        # Survives a restart
+        restarted = SeenPairIndex(UserDatabase(os.path.join(tmp, 'users.db')), max_size=3)
+        assert 'base:0xPAIR2' in restarted
+
+        # Preconfirmed retries are forgotten everywhere
+        restarted.discard('base:0xPAIR5')
+        assert 'base:0xPAIR5' not in restarted
+
+        # Pruning by block height
+        assert restarted.prune('base', 3) == 2
+        assert 'base:0xPAIR1' not in restarted and 'base:0xPAIR3' in restarted
+
+
+def test_new_pairs_skip_the_disk_after_evictions():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = UserDatabase(os.path.join(tmp, 'users.db'))
+        index = SeenPairIndex(db, max_size=10)
+        for n in range(200):
+            index.add(f"base:0xSEEN{n}", n)
+        assert index.stats['evictions'] == 190
+        assert not any(f"base:0xNEW{n}" in index for n in range(1000))
+        assert index.stats['disk_lookups'] < 50  # Only filter false positives reach SQLite
+        assert 'base:0xSEEN3' in index and index.stats['disk_hits'] == 1  # Evicted keys are still found
+
+        # Rebuilt from disk on restart; if the table can't be read every miss falls back to SQLite
+        assert 'base:0xSEEN4' in SeenPairIndex(UserDatabase(os.path.join(tmp, 'users.db')), max_size=10)
+        db.get_seen_pair_keys = lambda: None
+        blind = SeenPairIndex(db, max_size=10)
+        assert 'base:0xSEEN5' in blind and 'base:0xNEW1' not in blind
+        assert blind.stats['disk_lookups'] == 2
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    for n in range(1000):
+        bloom.add(f"base:0x{n:040x}")
+    assert all(f"base:0x{n:040x}" in bloom for n in range(1000))
+    assert sum(f"monad:0x{n:040x}" in bloom for n in range(10000)) < 300  # ~1% false positives at capacity
+    assert len(bloom.array) < 1300  # ~9.6 bits per key
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("SEEN-PAIR INDEX - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_bounded_and_persistent, test_new_pairs_skip_the_disk_after_evictions,
+                 test_bloom_filter_has_no_false_negatives):
+        test()
+        print(f"✅ {test.__name__}")
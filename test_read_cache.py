@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Offline test for the immutable read cache (temporary SQLite file, fixture provider, no network)
+"""
+import os
+import tempfile
+from web3 import Web3
+from database import UserDatabase
+from multicall import TokenReadService, erc20_calldata
+from read_cache import ImmutableReadCache
+from replay import FixtureProvider
+from test_multicall import PAIR, TOKEN, make_fixture
+from test_rpc_router import make_router
+
+NAME = '0x06fdde03'
+OWNER = '0x8da5cb5b'
+
+
+def temp_db():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return UserDatabase(path), path
+
+
+def test_memory_then_disk_tiers():
+    db, path = temp_db()
+    try:
+        cache = ImmutableReadCache(db, max_size=1)
+        cache.put('base', TOKEN, NAME, True, b'\x01')
+        cache.put('base', PAIR, NAME, True, b'\x02')  # Evicts TOKEN from memory (still on disk)
+        assert cache.stats['evictions'] == 1
+        assert cache.get('base', TOKEN, NAME).data == b'\x01'
+        assert cache.stats['disk_hits'] == 1
+        assert cache.get('base', TOKEN.upper().replace('0X', '0x'), NAME).data == b'\x01'  # Addresses are case-insensitive
+        assert cache.stats['memory_hits'] == 1
+        assert cache.get('monad', TOKEN, NAME) is None  # Keyed per chain
+        # A restarted process starts from SQLite
+        assert ImmutableReadCache(db).get('base', PAIR, NAME).data == b'\x02'
+    finally:
+        os.remove(path)
+
+
+def test_mutable_reads_and_empty_code_stay_out():
+    db, path = temp_db()
+    try:
+        cache = ImmutableReadCache(db)
+        cache.put('base', TOKEN, OWNER, True, b'\x01')  # owner() can be renounced
+        cache.put('base', TOKEN, 'eth_getCode', True, b'')  # Not deployed yet
+        assert cache.stats['stores'] == 0
+        assert cache.get('base', TOKEN, OWNER) is None and cache.get('base', TOKEN, 'eth_getCode') is None
+    finally:
+        os.remove(path)
+
+
+def test_negative_entries_expire():
+    db, path = temp_db()
+    try:
+        cache = ImmutableReadCache(db, negative_ttl=60)
+        cache.put('base', TOKEN, NAME, False, b'')
+        assert cache.get('base', TOKEN, NAME).ok is False and cache.stats['negative_hits'] == 1
+        cache.negative_ttl = 0
+        assert cache.get('base', TOKEN, NAME) is None
+    finally:
+        os.remove(path)
+
+
+def test_service_serves_repeat_metadata_from_cache():
+    db, path = temp_db()
+    try:
+        provider = FixtureProvider(make_fixture())
+        cache = ImmutableReadCache(db)
+        service = TokenReadService(lambda chain: Web3(provider), window=0, cache=cache)
+        requests = [(TOKEN, 'name'), (TOKEN, 'symbol'), (TOKEN, 'decimals'), (TOKEN, 'balanceOf', PAIR)]
+        first = service.read('base', requests)
+        again = service.read('base', requests)
+        assert first == again == ['Maker', 'MKR', 18, 5 * 10 ** 18]
+        assert provider.counts['eth_call'] == 2  # balanceOf is re-read every time
+        assert service.stats['cached'] == 3 and cache.hit_rate == 0.5
+        assert service.read('base', requests[:3]) == first[:3] and provider.counts['eth_call'] == 2
+        assert 'hit rate' in cache.format_stats()
+    finally:
+        os.remove(path)
+
+
+def test_router_reuses_chain_id():
+    router = make_router('ok')
+    w3 = Web3(router)
+    for _ in range(3):
+        w3.eth.call({'to': Web3.to_checksum_address(TOKEN), 'data': '0x' + erc20_calldata('name').hex()})
+    assert router.endpoints[0].provider.calls == 3 + 1  # One eth_chainId for the router's lifetime
+    assert router.stats['static_hits'] >= 2
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("IMMUTABLE READ CACHE - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_memory_then_disk_tiers, test_mutable_reads_and_empty_code_stay_out, test_negative_entries_expire,
+                 test_service_serves_repeat_metadata_from_cache, test_router_reuses_chain_id):
+        test()
+        print(f"✅ {test.__name__}")
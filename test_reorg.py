@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Offline test for reorg detection over a fake chain whose recent blocks can be replaced
+"""
+import os
+import tempfile
+import sniper_bot as bot
+from database import UserDatabase
+from head_tracker import HeadTracker
+from reorg import BlockHashRing, ReorgDetector
+
+
+class ForkableEth:
+    def __init__(self):
+        self.fork = {}  # number -> replacement hash suffix
+
+    def get_block(self, number):
+        tag = self.fork.get(number, 'a')
+        return {'number': number, 'hash': '0x' + f"{number:08x}{tag}".ljust(64, '0'), 'parentHash': None, 'timestamp': number}
+
+
+class FakeW3:
+    def __init__(self):
+        self.eth = ForkableEth()
+
+
+def test_detects_reorg_and_bounds_range():
+    w3 = FakeW3()
+    detector = ReorgDetector(HeadTracker(lambda: w3, 'monad'), 'monad', size=8)
+    for tip in (100, 110, 120):
+        detector.record(tip)
+    assert detector.check() is None
+
+    # Blocks 115+ replaced: last still-canonical scanned tip is 110
+    for n in range(115, 121):
+        w3.eth.fork[n] = 'b'
+    assert detector.check() == (111, 120)
+    assert detector.check() is None  # Ring now holds the canonical hash
+    assert detector.stats['reorgs'] == 1 and detector.stats['max_depth'] == 10
+
+
+def test_reorg_deeper_than_ring():
+    w3 = FakeW3()
+    detector = ReorgDetector(HeadTracker(lambda: w3, 'base'), 'base', size=2)
+    for tip in (100, 110, 120):
+        detector.record(tip)
+    for n in range(90, 121):
+        w3.eth.fork[n] = 'b'
+    assert detector.check() == (110, 120)  # Everything the ring still covered
+
+
+def test_ring_is_bounded_and_ordered():
+    ring = BlockHashRing(size=3)
+    for n in (5, 1, 3, 4):
+        ring.record(n, f"h{n}")
+    assert [n for n, _ in ring.entries_desc()] == [5, 4, 3]
+    ring.truncate_above(3)
+    assert ring.newest() == (3, 'h3')
+
+
+def test_alert_messages_pruned_past_the_reorg_horizon():
+    w3 = FakeW3()
+    detector = ReorgDetector(HeadTracker(lambda: w3, 'base'), 'base', size=2)
+    saved = bot.db
+    with tempfile.TemporaryDirectory() as tmp:
+        bot.db = UserDatabase(os.path.join(tmp, 'users.db'))
+        try:
+            for message_id, block in enumerate((100, 115, 120)):
+                bot.db.add_alert_message('base', f"0xPAIR{block}", 7, message_id, 'user', block=block)
+            bot.db.add_alert_message('monad', '0xPAIR100', 7, 9, 'user', block=100)
+            assert bot.prune_alert_messages('base', detector) == 0  # Nothing scanned yet: no horizon
+            for tip in (100, 110, 120):
+                detector.record(tip)
+            assert bot.prune_alert_messages('base', detector) == 1  # Ring now starts at 110
+            assert bot.db.get_alert_messages('base', '0xPAIR100') == []
+            assert len(bot.db.get_alert_messages('base', '0xPAIR115')) == 1  # Still retractable by a reorg
+            assert len(bot.db.get_alert_messages('monad', '0xPAIR100')) == 1  # Other chains keep theirs
+        finally:
+            bot.db = saved
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("REORG DETECTION - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_detects_reorg_and_bounds_range, test_reorg_deeper_than_ring, test_ring_is_bounded_and_ordered,
+                 test_alert_messages_pruned_past_the_reorg_horizon):
+        test()
+        print(f"✅ {test.__name__}")
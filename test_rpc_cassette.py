@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Offline test for RPC cassettes: a local JSON-RPC server replaying the recorded Base fixture
+(plain Web3.HTTPProvider clients, injected latency and errors, record -> replay round trip)
+"""
+import os
+import tempfile
+import time
+from requests.exceptions import HTTPError
+from web3 import Web3
+from block_range import PROVIDER_RANGE_LIMITS, AdaptiveBlockRange, classify_range_error, provider_key
+from rpc_cassette import CassetteRecorder, CassetteServer, FaultPlan, load_cassette
+from rpc_router import RpcRouter
+from test_replay import ERC20_ABI, FACTORIES, FIXTURE, load_fixture
+from replay import FixtureProvider
+
+WETH = '0x4200000000000000000000000000000000000006'
+V2_FACTORY = FACTORIES['uniswap_v2']['address']
+
+
+def http_web3(url):
+    return Web3(Web3.HTTPProvider(url, exception_retry_configuration=None))
+
+
+def test_replays_over_http_with_latency():
+    fixture = load_fixture()
+    with CassetteServer(FixtureProvider(fixture), FaultPlan(latency=0.05)) as server:
+        w3 = http_web3(server.url)
+        start = time.monotonic()
+        assert w3.eth.block_number == fixture['to_block']
+        assert time.monotonic() - start >= 0.05
+        logs = w3.eth.get_logs({'fromBlock': hex(fixture['from_block']), 'toBlock': hex(fixture['from_block'] + 8),
+                                'address': [V2_FACTORY]})
+        assert [log['blockNumber'] for log in logs] == [fixture['from_block']]
+        assert w3.eth.contract(address=WETH, abi=ERC20_ABI).functions.symbol().call() == 'WETH'
+        assert server.stats['eth_getLogs'] == 1
+
+
+def test_injected_http_errors():
+    with CassetteServer(load_cassette(FIXTURE), FaultPlan(rate_limit=1.0)) as limited, \
+            CassetteServer(load_cassette(FIXTURE), FaultPlan(unavailable=1.0)) as down:
+        for server, status in ((limited, 429), (down, 503)):
+            try:
+                http_web3(server.url).eth.block_number
+                assert False, f"expected HTTP {status}"
+            except HTTPError as e:
+                assert e.response.status_code == status
+        assert limited.stats['rate_limited'] == 1 and down.stats['unavailable'] == 1
+
+
+def test_range_errors_teach_the_block_range():
+    fixture = load_fixture()
+    with CassetteServer(FixtureProvider(fixture), FaultPlan(max_log_range=5)) as server:
+        w3 = http_web3(server.url)
+        try:
+            w3.eth.get_logs({'fromBlock': hex(fixture['from_block']), 'toBlock': hex(fixture['from_block'] + 8)})
+            assert False, 'expected a range error'
+        except Exception as e:
+            assert classify_range_error(e) == 'range'
+        block_range = AdaptiveBlockRange(50, maximum=100, name='cassette')
+        try:
+            logs = block_range.fetch(w3, fixture['from_block'], fixture['to_block'], lambda start, end: w3.eth.get_logs(
+                {'fromBlock': hex(start), 'toBlock': hex(end)}))
+            assert block_range.size(provider_key(w3)) == 5  # Advertised limit learned from the message
+        finally:
+            PROVIDER_RANGE_LIMITS.pop(provider_key(w3), None)
+        assert len(logs) == len(fixture['logs']) and server.stats['range_errors'] == 2
+
+
+def test_router_fails_over_between_cassettes():
+    with CassetteServer(load_cassette(FIXTURE), FaultPlan(unavailable=1.0)) as down, \
+            CassetteServer(load_cassette(FIXTURE), FaultPlan(latency=0.01)) as up:
+        router = RpcRouter([down.url, up.url], timeout=2)
+        assert Web3(router).eth.block_number == load_fixture()['to_block']
+        assert router.stats['failovers'] == 1 and down.stats['unavailable'] == 1
+
+
+def test_record_then_replay():
+    fixture = load_fixture()
+    with CassetteServer(FixtureProvider(fixture)) as upstream:
+        recorder = CassetteRecorder(upstream.url, exception_retry_configuration=None)
+        with CassetteServer(recorder) as proxy:
+            w3 = http_web3(proxy.url)
+            live_head = w3.eth.block_number
+            live_symbol = w3.eth.contract(address=WETH, abi=ERC20_ABI).functions.symbol().call()
+            live_logs = w3.eth.get_logs({'fromBlock': hex(fixture['from_block']), 'toBlock': hex(fixture['to_block'])})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cassette.json')
+        recorder.save(path)
+        with CassetteServer(load_cassette(path)) as replayed:
+            w3 = http_web3(replayed.url)
+            assert w3.eth.block_number == live_head
+            assert w3.eth.contract(address=WETH, abi=ERC20_ABI).functions.symbol().call() == live_symbol
+            assert w3.eth.get_logs({'fromBlock': hex(fixture['from_block']), 'toBlock': hex(fixture['to_block'])}) == live_logs
+            assert not replayed.provider.misses
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("RPC CASSETTES - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_replays_over_http_with_latency, test_injected_http_errors, test_range_errors_teach_the_block_range,
+                 test_router_fails_over_between_cassettes, test_record_then_replay):
+        test()
+        print(f"✅ {test.__name__}")
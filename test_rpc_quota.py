@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Offline test for client-side RPC rate limits and the per-feature quota ledger (fake endpoints, no network)
+"""
+import asyncio
+import time
+from rpc_quota import HIGH, LOW, EndpointLimiter, QuotaLedger, limiter_for, parse_rate_limits, rpc_context
+from test_rpc_router import make_router
+
+
+def test_bucket_weights_and_priority_reserve():
+    limiter = EndpointLimiter(rate=0.001, burst=10)
+    assert limiter.try_acquire(3, LOW)  # 7 left
+    assert not limiter.try_acquire(5, LOW)  # Would leave 2 < LOW reserve of 3
+    assert limiter.try_acquire(5, HIGH)  # Alert-path reads may use the reserve
+    assert limiter.throttled == 1
+    assert limiter.wait_time(1, LOW) > 100
+
+
+def test_limits_config():
+    limits = parse_rate_limits('{"rpc1.monad.xyz": 15, "alchemy.com": {"rps": 25, "burst": 50}}')
+    assert limiter_for('https://rpc1.monad.xyz', limits).rate == 15
+    assert limiter_for('https://base-mainnet.g.alchemy.com/v2/KEY', limits).burst == 50
+    assert limiter_for('https://rpc2.monad.xyz', limits) is None
+    assert parse_rate_limits('') == {}
+    for bad in ('[1]', '{"x": 0}', '{"x": {"burst": 5}}'):
+        try:
+            parse_rate_limits(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+
+def test_router_spreads_load_instead_of_429s():
+    limits = {'rpc0.example': {'rps': 0.001, 'burst': 2}}
+    router = make_router('ok', 'ok', limits=limits)
+    limited, other = router.endpoints
+    other.latency = 1.0  # Limited endpoint is otherwise preferred
+    with rpc_context('scan', HIGH):
+        for _ in range(4):
+            router.make_request('eth_call', [{}, 'latest'])
+    assert limited.provider.calls == 2 and other.provider.calls == 2
+    assert limited.rate_limits == 0  # Never got far enough to see a 429
+
+
+def test_router_waits_for_room_then_goes_over_limit():
+    router = make_router('ok', limits={'rpc0.example': {'rps': 20, 'burst': 1}}, max_throttle_wait=0.2)
+    start = time.monotonic()
+    router.make_request('eth_blockNumber', [])
+    router.make_request('eth_blockNumber', [])  # Waits ~50ms for a refill
+    assert router.stats['throttled'] == 1 and time.monotonic() - start >= 0.04
+    router.make_request('eth_getLogs', [{}])  # Weight 3 is capped at the burst: waits for a full bucket
+    assert router.stats['throttled'] == 2 and router.stats['over_limit'] == 0
+
+    router.max_throttle_wait = 0
+    router.make_request('eth_blockNumber', [])  # No wait allowed: sent over the limit rather than dropped
+    assert router.stats['over_limit'] == 1 and router.endpoints[0].provider.calls == 4
+    assert 'over limit' in router.format_stats()
+
+
+def test_router_never_sleeps_on_the_event_loop():
+    router = make_router('ok', limits={'rpc0.example': {'rps': 1, 'burst': 1}}, max_throttle_wait=5)
+
+    async def handler():  # A sync Web3 call made straight from a command handler
+        router.make_request('eth_blockNumber', [])
+        router.make_request('eth_blockNumber', [])
+
+    start = time.monotonic()
+    asyncio.run(handler())
+    assert time.monotonic() - start < 0.5  # Would have waited ~1s for a refill off the loop
+    assert router.stats['throttled'] == 0 and router.stats['over_limit'] == 1
+
+
+def test_ledger_charges_features():
+    ledger = QuotaLedger()
+    router = make_router('ok', ledger=ledger)
+    with rpc_context('analysis', HIGH):
+        router.make_request('eth_call', [{}, 'latest'])
+        router.make_request('eth_getLogs', [{}])
+    router.make_request('eth_blockNumber', [])
+    router.probe_all()
+    assert ledger.by_feature() == {'analysis': 26 + 75, 'other': 10, 'probe': 10}
+    assert ledger.by_host('rpc0.example')['analysis'] == 101
+    assert 'analysis' in ledger.format_stats()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("RPC QUOTA - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_bucket_weights_and_priority_reserve, test_limits_config, test_router_spreads_load_instead_of_429s,
+                 test_router_waits_for_room_then_goes_over_limit, test_router_never_sleeps_on_the_event_loop,
+                 test_ledger_charges_features):
+        test()
+        print(f"✅ {test.__name__}")
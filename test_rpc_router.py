@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Offline test for the health-scored RPC router (fake endpoints, no network)
+"""
+import time
+from web3 import Web3
+from block_range import PROVIDER_RANGE_LIMITS, AdaptiveBlockRange
+from rpc_router import CLOSED, OPEN, HedgePolicy, RpcRouter
+
+
+class FakeEndpointProvider:
+    def __init__(self, behaviour='ok', delay=0.0):
+        self.behaviour = behaviour
+        self.delay = delay
+        self.calls = 0
+
+    def make_request(self, method, params):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.behaviour == 'down':
+            raise ConnectionError('503 Server Error: Service Unavailable')
+        if self.behaviour == 'limited':
+            return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32005, 'message': 'Too Many Requests'}}
+        if self.behaviour == 'revert':
+            return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': 3, 'message': 'execution reverted'}}
+        if self.behaviour == 'range' and method == 'eth_getLogs':
+            span = int(params[0]['toBlock'], 16) - int(params[0]['fromBlock'], 16) + 1
+            if span > 100:
+                return {'jsonrpc': '2.0', 'id': 1, 'error': {
+                    'code': -32600, 'message': 'You can make eth_getLogs requests with up to a 100 block range'}}
+            return {'jsonrpc': '2.0', 'id': 1, 'result': []}
+        return {'jsonrpc': '2.0', 'id': 1, 'result': '0x10'}
+
+
+def make_router(*behaviours, **kwargs):
+    router = RpcRouter([f"https://rpc{i}.example" for i in range(len(behaviours))], **kwargs)
+    for endpoint, behaviour in zip(router.endpoints, behaviours):
+        endpoint.provider = FakeEndpointProvider(behaviour)
+    return router
+
+
+def test_failover_and_circuit_breaker():
+    router = make_router('down', 'ok', failure_threshold=2)
+    w3 = Web3(router)
+    assert w3.eth.block_number == 16
+    primary, backup = router.endpoints
+    assert router.stats['failovers'] == 1 and primary.consecutive_failures == 1
+    assert router.pick() is backup  # Errors inflate the primary's score
+
+    router.endpoints = [primary]  # Force traffic onto the failing endpoint: second failure opens it
+    try:
+        w3.eth.block_number
+    except ConnectionError:
+        pass
+    assert primary.state == OPEN
+    router.endpoints = [primary, backup]
+    calls = primary.provider.calls
+    for _ in range(5):
+        assert w3.eth.block_number == 16
+    assert primary.provider.calls == calls  # Open circuit: no traffic
+    assert backup.state == CLOSED and backup.latency is not None
+
+
+def test_rate_limit_moves_traffic():
+    router = make_router('limited', 'ok')
+    assert router.make_request('eth_blockNumber', [])['result'] == '0x10'
+    assert router.endpoints[0].rate_limits == 1
+    assert router.pick() is router.endpoints[1]
+
+
+def test_json_rpc_errors_are_answers():
+    router = make_router('revert', 'ok')
+    assert router.make_request('eth_call', [{}, 'latest'])['error']['message'] == 'execution reverted'
+    assert router.stats['failovers'] == 0 and router.endpoints[0].state == CLOSED
+
+
+def test_probe_closes_breaker_and_prefers_fast_endpoints():
+    router = make_router('ok', 'ok', base_cooldown=0)
+    slow, fast = router.endpoints
+    slow.provider.delay = 0.02
+    router.probe_all()
+    assert router.pick() is fast
+
+    router.trip(fast)
+    assert fast.state == OPEN
+    assert router.probe(fast) and fast.state == CLOSED
+
+
+def test_concurrent_probing_returns_with_the_fastest_endpoint():
+    router = make_router('ok', 'ok', 'down')
+    slow, fast, down = router.endpoints
+    slow.provider.delay, down.provider.delay = 0.3, 0.3
+    start = time.monotonic()
+    assert router.probe_all(deadline=2, quorum=1) == 1
+    assert time.monotonic() - start < 0.2 and router.pick() is fast
+    time.sleep(0.4)  # Stragglers still record their health in the background
+    assert slow.latency is not None and down.failures == 1
+
+    everyone_slow = make_router('ok', 'ok')
+    for endpoint in everyone_slow.endpoints:
+        endpoint.provider.delay = 0.3
+    start = time.monotonic()
+    assert everyone_slow.probe_all(deadline=0.05) == 0  # The deadline bounds startup
+    assert time.monotonic() - start < 0.2
+
+
+def test_first_request_probes_lazily():
+    router = make_router('ok', 'ok', probe_deadline=1)
+    slow, fast = router.endpoints
+    slow.provider.delay = 0.1
+    assert slow.provider.calls == 0 and fast.provider.calls == 0  # Building the router sends nothing
+    assert router.make_request('eth_blockNumber', [])['result'] == '0x10'
+    assert fast.provider.calls == 2  # Probe, then the request itself on the endpoint that answered first
+    router.make_request('eth_blockNumber', [])
+    assert fast.provider.calls == 3  # Probed once
+
+
+def test_range_limit_lands_on_the_endpoint_that_answered():
+    router = make_router('down', 'range', failure_threshold=3)
+    preferred, answering = router.endpoints
+    preferred.latency, answering.latency = 0.001, 1.0  # Stays preferred through its first failures
+    w3 = Web3(router)
+    block_range = AdaptiveBlockRange(initial=500, minimum=10, maximum=1000)
+    try:
+        logs = block_range.fetch(w3, 0, 999, lambda start, end: w3.eth.get_logs({'fromBlock': hex(start), 'toBlock': hex(end)}))
+        assert logs == []
+        assert router.stats['failovers'] >= 1 and router.served_uri() == answering.url
+        assert PROVIDER_RANGE_LIMITS.get(answering.url) == 100
+        assert preferred.url not in PROVIDER_RANGE_LIMITS and preferred.url not in block_range.sizes
+    finally:
+        for endpoint in router.endpoints:
+            PROVIDER_RANGE_LIMITS.pop(endpoint.url, None)
+
+
+def test_all_down_raises():
+    router = make_router('down', 'down')
+    try:
+        router.make_request('eth_blockNumber', [])
+        assert False, 'expected the last transport error'
+    except ConnectionError:
+        pass
+    assert router.stats['exhausted'] == 1
+
+
+def test_hedged_read_wins_on_second_endpoint():
+    router = make_router('ok', 'ok', hedge=HedgePolicy(budget=1, burst=1, default_delay=0.02))
+    slow, fast = router.endpoints
+    slow.latency, fast.latency = 0.001, 0.01  # Router prefers the (secretly) slow one
+    slow.provider.delay = 0.3
+    start = time.monotonic()
+    assert router.make_request('eth_call', [{}, 'latest'])['result'] == '0x10'
+    assert time.monotonic() - start < 0.25
+    assert router.hedge.stats['eth_call'] == {'requests': 1, 'hedged': 1, 'won': 1, 'denied': 0}
+    assert fast.provider.calls == 1
+
+
+def test_hedge_budget_and_methods():
+    router = make_router('ok', 'ok', hedge=HedgePolicy(budget=0, burst=1, default_delay=0.01))
+    slow = router.endpoints[0]
+    slow.latency, router.endpoints[1].latency = 0.001, 1.0  # Stays preferred even after one slow sample
+    slow.provider.delay = 0.05
+    for _ in range(3):
+        router.make_request('eth_getCode', ['0x' + '00' * 20, 'latest'])
+    assert router.hedge.stats['eth_getCode']['hedged'] == 1  # Burst of one, no refill
+    assert router.hedge.stats['eth_getCode']['denied'] == 2
+    router.make_request('eth_sendRawTransaction', ['0x'])  # Never hedged
+    assert router.endpoints[1].provider.calls == 1
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("RPC ROUTER - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_failover_and_circuit_breaker, test_rate_limit_moves_traffic, test_json_rpc_errors_are_answers,
+                 test_probe_closes_breaker_and_prefers_fast_endpoints,
+                 test_concurrent_probing_returns_with_the_fastest_endpoint, test_first_request_probes_lazily,
+                 test_range_limit_lands_on_the_endpoint_that_answered, test_all_down_raises,
+                 test_hedged_read_wins_on_second_endpoint, test_hedge_budget_and_methods):
+        test()
+        print(f"✅ {test.__name__}")
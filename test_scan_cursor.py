@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Offline test for the persistent per-chain scan cursor
+"""
+import os
+import tempfile
+from database import UserDatabase
+
+
+def test_cursor_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = UserDatabase(os.path.join(tmp, 'users.db'))
+        assert db.get_scan_cursor('base') is None
+        db.save_scan_cursor('base', 30_000_000)
+        db.save_scan_cursor('monad', 5_000)
+        db.save_scan_cursor('base', 30_000_010)  # Overwrites, one row per chain
+
+        # A fresh instance (restart) sees the saved cursors
+        restarted = UserDatabase(os.path.join(tmp, 'users.db'))
+        assert restarted.get_scan_cursor('base') == 30_000_010
+        assert restarted.get_scan_cursor('monad') == 5_000
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("SCAN CURSOR - OFFLINE TESTS")
+    print("=" * 60)
+    test_cursor_round_trip()
+    print("✅ test_cursor_round_trip")
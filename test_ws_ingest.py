@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Offline test for WebSocket log ingestion against a local eth_subscribe stand-in
+"""
+import asyncio
+import json
+import websockets
+from ws_ingest import LogSubscriber, LatencyTracker
+
+V2_TOPIC = '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9'
+FACTORY = '0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6'
+
+
+class LocalSubscriptionServer:
+    """Minimal JSON-RPC WebSocket node: eth_blockNumber, eth_subscribe(logs/newHeads), pushes on demand"""
+
+    def __init__(self, head: int = 1000):
+        self.head = head
+        self.clients = []
+        self.subscriptions = {}  # websocket -> {'logs': id, 'newHeads': id}
+        self.server = None
+
+    async def start(self):
+        self.server = await websockets.serve(self._handler, '127.0.0.1', 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handler(self, ws):
+        self.clients.append(ws)
+        self.subscriptions[ws] = {}
+        try:
+            async for raw in ws:
+                req = json.loads(raw)
+                if req['method'] == 'eth_blockNumber':
+                    result = hex(self.head)
+                elif req['method'] == 'eth_subscribe':
+                    kind = req['params'][0]
+                    result = f"0x{len(self.subscriptions[ws]) + 1:x}"
+                    self.subscriptions[ws][kind] = result
+                else:
+                    await ws.send(json.dumps({'jsonrpc': '2.0', 'id': req['id'], 'error': {'code': -32601, 'message': 'method not found'}}))
+                    continue
+                await ws.send(json.dumps({'jsonrpc': '2.0', 'id': req['id'], 'result': result}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.remove(ws)
+
+    async def push_log(self, block: int):
+        for ws in list(self.clients):
+            sub = self.subscriptions[ws].get('logs')
+            if sub:
+                log = {
+                    'address': FACTORY, 'topics': [V2_TOPIC, '0x' + '00' * 32, '0x' + '00' * 32],
+                    'data': '0x' + '00' * 64, 'blockNumber': hex(block), 'logIndex': '0x0',
+                    'transactionHash': '0x' + 'ab' * 32, 'blockHash': '0x' + 'cd' * 32, 'removed': False,
+                }
+                await ws.send(json.dumps({'jsonrpc': '2.0', 'method': 'eth_subscription', 'params': {'subscription': sub, 'result': log}}))
+
+    async def push_head(self, block: int):
+        self.head = block
+        for ws in list(self.clients):
+            sub = self.subscriptions[ws].get('newHeads')
+            if sub:
+                await ws.send(json.dumps({'jsonrpc': '2.0', 'method': 'eth_subscription', 'params': {'subscription': sub, 'result': {'number': hex(block)}}}))
+
+    async def drop_all(self):
+        for ws in list(self.clients):
+            await ws.close()
+
+
+async def _wait_until(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+async def _run_subscription_and_reconnect():
+    server = LocalSubscriptionServer(head=1000)
+    url = await server.start()
+    event = asyncio.Event()
+    subscriber = LogSubscriber(url, {'address': [FACTORY], 'topics': [[V2_TOPIC]]}, chain='base', reconnect_delay=0.05, notify=event)
+    task = asyncio.create_task(subscriber.run())
+    try:
+        await _wait_until(lambda: subscriber.connected)
+        assert subscriber.live_from_block == 1000
+        assert not subscriber.is_live(995)  # Poller must backfill up to the subscription start first
+        assert subscriber.is_live(1000)
+
+        await server.push_log(1001)
+        await asyncio.wait_for(event.wait(), timeout=2)
+        items = subscriber.drain()
+        assert len(items) == 1 and items[0][1]['blockNumber'] == 1001
+        assert items[0][1]['topics'][0].hex().endswith(V2_TOPIC[2:])
+
+        await server.push_head(1005)
+        await _wait_until(lambda: subscriber.last_block == 1005)
+
+        # Drop the socket: subscriber goes offline, keeps last_block for the polling backfill
+        server.head = 1010
+        await server.drop_all()
+        await _wait_until(lambda: subscriber.drops == 1)
+        assert subscriber.last_block == 1005
+
+        # Reconnects and resubscribes from the new head
+        await _wait_until(lambda: subscriber.connected and subscriber.live_from_block == 1010)
+        assert not subscriber.is_live(1005)
+    finally:
+        task.cancel()
+        await server.stop()
+
+
+def test_subscription_and_reconnect():
+    asyncio.run(_run_subscription_and_reconnect())
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker()
+    for ms in (10, 20, 30, 40, 500):
+        tracker.record('base/ws', ms / 1000)
+    summary = tracker.summary('base/ws')
+    assert summary['count'] == 5
+    assert summary['p50'] == 0.03
+    assert summary['max'] == 0.5
+    assert 'base/ws n=5' in tracker.format()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("WEBSOCKET INGESTION - OFFLINE TESTS")
+    print("=" * 60)
+    for test in (test_subscription_and_reconnect, test_latency_tracker):
+        test()
+        print(f"✅ {test.__name__}")
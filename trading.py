@@ -72,8 +72,10 @@ ERC20_ABI = [
 
 
 class TradingBot:
-    def __init__(self, w3: Web3):
+    def __init__(self, w3: Web3, token_reads=None, chain: str = 'base'):
         self.w3 = w3
+        self.token_reads = token_reads  # multicall.TokenReadService: balance + decimals in one batched read
+        self.chain = chain
         self.router = w3.eth.contract(
             address=Web3.to_checksum_address(UNISWAP_V3_ROUTER),
             abi=ROUTER_ABI
@@ -378,6 +380,24 @@ class TradingBot:
 
     def get_token_balance(self, token_address: str, wallet_address: str) -> dict:
         """Get token balance for a wallet"""
+        if self.token_reads is not None:
+            try:
+                result = self.token_reads.balances(self.chain, [(token_address, wallet_address)])
+                token_balance = next(iter(result.values()))
+                if token_balance.formatted is None:
+                    return {'success': False, 'message': 'balanceOf()/decimals() call failed'}
+                return {
+                    'success': True,
+                    'balance': token_balance.balance,
+                    'balance_formatted': token_balance.formatted,
+                    'decimals': token_balance.decimals
+                }
+            except Exception as e:
+                return {
+                    'success': False,
+                    'message': str(e)
+                }
+
         try:
             token_contract = self.w3.eth.contract(
                 address=Web3.to_checksum_address(token_address),
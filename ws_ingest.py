@@ -0,0 +1,168 @@
+"""
+WebSocket Log Ingestion for Base Fair Launch Sniper Bot
+Push-based factory log delivery via eth_subscribe("logs"), with newHeads for cursor tracking
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from hexbytes import HexBytes
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+def format_log(raw: dict) -> dict:
+    """Convert a JSON-RPC log object into the shape returned by w3.eth.get_logs"""
+    return {
+        'address': raw.get('address'),
+        'topics': [HexBytes(t) for t in raw.get('topics', [])],
+        'data': HexBytes(raw.get('data', '0x')),
+        'blockNumber': int(raw['blockNumber'], 16) if raw.get('blockNumber') else None,
+        'blockHash': HexBytes(raw['blockHash']) if raw.get('blockHash') else None,
+        'transactionHash': HexBytes(raw['transactionHash']) if raw.get('transactionHash') else None,
+        'logIndex': int(raw['logIndex'], 16) if raw.get('logIndex') else 0,
+        'removed': bool(raw.get('removed', False)),
+    }
+
+
+class LatencyTracker:
+    """Rolling latency samples (seconds) from log arrival to analysis start"""
+
+    def __init__(self, max_samples: int = 500):
+        self.samples: Dict[str, deque] = {}
+        self.max_samples = max_samples
+
+    def record(self, key: str, seconds: float):
+        """Add one sample for a chain/ingestion path"""
+        self.samples.setdefault(key, deque(maxlen=self.max_samples)).append(max(0.0, seconds))
+
+    def summary(self, key: str) -> dict:
+        """count / avg / p50 / p95 / max for one key"""
+        values = sorted(self.samples.get(key, []))
+        if not values:
+            return {'count': 0, 'avg': 0, 'p50': 0, 'p95': 0, 'max': 0}
+        return {
+            'count': len(values),
+            'avg': sum(values) / len(values),
+            'p50': values[len(values) // 2],
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max': values[-1],
+        }
+
+    def format(self, prefix: Optional[str] = None) -> str:
+        """One-line summary of every key (or keys starting with prefix) for the periodic scan log"""
+        parts = []
+        for key in sorted(self.samples):
+            if prefix and not key.startswith(prefix):
+                continue
+            s = self.summary(key)
+            parts.append(f"{key} n={s['count']} p50={s['p50'] * 1000:.0f}ms p95={s['p95'] * 1000:.0f}ms")
+        return ' | '.join(parts) if parts else 'no samples'
+
+
+class LogSubscriber:
+    """Keeps an eth_subscribe("logs") stream open and queues factory logs as they arrive"""
+
+    def __init__(self, ws_url: str, log_filter: dict, chain: str = 'base',
+                 reconnect_delay: float = 5, notify: Optional[asyncio.Event] = None,
+                 on_head: Optional[Callable[[dict], None]] = None):
+        self.ws_url = ws_url
+        self.log_filter = log_filter
+        self.chain = chain
+        self.reconnect_delay = reconnect_delay
+        self.notify = notify  # Set whenever a log arrives so the scan loop can wake up
+        self.on_head = on_head  # Called with each newHeads header (e.g. HeadTracker.observe_header)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.connected = False
+        self.live_from_block: Optional[int] = None  # Head when the current subscription started
+        self.last_block: Optional[int] = None  # Latest head/log block seen over the socket
+        self.drops = 0
+        self._request_id = 0
+        self._pending = []
+
+    def is_live(self, cursor: Optional[int]) -> bool:
+        """True once polling has backfilled up to the start of the current subscription"""
+        return (self.connected and self.live_from_block is not None
+                and cursor is not None and cursor >= self.live_from_block)
+
+    def drain(self) -> list:
+        """Take every queued (arrived_at, log) without waiting"""
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def run(self):
+        """Subscribe forever, reconnecting after drops"""
+        while True:
+            try:
+                await self._session()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ {self.chain} log subscription error: {e}")
+            if self.connected:
+                self.drops += 1
+                logger.warning(f"🔌 {self.chain} WebSocket dropped at block {self.last_block} - falling back to polling")
+            self.connected = False
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _request(self, ws, method: str, params: list):
+        """Send one JSON-RPC request and wait for its response (notifications are buffered)"""
+        self._request_id += 1
+        request_id = self._request_id
+        await ws.send(json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}))
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg.get('id') == request_id:
+                if 'error' in msg:
+                    raise ValueError(msg['error'])
+                return msg.get('result')
+            self._pending.append(msg)
+
+    async def _session(self):
+        """One connection lifetime: subscribe, then pump notifications into the queue"""
+        self._pending = []
+        async with websockets.connect(self.ws_url, ping_interval=20, ping_timeout=20, max_size=None) as ws:
+            head = int(await self._request(ws, 'eth_blockNumber', []), 16)
+            logs_sub = await self._request(ws, 'eth_subscribe', ['logs', self.log_filter])
+            try:
+                heads_sub = await self._request(ws, 'eth_subscribe', ['newHeads'])
+            except Exception as e:
+                logger.debug(f"{self.chain} newHeads subscription unavailable: {e}")
+                heads_sub = None
+
+            self.live_from_block = head
+            self.last_block = max(head, self.last_block or 0)
+            self.connected = True
+            logger.info(f"⚡ {self.chain} WebSocket log subscription live from block {head:,}")
+
+            for msg in self._pending:
+                self._handle(msg, logs_sub, heads_sub)
+            self._pending = []
+
+            async for raw in ws:
+                self._handle(json.loads(raw), logs_sub, heads_sub)
+
+    def _handle(self, msg: dict, logs_sub: str, heads_sub: Optional[str]):
+        """Route one eth_subscription notification"""
+        if msg.get('method') != 'eth_subscription':
+            return
+        params = msg.get('params', {})
+        result = params.get('result') or {}
+        if params.get('subscription') == logs_sub:
+            log = format_log(result)
+            if log['removed']:
+                return
+            self.queue.put_nowait((time.monotonic(), log))
+            if log['blockNumber'] is not None:
+                self.last_block = max(self.last_block or 0, log['blockNumber'])
+            if self.notify:
+                self.notify.set()
+        elif heads_sub and params.get('subscription') == heads_sub and result.get('number'):
+            self.last_block = max(self.last_block or 0, int(result['number'], 16))
+            if self.on_head:
+                self.on_head(result)